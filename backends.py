@@ -0,0 +1,111 @@
+# backends.py
+"""
+► Backends de modelo: de onde vêm as respostas dos prompts.
+► Interface (duck typing, como o resto do projeto):
+    • `nome`            – texto para o log;
+    • `salas`           – identificadores das conversas (entram na chave
+                          do cache);
+    • `sala(n)`         – a sala usada pelo worker `n`;
+    • `sessao(n)`       – context manager aberto UMA vez dentro da thread
+                          do worker `n`; devolve `responder(prompt,
+                          ao_parcial=None, seguimento=False) -> html`. Com
+                          `ao_parcial`, o HTML parcial é passado a ele
+                          durante a geração; `seguimento` = continua a
+                          pergunta anterior (mesma conversa).
+► `BackendPlaywright` é o raspador do ChatGPT pelo Chrome em modo-debug.
+  Apontado para o servidor de `chat_falso.py` roda contra a página local.
+  O navegador e as abas vêm de navegador.py: aba aquecida reaproveitada,
+  pronta quando aparece o campo de mensagem, e reconexão transparente —
+  se o CDP cair no meio de um prompt, reconecta e repete o prompt.
+  O falso em memória (`chat_falso.BackendFalso`) dispensa o navegador.
+► Rodízio de conversas: cada aba abre conversa nova a cada N prompts ou
+  quando o DOM passa de N elementos — numa conversa longa cada espera e
+  cada leitura ficam mais lentas. A conversa nova pode começar com um
+  preâmbulo (contexto), cuja resposta é descartada. Nunca no meio de um
+  grupo de seguimento.
+"""
+
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from chat import CHROME_DEBUG_URL, obter_resposta, contar_nos, link_conversa_nova
+from navegador import Navegador, AbaChat, LIMITE_PRONTO_SEG
+from medicao import etapa
+
+
+class BackendPlaywright:
+    nome = "Chrome Debug"
+
+    def __init__(self, cdp_url: str = CHROME_DEBUG_URL, links: list[str] = (),
+                 responder=obter_resposta, limite_pronto: float = LIMITE_PRONTO_SEG,
+                 nova_a_cada: int = 0, nova_nos_dom: int = 0, preambulo: str = "",
+                 navegador: Navegador | None = None):
+        """
+        `responder(page, prompt, ao_parcial) -> html` roda na thread da aba.
+        Os links são distribuídos entre as abas em rodízio; para paralelismo
+        real cada aba precisa de uma conversa própria (link de sala/GPT que
+        abre chat novo, ou um link de conversa por aba).
+        `nova_a_cada` prompts ou `nova_nos_dom` elementos na página (0 =
+        nunca) → conversa nova, começando pelo `preambulo` se houver.
+        Sem `navegador`, só conecta ao Chrome já aberto em `cdp_url`.
+        """
+        if not links:
+            raise ValueError("informe ao menos um link do chat")
+        self.navegador     = navegador or Navegador(cdp_url)
+        self.salas         = list(links)
+        self.responder     = responder
+        self.limite_pronto = limite_pronto
+        self.nova_a_cada   = nova_a_cada
+        self.nova_nos_dom  = nova_nos_dom
+        self.preambulo     = preambulo
+
+    def sala(self, n: int) -> str:
+        return self.salas[n % len(self.salas)]
+
+    def _preambulo(self, aba: AbaChat, link: str):
+        if self.preambulo and link == link_conversa_nova(link):
+            self.responder(aba.page, self.preambulo, None)
+
+    def _cheia(self, page, n_prompts: int) -> bool:
+        if not n_prompts:
+            return False
+        if self.nova_a_cada and n_prompts >= self.nova_a_cada:
+            return True
+        return bool(self.nova_nos_dom) and contar_nos(page) > self.nova_nos_dom
+
+    @contextmanager
+    def sessao(self, n: int):
+        """Conexão CDP e aba próprias (a API síncrona não cruza threads)."""
+        link = self.sala(n)
+        with sync_playwright() as p:
+            aba = AbaChat(self.navegador, p, self.limite_pronto)
+            with etapa("abrir_aba"):
+                aba.abrir(link)
+                self._preambulo(aba, link)
+            na_conversa = 0
+
+            def responder(prompt: str, ao_parcial=None, seguimento: bool = False) -> str:
+                nonlocal na_conversa
+                if not seguimento and self._cheia(aba.page, na_conversa):
+                    with etapa("nova_conversa"):
+                        aba.ir(link_conversa_nova(link))
+                        self._preambulo(aba, link_conversa_nova(link))
+                    na_conversa = 0
+                try:
+                    html = self.responder(aba.page, prompt, ao_parcial)
+                except Exception:
+                    if aba.viva():
+                        raise
+                    with etapa("reconexao"):        # CDP caiu / aba fechou: volta e repete
+                        if not aba.reconectar(link):
+                            self._preambulo(aba, link)
+                            na_conversa = 0
+                    html = self.responder(aba.page, prompt, ao_parcial)
+                aba.url      = aba.page.url
+                na_conversa += 1
+                return html
+            try:
+                yield responder
+            finally:
+                aba.soltar(link_conversa_nova(link))
@@ -0,0 +1,214 @@
+# benchmark.py
+"""
+► Benchmark de ponta a ponta, sem rede: `processar_documento` completo
+  sobre o Google falso (google_falso.py) e o chat falso (chat_falso.py),
+  em documentos sintéticos de 10, 100 e 1000 prompts.
+► Mede por tamanho:
+    • tempo total e prompts/s;
+    • latência por prompt (p50/p95/p99/máx), tirada dos tempos do diário:
+      chat = enviado → respondido, gravação = respondido → verificado,
+      total = início → verificado;
+    • chamadas à API por método, chamadas por prompt e bytes enviados /
+      recebidos;
+    • quantas respostas foram conferidas no lugar certo do doc final;
+    • tempo por etapa do pipeline (medicao.py) e a parte em espera fixa.
+
+    python benchmark.py [--tamanhos 10 100 1000] [--abas 4] [--fila]
+                        [--latencia-api 0.05] [--latencia-chat 0.2] [--tps 0]
+                        [--parcial] [--cota-escrita 60] [--json resultado.json]
+
+► `--cota-escrita N` faz o Google falso recusar (429) mais de N escritas
+  por minuto no Docs e no Sheets e liga o limitador (limites_api.py) com
+  esse teto: mede quanto da cota a execução aproveita sem falhar.
+► Com `--json` grava os números para comparar entre versões.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+from google_falso import GoogleFalso
+from chat_falso import BackendFalso, resposta_sintetica
+from conversores import html_para_texto
+from google_docs import MONTADORES, ENTRADA_HTML
+from formatacao import texto_docs
+from journal import ENVIADO, RESPONDIDO, VERIFICADO
+from motor import Config, processar_documento, CONCORRENCIA_MAX
+from limites_api import LimitadorGoogle, limitar, COTAS
+from medicao import percentil
+
+
+def resumo(valores: list[float]) -> dict:
+    return {"p50": percentil(valores, 50), "p95": percentil(valores, 95),
+            "p99": percentil(valores, 99), "max": max(valores, default=0.0)}
+
+
+def documento_sintetico(n_prompts: int, semente: int = 0) -> str:
+    """Texto com `n_prompts` linhas !*! entremeadas de parágrafos comuns."""
+    rnd    = random.Random(semente)
+    linhas = ["Documento de teste do benchmark"]
+    for k in range(n_prompts):
+        for _ in range(rnd.randint(0, 3)):
+            linhas.append(f"Parágrafo de contexto {k} " + "texto " * rnd.randint(3, 30))
+        linhas.append(f"!*!Pergunta {k}: explique o item {rnd.randint(0, 10 ** 6)}")
+    return "\n".join(linhas) + "\n"
+
+# ---------- UMA EXECUÇÃO --------------------------------------------
+def _tempos_journal(caminho: str) -> tuple[float, dict]:
+    """(t do início, {chave: {estado: t}}) a partir do diário da execução."""
+    t0, tempos = None, {}
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            ev = json.loads(linha)
+            if ev["ev"] == "inicio" and t0 is None:
+                t0 = ev["t"]
+            elif ev["ev"] == "estado":
+                tempos.setdefault(tuple(ev["chave"]), {})[ev["estado"]] = ev["t"]
+    return t0, tempos
+
+
+def _conferir(texto_doc: str, prompts: list[str], palavras: int, insercao: str) -> int:
+    """Quantas respostas aparecem logo abaixo do próprio prompt."""
+    converter = texto_docs if insercao in ENTRADA_HTML else html_para_texto
+    ok, pos   = 0, 0
+    for p in prompts:
+        pos = texto_doc.find("!*!" + p, pos)
+        if pos < 0:
+            break
+        pos    += len(p) + 3
+        esperado = converter(resposta_sintetica(p, palavras)).strip()[:60]
+        if esperado and esperado in texto_doc[pos:pos + len(esperado) + 8]:
+            ok += 1
+    return ok
+
+
+def rodar(n_prompts: int, n_abas: int = 4, usar_fila: bool = False,
+          latencia_api: float = 0.0, latencia_chat: float = 0.0, tps: float = 0.0,
+          palavras: int = 150, insercao: str = "uma_linha",
+          lote_max_respostas: int = 20, parcial: bool = False,
+          cota_escrita: int = 0) -> dict:
+    cotas   = {"docs.escrita": cota_escrita, "sheets.escrita": cota_escrita} if cota_escrita else {}
+    api     = GoogleFalso(latencia=latencia_api, cotas=cotas)
+    limite  = LimitadorGoogle({**COTAS, **cotas}) if cotas else None
+    texto   = documento_sintetico(n_prompts)
+    doc     = api.novo_documento(texto, doc_id=f"bench-{n_prompts}")
+    prompts = [l[3:].strip() for l in texto.splitlines() if l.startswith("!*!")]
+    cfg     = Config(doc_id=doc.doc_id, n_abas=n_abas, usar_fila=usar_fila,
+                     insercao=insercao, cache_arquivo=None,
+                     lote_max_respostas=lote_max_respostas,
+                     escrita_parcial=parcial, parcial_min_chars=200, parcial_min_seg=0.5,
+                     limitar_api=False,
+                     backend=BackendFalso(latencia_chat, tps, palavras))
+
+    pasta_orig = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)                     # o diário vai para o diretório atual
+        try:
+            t   = time.perf_counter()
+            res = processar_documento(cfg, None, log=lambda msg: None,
+                                      construir=limitar(api.construir, limite)
+                                      if limite else api.construir)
+            seg = time.perf_counter() - t
+            t0, tempos = _tempos_journal(f"journal_{doc.doc_id}.jsonl")
+        finally:
+            os.chdir(pasta_orig)
+
+    chat  = [e[RESPONDIDO] - e[ENVIADO] for e in tempos.values()
+             if ENVIADO in e and RESPONDIDO in e]
+    grav  = [e[VERIFICADO] - e[RESPONDIDO] for e in tempos.values()
+             if RESPONDIDO in e and VERIFICADO in e]
+    total = [e[VERIFICADO] - t0 for e in tempos.values() if VERIFICADO in e]
+    n_cha = sum(api.chamadas.values())
+    return {
+        "prompts":            n_prompts,
+        "concluidos":         res.concluidos,
+        "erros":              res.erros,
+        "abortado":           res.abortado,
+        "conferidos":         _conferir(doc.texto(), prompts, palavras, insercao),
+        "segundos":           seg,
+        "prompts_por_seg":    n_prompts / seg if seg else 0.0,
+        "latencia_chat":      resumo(chat),
+        "latencia_gravacao":  resumo(grav),
+        "latencia_total":     resumo(total),
+        "chamadas":           dict(api.chamadas),
+        "chamadas_por_prompt": n_cha / n_prompts if n_prompts else 0.0,
+        "bytes_enviados":     sum(api.bytes_enviados.values()),
+        "bytes_recebidos":    sum(api.bytes_recebidos.values()),
+        "latencia_api":       {m: resumo(d) for m, d in api.duracoes.items()},
+        "recusadas_429":      sum(api.recusadas.values()),
+        "limitador":          dict(limite.contadores) if limite else {},
+        "etapas":             res.etapas,
+    }
+
+# ---------- RELATÓRIO -----------------------------------------------
+def _ms(r: dict) -> str:
+    return " / ".join(f"{r[k] * 1000:.0f}" for k in ("p50", "p95", "p99", "max"))
+
+
+def imprimir(r: dict):
+    print(f"\n── {r['prompts']} prompt(s): {r['segundos']:.2f} s "
+          f"({r['prompts_por_seg']:.1f} prompt/s) — {r['concluidos']} ok, "
+          f"{r['erros']} erro(s), {r['conferidos']} conferido(s)"
+          + (" — ABORTADO" if r["abortado"] else ""))
+    print(f"   latência ms p50/p95/p99/máx  chat {_ms(r['latencia_chat'])}"
+          f" | gravação {_ms(r['latencia_gravacao'])} | total {_ms(r['latencia_total'])}")
+    print(f"   API: {sum(r['chamadas'].values())} chamada(s), "
+          f"{r['chamadas_por_prompt']:.2f}/prompt, "
+          f"{r['bytes_enviados'] / 1024:.1f} KiB enviados, "
+          f"{r['bytes_recebidos'] / 1024:.1f} KiB recebidos")
+    if r["recusadas_429"] or r["limitador"]:
+        print(f"   cota: {r['recusadas_429']} recusa(s) 429; limitador "
+              + ", ".join(f"{k}={v}" for k, v in sorted(r["limitador"].items())))
+    for m, n in sorted(r["chamadas"].items()):
+        print(f"     {m:<28} {n:>5}  ms {_ms(r['latencia_api'][m])}")
+    etapas = dict(r["etapas"])
+    fixo   = etapas.pop("_fixo_pct", 0.0)
+    if etapas:
+        print(f"   etapas (ms p50/p95/máx, total s) — espera fixa {fixo:.0f}%:")
+        for e, t in sorted(etapas.items(), key=lambda kv: -kv[1]["total"]):
+            print(f"     {e:<28} {t['n']:>5}  ms {t['p50'] * 1000:.0f} / "
+                  f"{t['p95'] * 1000:.0f} / {t['max'] * 1000:.0f}  {t['total']:.2f} s")
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark offline do pipeline.")
+    ap.add_argument("--tamanhos", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--abas", type=int, default=4,
+                    help=f"abas do chat falso em paralelo (máx. {CONCORRENCIA_MAX})")
+    ap.add_argument("--fila", action="store_true", help="inclui a fila no Sheets falso")
+    ap.add_argument("--insercao", choices=sorted(MONTADORES), default="uma_linha")
+    ap.add_argument("--lote", type=int, default=20, help="respostas por batchUpdate")
+    ap.add_argument("--latencia-api", type=float, default=0.0,
+                    help="segundos por chamada à API falsa")
+    ap.add_argument("--latencia-chat", type=float, default=0.0,
+                    help="segundos até o 1º token do chat falso")
+    ap.add_argument("--tps", type=float, default=0.0,
+                    help="tokens/s do chat falso (0 = instantâneo)")
+    ap.add_argument("--palavras", type=int, default=150, help="tamanho das respostas")
+    ap.add_argument("--parcial", action="store_true",
+                    help="escrita parcial durante a geração (use com --tps)")
+    ap.add_argument("--cota-escrita", type=int, default=0,
+                    help="escritas/min aceitas pelo Google falso (0 = sem cota)")
+    ap.add_argument("--json", help="grava os resultados neste arquivo")
+    args = ap.parse_args(argv)
+
+    resultados = []
+    for n in args.tamanhos:
+        r = rodar(n, args.abas, args.fila, args.latencia_api, args.latencia_chat,
+                  args.tps, args.palavras, args.insercao, args.lote, args.parcial,
+                  args.cota_escrita)
+        imprimir(r)
+        resultados.append(r)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"parametros": vars(args), "resultados": resultados}, f, indent=2)
+    return 0 if all(r["conferidos"] == r["prompts"] for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmark_conversores.py
+"""
+► Micro-benchmark de `html_para_texto` em respostas grandes: o conversor
+  de passada única (conversores.py) contra o antigo, que montava a árvore
+  inteira do BeautifulSoup (`get_text("\\n")`).
+► Amostras: respostas sintéticas do chat falso (texto, listas, código) e
+  uma resposta só de código com realce de sintaxe no formato do ChatGPT
+  (`<span class="hljs-…">` por token).
+
+    python benchmark_conversores.py [--repeticoes 20]
+
+► Sem o bs4 instalado mede só o conversor novo.
+"""
+
+import sys
+import time
+import argparse
+
+from chat_falso import resposta_sintetica
+from conversores import html_para_texto
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def html_para_texto_bs4(html: str) -> str:
+    """A versão anterior, como referência."""
+    return BeautifulSoup(html, "html.parser").get_text("\n")
+
+
+def resposta_codigo(linhas: int) -> str:
+    """Bloco de código no DOM do ChatGPT, um span por token realçado."""
+    corpo = "".join(
+        f'<span class="hljs-keyword">def</span> <span class="hljs-title function_">f{k}</span>'
+        f'(<span class="hljs-params">x, y={k}</span>):\n'
+        f'    <span class="hljs-keyword">return</span> x * <span class="hljs-number">{k}</span>'
+        f' + y  <span class="hljs-comment"># linha {k}</span>\n'
+        for k in range(linhas))
+    return ('<p>Segue o código:</p><pre><div class="bg-black rounded-md">'
+            '<div class="flex items-center"><span>python</span>'
+            '<button class="flex gap-1"><svg></svg>Copy code</button></div>'
+            f'<div class="p-4 overflow-y-auto"><code class="hljs language-python">{corpo}'
+            '</code></div></div></pre><p>Pronto.</p>')
+
+
+def medir(funcao, html: str, repeticoes: int) -> float:
+    """Melhor tempo (s) de `repeticoes` conversões."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t = time.perf_counter()
+        funcao(html)
+        melhor = min(melhor, time.perf_counter() - t)
+    return melhor
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Compara os conversores HTML → texto.")
+    ap.add_argument("--repeticoes", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    amostras = [
+        ("texto 1k palavras",   resposta_sintetica("amostra", 1_000)),
+        ("texto 10k palavras",  resposta_sintetica("amostra", 10_000)),
+        ("código 500 linhas",   resposta_codigo(500)),
+        ("código 5000 linhas",  resposta_codigo(5_000)),
+    ]
+    print(f"{'amostra':<22}{'KiB':>8}{'novo ms':>10}{'bs4 ms':>10}{'×':>7}")
+    for nome, html in amostras:
+        novo = medir(html_para_texto, html, args.repeticoes)
+        linha = f"{nome:<22}{len(html) / 1024:>8.0f}{novo * 1000:>10.2f}"
+        if BeautifulSoup:
+            velho = medir(html_para_texto_bs4, html, args.repeticoes)
+            linha += f"{velho * 1000:>10.2f}{velho / novo:>7.1f}"
+        print(linha)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
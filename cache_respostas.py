@@ -0,0 +1,96 @@
+# cache_respostas.py
+"""
+► Cache em disco (SQLite) das respostas do chat.
+► Chave = hash do prompt normalizado + link da sala: reprocessar um
+  documento, ou retomar depois de um "abortando", não manda de novo ao
+  chat o que já foi respondido.
+► Guarda o HTML de `obter_resposta` e o texto de `html_para_texto`.
+► Despejo por idade (`max_dias`) e por tamanho total (`max_mb`), tirando
+  primeiro as entradas usadas há mais tempo.
+"""
+
+import re
+import time
+import sqlite3
+import hashlib
+from urllib.parse import urlsplit
+
+
+def normalizar_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def normalizar_sala(link: str) -> str:
+    """Só esquema + host + caminho: query/fragmento não mudam a conversa."""
+    u = urlsplit(link.strip())
+    return f"{u.scheme}://{u.netloc}{u.path.rstrip('/')}"
+
+
+def chave_cache(prompt: str, sala: str) -> str:
+    base = normalizar_prompt(prompt) + "\0" + normalizar_sala(sala)
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()
+
+
+class CacheRespostas:
+    def __init__(self, caminho: str = "respostas_cache.sqlite3",
+                 max_mb: float = 200, max_dias: float = 30):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_seg   = max_dias * 86400
+        self._escritas = 0
+        self.db        = sqlite3.connect(caminho)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave     TEXT PRIMARY KEY,
+                sala      TEXT NOT NULL,
+                prompt    TEXT NOT NULL,
+                html      TEXT NOT NULL,
+                texto     TEXT NOT NULL,
+                tamanho   INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                usado_em  REAL NOT NULL
+            )""")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_usado_em ON respostas(usado_em)")
+        self.despejar()
+
+    def obter(self, prompt: str, salas: list[str]) -> tuple[str, str] | None:
+        """(html, texto) do prompt em qualquer uma das `salas`, ou None."""
+        limite = time.time() - self.max_seg
+        for sala in salas:
+            chave = chave_cache(prompt, sala)
+            row   = self.db.execute(
+                "SELECT html, texto FROM respostas WHERE chave = ? AND criado_em >= ?",
+                (chave, limite)).fetchone()
+            if row:
+                with self.db:
+                    self.db.execute("UPDATE respostas SET usado_em = ? WHERE chave = ?",
+                                    (time.time(), chave))
+                return row[0], row[1]
+        return None
+
+    def guardar(self, prompt: str, sala: str, html: str, texto: str):
+        agora = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave_cache(prompt, sala), normalizar_sala(sala),
+                 normalizar_prompt(prompt), html, texto,
+                 len(html) + len(texto), agora, agora))
+        self._escritas += 1
+        if self._escritas % 50 == 0:
+            self.despejar()
+
+    def despejar(self):
+        with self.db:
+            self.db.execute("DELETE FROM respostas WHERE criado_em < ?",
+                            (time.time() - self.max_seg,))
+            self.db.execute("""
+                DELETE FROM respostas WHERE chave IN (
+                    SELECT chave FROM (
+                        SELECT chave,
+                               SUM(tamanho) OVER (ORDER BY usado_em DESC) AS acum
+                        FROM respostas)
+                    WHERE acum > ?)""", (self.max_bytes,))
+
+    def fechar(self):
+        self.db.close()
@@ -0,0 +1,351 @@
+# chat.py
+"""
+► Tudo o que conversa com a página do ChatGPT via Playwright:
+  envio do prompt, espera da resposta terminar e leitura do HTML.
+► Duas capturas (CAPTURAS): "dom" espera a bolha assentar e lê o HTML;
+  "rede" acompanha o stream SSE da própria página e remonta a resposta
+  dele — o fim da geração é o fim do stream, sem polling nem esperas.
+► O navegador em si (subir o Chrome, abas, reconexão) fica em navegador.py.
+"""
+
+import re
+import sys
+import json
+import time
+import asyncio
+
+from conversores import markdown_para_html
+from medicao import etapa, dormir, registrar
+
+# ---------- CONFIG ---------------------------------------------------
+CHROME_PATH              = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
+CHROME_USER_DATA_DIR     = r"C:\temp\chrome"
+CHROME_REMOTE_DEBUG_PORT = 9222
+CHROME_DEBUG_URL         = f"http://localhost:{CHROME_REMOTE_DEBUG_PORT}"
+QUIETO_SEG               = 1.5    # bolha sem mutações por N s → resposta pronta
+LIMITE_RESPOSTA_SEG      = 900    # desiste de esperar a geração após N s
+
+SEL_ASSISTENTE = "[data-message-author-role='assistant']"
+SEL_USUARIO    = "[data-message-author-role='user']"
+SEL_STOP       = "button:has(svg[aria-label='Stop generating'])"
+SEL_STREAM     = ".result-streaming, .animate-spin"
+SEL_COMPOSER   = "#prompt-textarea, textarea, div[role='textbox'], div[contenteditable='true']"
+SEL_ENVIAR     = "button[data-testid='send-button'], button[aria-label*='Send']"
+LIMITE_COMPOSER_SEG = 15   # espera pelo campo de mensagem (página ainda carregando)
+LIMITE_ENVIO_SEG    = 5    # o envio tem que aparecer no DOM em até N s
+
+# Requisições (POST, text/event-stream) que trazem a resposta; a última é a
+# do chat_falso.py
+URLS_STREAM              = ("/backend-api/conversation", "/backend-api/f/conversation",
+                            "/conversa")
+LIMITE_INICIO_STREAM_SEG = 60     # o stream tem que começar em até N s após o envio
+
+if sys.platform.startswith("win"):
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+# ---------- PLAYWRIGHT HELPERS --------------------------------------
+def _stop(page):
+    return page.locator(SEL_STOP).count()
+
+def _stream(page):
+    return page.locator(SEL_STREAM).count()
+
+def _composer(page):
+    ta = page.locator("textarea")
+    if ta.count():
+        try:
+            return bool(ta.input_value().strip())
+        except Exception:
+            pass
+    return False
+
+# Roda dentro da página: um MutationObserver marca a última alteração na
+# bolha do assistente; a Promise resolve quando a bolha fica `quietoMs`
+# sem mudar e sem sinais de geração (Stop, streaming, composer preenchido).
+# Com `bolha`, observa só ela: o custo não cresce com a conversa.
+JS_AGUARDAR_PRONTO = """
+({selAssist, selStop, selStream, quietoMs, limiteMs, bolha}) => new Promise(resolve => {
+    const t0 = performance.now();
+    let ultima = t0, timer = null;
+    const ocupado = () => {
+        if (document.querySelector(selStop) || (bolha || document).querySelector(selStream))
+            return true;
+        const ta = document.querySelector("textarea");
+        return !!(ta && ta.value.trim());
+    };
+    const relevante = m => {
+        if (bolha) return true;
+        const alvo = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        if (alvo && alvo.closest(selAssist)) return true;
+        for (const n of m.addedNodes)
+            if (n.nodeType === 1 && (n.matches(selAssist) || n.querySelector(selAssist)))
+                return true;
+        return false;
+    };
+    const fim = ok => { obs.disconnect(); clearTimeout(timer); resolve(ok); };
+    const checar = () => {
+        const agora = performance.now();
+        if (agora - t0 >= limiteMs) return fim(false);
+        const busy = ocupado();
+        if (busy) ultima = agora;
+        const resta = quietoMs - (agora - ultima);
+        if (resta <= 0) return fim(true);
+        clearTimeout(timer);
+        timer = setTimeout(checar, busy ? Math.min(resta, 250) : resta);
+    };
+    const obs = new MutationObserver(muts => {
+        if (muts.some(relevante)) ultima = performance.now();
+        checar();
+    });
+    obs.observe(bolha || document.body, {childList: true, subtree: true,
+                                         characterData: true, attributes: true});
+    checar();
+})
+"""
+
+def _html_bolha(page, bolha=None) -> str:
+    """HTML do `.markdown` da `bolha` (ElementHandle) ou, sem ela, da última."""
+    if bolha is not None:
+        md = bolha.query_selector(".markdown")
+        return md.inner_html() if md else ""
+    cnt = page.locator(SEL_ASSISTENTE).count()
+    return page.locator(SEL_ASSISTENTE).nth(-1) \
+        .locator(".markdown").inner_html() if cnt else ""
+
+def _aguardar_pronto_polling(page, quieto: float, limite: float, ao_mudar=None,
+                             bolha=None) -> bool:
+    """
+    Plano B se a página navegar no meio da espera (contexto JS destruído).
+    Também acompanha a geração: `ao_mudar(html)` recebe a bolha parcial a
+    cada mudança.
+    """
+    t_fim     = time.time() + limite
+    last_html = None
+    t0        = time.time()
+    while time.time() < t_fim:
+        try:
+            html = _html_bolha(page, bolha)
+        except Exception:
+            bolha = None                    # página navegou: volta a procurar a última
+            html  = _html_bolha(page)
+        if ao_mudar and html != last_html and html.strip():
+            ao_mudar(html)
+        if _stop(page) or _stream(page) or _composer(page) or html != last_html:
+            last_html, t0 = html, time.time()
+        elif time.time() - t0 >= quieto:
+            return True
+        time.sleep(0.5)
+    return False
+
+def _medir_espera(t: float, pronto: bool, quieto: float):
+    """Separa a espera em geração e estabilização (a janela de silêncio, fixa)."""
+    dur = time.perf_counter() - t
+    if pronto and dur > quieto:
+        registrar("geracao", t, dur - quieto)
+        registrar("estabilizacao", t + dur - quieto, quieto, fixo=True)
+    else:
+        registrar("geracao", t, dur)
+
+def aguardar_pronto(page, quieto: float = QUIETO_SEG,
+                    limite: float = LIMITE_RESPOSTA_SEG, bolha=None) -> bool:
+    """
+    Espera a última resposta — ou a `bolha` (ElementHandle) — ficar
+    `quieto`s sem mutações nem sinais de geração.
+    """
+    t = time.perf_counter()
+    try:
+        pronto = page.evaluate(JS_AGUARDAR_PRONTO, {
+            "selAssist": SEL_ASSISTENTE,
+            "selStop":   SEL_STOP,
+            "selStream": SEL_STREAM,
+            "quietoMs":  quieto * 1000,
+            "limiteMs":  limite * 1000,
+            "bolha":     bolha,
+        })
+    except Exception:
+        pronto = _aguardar_pronto_polling(page, quieto, limite, bolha=bolha)
+    _medir_espera(t, pronto, quieto)
+    return pronto
+
+
+def _normalizar(txt: str) -> str:
+    return " ".join(txt.split())
+
+def _texto_composer(box) -> str:
+    return box.evaluate("n => 'value' in n ? n.value : n.innerText")
+
+def _enviado(page, n_usuario: int, timeout: float) -> bool:
+    """O DOM mostrou o envio: bolha nova do usuário ou botão Stop."""
+    try:
+        page.wait_for_function(
+            "([selUser, n, selStop]) => document.querySelectorAll(selUser).length > n"
+            " || !!document.querySelector(selStop)",
+            arg=[SEL_USUARIO, n_usuario, SEL_STOP], timeout=timeout * 1000)
+        return True
+    except Exception:
+        return False
+
+def enviar_prompt(page, prompt: str):
+    """
+    Põe o prompt inteiro no campo de mensagem numa operação só (`insertText`
+    do CDP; `fill` se o campo não aceitar) em vez de tecla por tecla, envia
+    com Enter (ou o botão de enviar) e só volta quando o DOM confirmar.
+    """
+    box = page.locator(SEL_COMPOSER).first
+    box.wait_for(state="visible", timeout=LIMITE_COMPOSER_SEG * 1000)
+    box.click()
+    page.keyboard.press("ControlOrMeta+A")          # o texto novo substitui o que houver
+    page.keyboard.insert_text(prompt)
+    if _normalizar(_texto_composer(box)) != _normalizar(prompt):
+        box.fill(prompt)
+        if _normalizar(_texto_composer(box)) != _normalizar(prompt):
+            raise RuntimeError("o campo de mensagem não aceitou o prompt")
+
+    n_usuario = page.locator(SEL_USUARIO).count()
+    page.keyboard.press("Enter")
+    if _enviado(page, n_usuario, LIMITE_ENVIO_SEG):
+        return
+    enviar = page.locator(SEL_ENVIAR)
+    if enviar.count() and enviar.first.is_enabled():
+        enviar.first.click()
+        if _enviado(page, n_usuario, LIMITE_ENVIO_SEG):
+            return
+    raise RuntimeError("envio do prompt não confirmado pela página")
+
+# ---------- OBTÉM RESPOSTA COMPLETA ---------------------------------
+# A última bolha do assistente antes do envio fica guardada na página; a
+# resposta é a primeira bolha diferente dela. Daí em diante tudo usa essa
+# bolha (ElementHandle), sem recontar as bolhas da conversa inteira.
+JS_MARCAR_ULTIMA = """
+sel => { const l = document.querySelectorAll(sel); window.__autoUltima = l[l.length - 1] || null; }
+"""
+JS_BOLHA_NOVA = """
+sel => { const l = document.querySelectorAll(sel), b = l[l.length - 1];
+         return b && b !== window.__autoUltima ? b : null; }
+"""
+
+def obter_resposta(page, prompt_txt: str, ao_parcial=None) -> str:
+    """`ao_parcial(html)`, se dado, recebe a bolha enquanto a resposta é gerada."""
+    page.evaluate(JS_MARCAR_ULTIMA, SEL_ASSISTENTE)
+    with etapa("envio"):
+        enviar_prompt(page, prompt_txt)
+
+    with etapa("inicio_resposta"):
+        bolha = page.wait_for_function(JS_BOLHA_NOVA, arg=SEL_ASSISTENTE, polling=100,
+                                       timeout=LIMITE_RESPOSTA_SEG * 1000).as_element()
+
+    if ao_parcial:
+        t = time.perf_counter()
+        pronto = _aguardar_pronto_polling(page, QUIETO_SEG, LIMITE_RESPOSTA_SEG,
+                                          ao_parcial, bolha)
+        _medir_espera(t, pronto, QUIETO_SEG)
+    else:
+        pronto = aguardar_pronto(page, bolha=bolha)
+    if not pronto:                  # pela metade: não vai para o doc nem para o cache
+        raise RuntimeError(f"a resposta não terminou em {LIMITE_RESPOSTA_SEG:.0f} s")
+
+    with etapa("leitura"):
+        md = bolha.wait_for_selector(".markdown", state="attached", timeout=60_000)
+
+        # `innerText` do próprio navegador basta para ver se já tem texto;
+        # o HTML é lido (e convertido pelo motor) uma vez só
+        while len(md.inner_text().strip()) <= 5:
+            dormir(0.3, "texto_vazio")
+        return md.inner_html().strip()
+
+def contar_nos(page) -> int:
+    """Elementos no DOM da página — mede o peso da conversa."""
+    return page.evaluate("() => document.getElementsByTagName('*').length")
+
+# ---------- CAPTURA PELA REDE ---------------------------------------
+def _eh_stream(resp) -> bool:
+    return (resp.request.method == "POST"
+            and any(u in resp.url for u in URLS_STREAM)
+            and "text/event-stream" in (resp.headers.get("content-type") or ""))
+
+
+def _operacoes(ev: dict):
+    """(caminho, operação, valor) de um evento do formato delta."""
+    if ev.get("o") == "patch" and isinstance(ev.get("v"), list):
+        for sub in ev["v"]:
+            yield sub.get("p"), sub.get("o"), sub.get("v")
+    else:
+        yield ev.get("p"), ev.get("o"), ev.get("v")
+
+
+def remontar_sse(corpo: str) -> str:
+    """
+    HTML da resposta a partir do corpo SSE. Entende:
+    • {"token": html}                       – chat_falso.py;
+    • {"message": {…, "content": {"parts"}}} – mensagem inteira a cada evento;
+    • {"p": caminho, "o": "append", "v": txt} e {"v": txt} – formato delta.
+    Nos dois do ChatGPT o texto é markdown, convertido aqui.
+    """
+    html, texto = [], ""
+    assist, ultimo = False, (None, None)    # ultimo = (caminho, op) do delta anterior
+    for bloco in corpo.replace("\r\n", "\n").split("\n\n"):
+        dados = "".join(l[5:].lstrip() for l in bloco.split("\n") if l.startswith("data:"))
+        if not dados or dados == "[DONE]":
+            continue
+        try:
+            ev = json.loads(dados)
+        except ValueError:
+            continue
+        if not isinstance(ev, dict):
+            continue
+        if "token" in ev:
+            html.append(ev["token"])
+            continue
+        for p, o, v in _operacoes(ev) if "message" not in ev else [("", "add", ev)]:
+            if isinstance(v, dict) and "message" in v:
+                msg    = v["message"] or {}
+                cont   = msg.get("content") or {}
+                assist = ((msg.get("author") or {}).get("role") == "assistant"
+                          and cont.get("content_type", "text") == "text")
+                if assist:
+                    texto = "".join(x for x in cont.get("parts") or [] if isinstance(x, str))
+                continue
+            if p is None and o is None:
+                p, o = ultimo
+            else:
+                ultimo = (p, o)
+            if assist and p == "/message/content/parts/0" and isinstance(v, str):
+                texto = texto + v if o == "append" else v
+    return "".join(html) if html else markdown_para_html(texto)
+
+
+def obter_resposta_rede(page, prompt_txt: str, ao_parcial=None) -> str:
+    """
+    Como `obter_resposta`, mas lendo a resposta do stream da página. O corpo
+    só fica disponível no fim do stream: `ao_parcial` não é chamado.
+    """
+    with etapa("envio"):
+        with page.expect_response(_eh_stream, timeout=LIMITE_INICIO_STREAM_SEG * 1000) as info:
+            enviar_prompt(page, prompt_txt)
+        resp = info.value
+    if resp.status >= 400:
+        raise RuntimeError(f"stream da resposta voltou HTTP {resp.status}")
+
+    with etapa("geracao"):
+        erro = resp.finished()      # bloqueia até o último byte: fim exato da geração
+    if erro:
+        raise RuntimeError(f"stream da resposta interrompido: {erro}")
+    with etapa("leitura"):
+        try:
+            html = remontar_sse(resp.text())
+        except Exception:
+            # corpo indisponível no CDP: a geração já acabou, basta ler a bolha
+            html = page.locator(SEL_ASSISTENTE).nth(-1).locator(".markdown").inner_html()
+    if not html.strip():
+        raise RuntimeError("stream da resposta sem texto do assistente")
+    return html.strip()
+
+
+CAPTURAS = {
+    "dom":  obter_resposta,
+    "rede": obter_resposta_rede,
+}
+
+def link_conversa_nova(link: str) -> str:
+    """Link que abre conversa nova na mesma sala/GPT (tira o "/c/<id>")."""
+    return re.sub(r"/c/[^/?#]+", "", link)
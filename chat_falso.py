@@ -0,0 +1,263 @@
+# chat_falso.py
+"""
+► Substitutos locais do ChatGPT, para medir e reproduzir execuções sem
+  rede e sem conta:
+    • `BackendFalso`   – backend em memória (mesma interface de
+                         backends.py); só espera latência + tokens/s;
+    • servidor HTTP    – página que imita o DOM do chat (textarea, bolha
+                         `[data-message-author-role='assistant'] .markdown`,
+                         botão Stop, `.result-streaming`) e recebe a
+                         resposta token a token por SSE. Serve para rodar
+                         o `BackendPlaywright` de verdade contra ela.
+► As respostas são determinísticas (semente = hash do prompt) e iguais
+  nos dois: parágrafos, listas e blocos de código em HTML.
+
+    python chat_falso.py [--porta 8765] [--latencia 1.0] [--tps 30] [--palavras 150]
+
+  Parâmetros também por query string: http://localhost:8765/?tps=200&latencia=0
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from medicao import etapa
+
+PORTA_PADRAO = 8765
+
+_VOCAB = ("dados modelo resposta documento processo exemplo sistema valor "
+          "função lista texto análise resultado contexto prompt tabela "
+          "índice campo regra etapa fluxo teste versão cliente servidor "
+          "página busca ordem grupo chave padrão limite tempo custo").split()
+_LIGA  = "de para com em que por sobre entre sem como e ou".split()
+
+
+# ---------- RESPOSTA SINTÉTICA --------------------------------------
+def tokens_sinteticos(prompt: str, palavras: int = 150) -> list[str]:
+    """Fragmentos de HTML (≈ 1 palavra cada) cuja junção é a resposta."""
+    rnd  = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    toks = ["<p>Resposta", " a", f" “{escape(prompt[:60])}”:", "</p>"]
+
+    def frase(n: int) -> list[str]:
+        ws = [rnd.choice(_VOCAB if k % 2 == 0 else _LIGA) for k in range(n)]
+        ws[0] = ws[0].capitalize()
+        if n > 4 and rnd.random() < 0.3:
+            k     = rnd.randrange(1, n)
+            ws[k] = f"<strong>{ws[k]}</strong>"
+        return [ws[0]] + [" " + w for w in ws[1:-1]] + [" " + ws[-1] + "."]
+
+    while len(toks) < palavras:
+        tipo = rnd.choice(("p", "p", "p", "ul", "pre"))
+        if tipo == "p":
+            corpo = frase(rnd.randint(8, 30))
+            toks += ["<p>" + corpo[0]] + corpo[1:] + ["</p>"]
+        elif tipo == "ul":
+            toks.append("<ul>")
+            for _ in range(rnd.randint(2, 5)):
+                corpo = frase(rnd.randint(3, 10))
+                toks += ["<li>" + corpo[0]] + corpo[1:] + ["</li>"]
+            toks.append("</ul>")
+        else:
+            toks.append("<pre><code>")
+            for k in range(rnd.randint(2, 6)):
+                toks.append(f"{rnd.choice(_VOCAB)}_{k} = {rnd.randint(0, 999)}\n")
+            toks.append("</code></pre>")
+    return toks
+
+
+def resposta_sintetica(prompt: str, palavras: int = 150) -> str:
+    return "".join(tokens_sinteticos(prompt, palavras))
+
+
+def _duracao(n_tokens: int, latencia: float, tps: float) -> float:
+    return latencia + (n_tokens / tps if tps > 0 else 0.0)
+
+# ---------- BACKEND EM MEMÓRIA --------------------------------------
+class BackendFalso:
+    nome = "chat falso"
+
+    def __init__(self, latencia: float = 1.0, tokens_por_seg: float = 30.0,
+                 palavras: int = 150, salas: list[str] = ("falso://local",)):
+        """`tokens_por_seg` <= 0 entrega a resposta inteira após a latência."""
+        self.latencia       = latencia
+        self.tokens_por_seg = tokens_por_seg
+        self.palavras       = palavras
+        self.salas          = list(salas)
+
+    def sala(self, n: int) -> str:
+        return self.salas[n % len(self.salas)]
+
+    @contextmanager
+    def sessao(self, n: int):
+        yield self.responder
+
+    def responder(self, prompt: str, ao_parcial=None, seguimento: bool = False) -> str:
+        with etapa("geracao"):
+            return self._gerar(prompt, ao_parcial)
+
+    def _gerar(self, prompt: str, ao_parcial) -> str:
+        toks = tokens_sinteticos(prompt, self.palavras)
+        if not ao_parcial or self.tokens_por_seg <= 0:
+            time.sleep(_duracao(len(toks), self.latencia, self.tokens_por_seg))
+            return "".join(toks)
+
+        # gera em passos de ~0,1 s entregando o HTML parcial
+        time.sleep(self.latencia)
+        passo = max(1, int(self.tokens_por_seg * 0.1))
+        for k in range(passo, len(toks), passo):
+            time.sleep(passo / self.tokens_por_seg)
+            ao_parcial("".join(toks[:k]))
+        time.sleep((len(toks) % passo or passo) / self.tokens_por_seg)
+        return "".join(toks)
+
+# ---------- PÁGINA QUE IMITA O CHAT ---------------------------------
+PAGINA = """<!doctype html>
+<html lang="pt-br"><head><meta charset="utf-8"><title>Chat falso</title>
+<style>
+ body { font-family: sans-serif; max-width: 820px; margin: 0 auto; }
+ [data-message-author-role] { margin: 12px 0; padding: 8px; border-radius: 6px; }
+ [data-message-author-role='user'] { background: #eef; }
+ textarea { width: 100%; height: 70px; }
+</style></head>
+<body>
+<main id="conversa"></main>
+<form id="composer"><textarea placeholder="Mensagem"></textarea><span id="acoes"></span></form>
+<script>
+const ta = document.querySelector("textarea"), conversa = document.getElementById("conversa");
+const acoes = document.getElementById("acoes");
+
+function bolha(papel) {
+    const el = document.createElement("div");
+    el.setAttribute("data-message-author-role", papel);
+    conversa.appendChild(el);
+    return el;
+}
+
+async function enviar(prompt) {
+    bolha("user").textContent = prompt;
+    const md = document.createElement("div");
+    md.className = "markdown result-streaming";
+    bolha("assistant").appendChild(md);
+    acoes.innerHTML = '<button type="button"><svg aria-label="Stop generating"></svg>Stop</button>';
+
+    const resp = await fetch("/conversa" + location.search, {
+        method: "POST", headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({prompt})});
+    const leitor = resp.body.getReader(), dec = new TextDecoder();
+    let buf = "", html = "";
+    for (;;) {
+        const {value, done} = await leitor.read();
+        if (done) break;
+        buf += dec.decode(value, {stream: true});
+        let k;
+        while ((k = buf.indexOf("\\n\\n")) >= 0) {
+            const linha = buf.slice(0, k).replace(/^data: /, "");
+            buf = buf.slice(k + 2);
+            if (linha === "[DONE]") continue;
+            html += JSON.parse(linha).token;
+            md.innerHTML = html;
+        }
+    }
+    md.classList.remove("result-streaming");
+    acoes.innerHTML = "";
+}
+
+ta.addEventListener("keydown", ev => {
+    if (ev.key !== "Enter" || ev.shiftKey) return;
+    ev.preventDefault();
+    const prompt = ta.value.trim();
+    ta.value = "";
+    if (prompt) enviar(prompt);
+});
+</script>
+</body></html>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    padrao = {"latencia": 1.0, "tps": 30.0, "palavras": 150}
+
+    def _params(self) -> dict:
+        q = parse_qs(urlsplit(self.path).query)
+        p = dict(self.padrao)
+        for k in p:
+            if k in q:
+                p[k] = type(p[k])(q[k][0])
+        return p
+
+    def do_GET(self):
+        if urlsplit(self.path).path != "/":
+            return self.send_error(404)
+        corpo = PAGINA.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        if urlsplit(self.path).path != "/conversa":
+            return self.send_error(404)
+        p      = self._params()
+        tam    = int(self.headers.get("Content-Length") or 0)
+        prompt = json.loads(self.rfile.read(tam) or b"{}").get("prompt", "")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        time.sleep(p["latencia"])
+        passo = 1 / p["tps"] if p["tps"] > 0 else 0.0
+        try:
+            for tok in tokens_sinteticos(prompt, p["palavras"]):
+                self.wfile.write(f"data: {json.dumps({'token': tok})}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(passo)
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass                                    # aba fechada no meio
+
+    def log_message(self, *args):
+        pass
+
+
+def iniciar_servidor(porta: int = PORTA_PADRAO, latencia: float = 1.0,
+                     tps: float = 30.0, palavras: int = 150) -> ThreadingHTTPServer:
+    """Sobe o servidor numa thread daemon; `.shutdown()` para."""
+    handler = type("Handler", (_Handler,), {
+        "padrao": {"latencia": float(latencia), "tps": float(tps), "palavras": int(palavras)}})
+    srv = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Página local que imita o chat.")
+    ap.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    ap.add_argument("--latencia", type=float, default=1.0,
+                    help="segundos até o 1º token")
+    ap.add_argument("--tps", type=float, default=30.0, help="tokens por segundo")
+    ap.add_argument("--palavras", type=int, default=150, help="tamanho da resposta")
+    args = ap.parse_args(argv)
+
+    srv = iniciar_servidor(args.porta, args.latencia, args.tps, args.palavras)
+    print(f"Chat falso em http://127.0.0.1:{args.porta}/ — Ctrl+C para sair")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# cli.py
+"""
+► Linha de comando do automatizador — roda sem Tk (servidor Linux, cron).
+
+    python cli.py <link-ou-id-do-doc> [<doc> …] [--pasta <link-da-pasta>]
+                  --chat <link> [<link> …] [--abas N] [--docs-simultaneos N]
+                  [--fila] [--resume] [--log arquivo] [--credenciais json]
+                  [--captura rede] [--backend falso [--latencia S] [--tps N]]
+                  [--parcial [--parcial-chars N] [--parcial-seg S] [--parcial-por-min N]]
+                  [--medicao tempos.jsonl|tempos.prom]
+                  [--nova-conversa N] [--nova-conversa-dom N] [--preambulo TEXTO]
+                  [--lancar-chrome [--headless] [--perfil DIR | --perfil-temporario]]
+                  [--aquecer] [--vigiar [--intervalo S]] [--distribuir [FILA]] [--http2]
+    python cli.py --trabalhar FILA --chat <link> [<link> …] [--abas N] …
+
+► Precisa do Chrome em modo-debug acessível em --cdp e de um token.json
+  válido (ou --credenciais para gerar um na primeira vez). Com
+  `--lancar-chrome` o próprio CLI sobe o Chrome/Chromium (Linux inclusive,
+  `--headless` sem janela) no perfil `--perfil`, onde fica o login;
+  `--aquecer` só deixa as abas do chat carregadas e sai.
+► `--backend falso` responde em memória (chat_falso.py), sem navegador:
+  mede o resto do pipeline de forma reproduzível.
+► Mais de um doc, ou `--pasta` do Drive, roda em lote (lote_docs.py): as
+  abas do chat são divididas entre os docs; com `--fila`, uma planilha
+  com o progresso de cada doc.
+► `--parcial` grava a resposta no doc enquanto ela é gerada (a cada N
+  caracteres ou S segundos, todas as abas num batchUpdate, no máximo
+  `--parcial-por-min` vezes por minuto) e completa no fim.
+► O resumo do tempo por etapa sai sempre no fim do log; `--medicao`
+  grava os tempos (JSON lines, ou Prometheus se terminar em .prom; em
+  lote, "{doc}" no nome vira o id de cada doc).
+► `--vigiar` não termina: confere os docs (e a `--pasta`) a cada S
+  segundos e responde só os !*! novos assim que aparecem (vigia.py).
+► Distribuído (fila_trabalho.py): `--distribuir` publica os prompts numa
+  fila de trabalho — planilha (link/ID; sem valor, cria uma) ou arquivo
+  .sqlite3 — e grava no doc as respostas; `--trabalhar FILA`, em quantas
+  máquinas quiser, pega os prompts com posse renovável e responde com o
+  próprio navegador. Com `--distribuir`, `--abas` = prompts em aberto.
+► `--nova-conversa N` / `--nova-conversa-dom N` abrem conversa nova a cada
+  N prompts ou quando a página passa de N elementos (o chat fica lento
+  numa conversa longa); `--preambulo` é enviado no começo de cada uma.
+"""
+
+import sys
+import argparse
+
+from google_docs import (autenticar_google, extrair_document_id, MONTADORES,
+                         SCOPES_DOCS, SCOPES_FILA)
+from chat import CHROME_DEBUG_URL, CAPTURAS
+from motor import Config, processar_documento, criar_backend, criar_navegador, CONCORRENCIA_MAX
+from navegador import aquecer, PERFIL_PADRAO
+from lote_docs import processar_lote, extrair_pasta_id
+from chat_falso import BackendFalso
+from vigia import Vigia, INTERVALO_SEG
+from fila_sheets import criar_planilha_trabalho
+from fila_trabalho import BackendFila, abrir_fila, trabalhar, EXT_SQLITE
+from limites_api import limitar
+from clientes_google import ClientesGoogle, CLIENTES
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        description="Responde no Google Docs os prompts marcados com !*!.")
+    ap.add_argument("docs", nargs="*", metavar="doc", help="link(s) ou ID(s) do Google Docs")
+    ap.add_argument("--pasta", help="link ou ID de uma pasta do Drive: processa todos os docs dela")
+    ap.add_argument("--docs-simultaneos", type=int, default=2,
+                    help="lote: quantos docs processar ao mesmo tempo")
+    ap.add_argument("--chat", nargs="+", default=[], metavar="LINK",
+                    help="link(s) da sala GPT, distribuídos entre as abas")
+    ap.add_argument("--backend", choices=("playwright", "falso"), default="playwright",
+                    help="de onde vêm as respostas (falso = em memória, sem rede)")
+    ap.add_argument("--latencia", type=float, default=1.0,
+                    help="backend falso: segundos até o 1º token")
+    ap.add_argument("--tps", type=float, default=30.0,
+                    help="backend falso: tokens por segundo")
+    ap.add_argument("--abas", type=int, default=1,
+                    help=f"abas do chat em paralelo (máx. {CONCORRENCIA_MAX})")
+    ap.add_argument("--fila", action="store_true",
+                    help="mantém a fila de status numa planilha do Sheets")
+    ap.add_argument("--resume", action="store_true",
+                    help="retoma a execução anterior do doc pelo diário")
+    ap.add_argument("--insercao", choices=sorted(MONTADORES), default="uma_linha",
+                    help="formato da colagem da resposta no doc")
+    ap.add_argument("--cdp", default=CHROME_DEBUG_URL,
+                    help="endereço do Chrome em modo-debug")
+    ap.add_argument("--lancar-chrome", action="store_true",
+                    help="sobe o Chrome/Chromium se não houver um em --cdp")
+    ap.add_argument("--headless", action="store_true",
+                    help="com --lancar-chrome: sem janela")
+    ap.add_argument("--perfil", default=PERFIL_PADRAO,
+                    help="com --lancar-chrome: pasta do perfil (login guardado)")
+    ap.add_argument("--perfil-temporario", action="store_true",
+                    help="com --lancar-chrome: perfil descartável")
+    ap.add_argument("--aquecer", action="store_true",
+                    help="só abre as --abas no --chat, prontas para a próxima execução")
+    ap.add_argument("--captura", choices=sorted(CAPTURAS), default="dom",
+                    help="lê a resposta da página (dom) ou do stream da rede (rede)")
+    ap.add_argument("--nova-conversa", type=int, default=0, metavar="N",
+                    help="conversa nova a cada N prompts em cada aba (0 = nunca)")
+    ap.add_argument("--nova-conversa-dom", type=int, default=0, metavar="N",
+                    help="conversa nova quando a página passa de N elementos")
+    ap.add_argument("--preambulo", default="",
+                    help="mensagem de contexto enviada no início de cada conversa nova")
+    ap.add_argument("--vigiar", action="store_true",
+                    help="fica no ar respondendo os prompts novos dos docs/pasta")
+    ap.add_argument("--intervalo", type=float, default=INTERVALO_SEG,
+                    help="com --vigiar: segundos entre as conferências")
+    ap.add_argument("--distribuir", nargs="?", const="", metavar="FILA",
+                    help="coordena: publica os prompts na fila de trabalho (planilha "
+                         "ou .sqlite3; sem valor, cria uma planilha)")
+    ap.add_argument("--trabalhar", metavar="FILA",
+                    help="trabalhador: responde os prompts da fila de trabalho")
+    ap.add_argument("--parcial", action="store_true",
+                    help="grava a resposta no doc enquanto é gerada")
+    ap.add_argument("--parcial-chars", type=int, default=Config.parcial_min_chars,
+                    help="caracteres novos por escrita parcial")
+    ap.add_argument("--parcial-seg", type=float, default=Config.parcial_min_seg,
+                    help="segundos entre escritas parciais")
+    ap.add_argument("--parcial-por-min", type=float, default=Config.parcial_por_min,
+                    help="gravações parciais por minuto no doc (cota: 60 escritas/min)")
+    ap.add_argument("--medicao", metavar="ARQ",
+                    help="grava os tempos por etapa (.jsonl, ou .prom p/ Prometheus)")
+    ap.add_argument("--sem-cache", action="store_true",
+                    help="não lê nem grava o cache de respostas")
+    ap.add_argument("--http2", action="store_true",
+                    help="chamadas à API Google em HTTP/2 (precisa do pacote httpx[http2])")
+    ap.add_argument("--credenciais", help="credentials.json para o 1º login")
+    ap.add_argument("--token", default="token.json")
+    ap.add_argument("--log", help="grava o progresso neste arquivo (padrão: stdout)")
+    return ap
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap     = criar_parser()
+    args   = ap.parse_args(argv)
+    doc_ids = [extrair_document_id(d) or d for d in args.docs]
+    pasta   = args.pasta and (extrair_pasta_id(args.pasta) or args.pasta)
+    if args.backend == "playwright" and not args.chat and args.distribuir is None:
+        ap.error("--chat é obrigatório com o backend playwright")
+    if not (doc_ids or pasta or args.aquecer or args.trabalhar):
+        ap.error("informe um doc ou --pasta")
+    backend = BackendFalso(args.latencia, args.tps) if args.backend == "falso" else None
+
+    cfg = Config(doc_id=doc_ids[0] if doc_ids else "", links_chat=args.chat, n_abas=args.abas,
+                 retomar=args.resume, usar_fila=args.fila, insercao=args.insercao,
+                 cdp_url=args.cdp, backend=backend, captura=args.captura,
+                 lancar_navegador=args.lancar_chrome, headless=args.headless,
+                 perfil_navegador=None if args.perfil_temporario else args.perfil,
+                 nova_conversa_a_cada=args.nova_conversa,
+                 nova_conversa_nos_dom=args.nova_conversa_dom, preambulo=args.preambulo,
+                 escrita_parcial=args.parcial, parcial_min_chars=args.parcial_chars,
+                 parcial_min_seg=args.parcial_seg, parcial_por_min=args.parcial_por_min,
+                 medicao_arquivo=args.medicao,
+                 cache_arquivo=None if args.sem_cache else Config.cache_arquivo)
+    if args.aquecer:
+        aquecer(criar_navegador(cfg), args.chat, args.abas)
+        return 0
+
+    saida = open(args.log, "a", encoding="utf-8") if args.log else sys.stdout
+
+    def log(msg: str):
+        print(msg, file=saida, flush=True)
+
+    fila      = args.trabalhar or args.distribuir     # None, "" (criar planilha) ou endereço
+    em_sheets = fila is not None and not fila.endswith(EXT_SQLITE)
+    creds     = None
+    if em_sheets or not args.trabalhar:                # trabalhador com SQLite não usa o Google
+        creds = autenticar_google(SCOPES_FILA if args.fila or pasta or em_sheets else SCOPES_DOCS,
+                                  args.credenciais, args.token)
+        if not creds:
+            log("✗ Sem token.json — rode uma vez com --credenciais credentials.json.")
+            return 2
+    construir = ClientesGoogle(http2=True) if args.http2 else CLIENTES
+    sheets    = limitar(construir)("sheets", "v4", credentials=creds) if em_sheets else None
+
+    if args.trabalhar:
+        try:
+            trabalhar(abrir_fila(args.trabalhar, sheets), criar_backend(cfg), args.abas, log=log)
+        except KeyboardInterrupt:
+            log("⏹ Trabalhador encerrado.")
+        return 0
+    if args.distribuir is not None:
+        endereco = args.distribuir
+        if not endereco:
+            endereco, url = criar_planilha_trabalho(sheets)
+            log(f"📎 Fila de trabalho: {url}  (trabalhadores: --trabalhar {endereco})")
+        cfg.backend = BackendFila(abrir_fila(endereco, sheets), salas=args.chat)
+
+    if args.vigiar:
+        try:
+            Vigia(cfg, creds, doc_ids, pasta, args.intervalo, log=log,
+                  construir=construir).rodar()
+        except KeyboardInterrupt:
+            log("⏹ Vigia encerrada.")
+        return 0
+    if pasta or len(doc_ids) > 1:
+        res = processar_lote(cfg, creds, doc_ids, pasta, log=log, construir=construir,
+                             docs_simultaneos=args.docs_simultaneos)
+    else:
+        res = processar_documento(cfg, creds, log=log, construir=construir)
+
+    log(f"\n{res.concluidos}/{res.prompts} concluído(s), {res.erros} erro(s)"
+        + (" — ABORTADO" if res.abortado else ""))
+    if saida is not sys.stdout:
+        saida.close()
+    return 1 if res.abortado or res.erros else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
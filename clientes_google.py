@@ -0,0 +1,134 @@
+# clientes_google.py
+"""
+► Clientes da API Google para várias threads. O `build` padrão amarra o
+  serviço a um `httplib2.Http`, que não é thread-safe, e cada `build`
+  relê e interpreta o documento de descoberta (~200 KB de JSON).
+► `ClientesGoogle` tem a assinatura de `build` e é o `construir` padrão
+  do motor, do lote e da vigia (`CLIENTES`):
+    • o serviço devolvido serve a qualquer thread: cada uma usa o próprio
+      objeto de serviço, sobre o próprio `httplib2.Http` — conexões
+      keep-alive reaproveitadas entre as chamadas da thread, Docs e
+      Sheets em paralelo sem dividir socket;
+    • descoberta interpretada uma vez por processo (o documento estático
+      que vem com a biblioteca; sem ele, o `build` com cache em memória);
+    • `http2=True` (pacote opcional httpx[http2]): um cliente httpx só,
+      comum às threads, com as chamadas multiplexadas em HTTP/2;
+    • credencial vencida é renovada por uma thread só; as outras esperam
+      a renovação em vez de repetir.
+"""
+
+import json
+import threading
+
+import httplib2
+import google_auth_httplib2
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.discovery_cache.base import Cache
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+TIMEOUT_SEG = 60
+
+
+class _CacheMemoria(Cache):
+    """Descoberta baixada pelo `build`, guardada enquanto o processo vive."""
+
+    def __init__(self):
+        self._docs = {}
+
+    def get(self, url):
+        return self._docs.get(url)
+
+    def set(self, url, content):
+        self._docs[url] = content
+
+
+class _HttpHttpx:
+    """Cliente httpx com a interface `request` do httplib2 (a que o googleapiclient usa)."""
+
+    def __init__(self, cliente, timeout: float):
+        self.cliente = cliente
+        self.timeout = timeout
+
+    def request(self, uri, method="GET", body=None, headers=None,
+                redirections=5, connection_type=None, **_):
+        r    = self.cliente.request(method, uri, content=body, headers=headers)
+        cab  = {k: v for k, v in r.headers.items() if k != "content-encoding"}   # já descomprimido
+        resp = httplib2.Response({"status": r.status_code, **cab})
+        return resp, r.content
+
+    def close(self):
+        pass                                            # o cliente é do processo
+
+
+class _Servico:
+    """Serviço que, em cada thread, delega ao objeto construído para ela."""
+
+    def __init__(self, clientes: "ClientesGoogle", api: str, versao: str, creds, kw: dict):
+        self._clientes = clientes
+        self._args     = (api, versao, creds, kw)
+        self._local    = threading.local()
+
+    def __getattr__(self, nome: str):
+        svc = getattr(self._local, "svc", None)
+        if svc is None:
+            svc = self._local.svc = self._clientes._construir(*self._args)
+        self._clientes.renovar(self._args[2])
+        return getattr(svc, nome)
+
+
+class ClientesGoogle:
+    def __init__(self, http2: bool = False, timeout: float = TIMEOUT_SEG):
+        if http2 and httpx is None:
+            raise RuntimeError("HTTP/2 precisa do pacote httpx[http2]")
+        self.timeout      = timeout
+        self._httpx       = httpx.Client(http2=True, timeout=timeout) if http2 else None
+        self._descobertas = {}
+        self._cache       = _CacheMemoria()
+        self._local       = threading.local()
+        self._trava       = threading.Lock()
+        self._trava_auth  = threading.Lock()
+
+    def __call__(self, api: str, versao: str = "", credentials=None, **kw):
+        """Mesma assinatura de `googleapiclient.discovery.build`."""
+        return _Servico(self, api, versao, credentials, kw)
+
+    def _http(self):
+        """Transporte da thread atual (com HTTP/2, o cliente comum)."""
+        if self._httpx is not None:
+            return _HttpHttpx(self._httpx, self.timeout)
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = self._local.http = httplib2.Http(timeout=self.timeout)
+        return http
+
+    def _descoberta(self, api: str, versao: str) -> dict | None:
+        with self._trava:
+            if (api, versao) not in self._descobertas:
+                doc = get_static_doc(api, versao)
+                self._descobertas[(api, versao)] = json.loads(doc) if doc else None
+            return self._descobertas[(api, versao)]
+
+    def _construir(self, api: str, versao: str, creds, kw: dict):
+        http = self._http()
+        if creds is not None:
+            http = google_auth_httplib2.AuthorizedHttp(creds, http=http)
+        doc = self._descoberta(api, versao)
+        if doc is None:
+            return build(api, versao, http=http, cache=self._cache, **kw)
+        return build_from_document(doc, http=http, **kw)
+
+    def renovar(self, creds):
+        """Renova `creds` se venceu — uma thread renova, as outras esperam."""
+        if creds is None or creds.valid or not getattr(creds, "refresh_token", None):
+            return
+        with self._trava_auth:
+            if not creds.valid:
+                creds.refresh(google_auth_httplib2.Request(httplib2.Http(timeout=self.timeout)))
+
+
+CLIENTES = ClientesGoogle()      # padrão do processo (HTTP/1.1 keep-alive)
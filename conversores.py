@@ -0,0 +1,240 @@
+# conversores.py
+"""
+► Conversão do HTML da resposta (bloco `.markdown`) para o que vai ao Docs.
+► Conversor de passada única sobre os eventos do `html.parser` — sem
+  montar árvore. Mantém a estrutura que importa no texto:
+    • blocos (p, h1–h6, div…) viram linhas; `<br>` quebra a linha;
+    • `<pre>` sai como está, com quebras e indentação;
+    • itens de lista com "• " ou "1. ", recuados pela profundidade;
+    • células de tabela separadas por tab, uma linha por `<tr>`.
+► `ConversorTexto` aceita o HTML em pedaços (`feed`), para quem converte
+  enquanto a resposta chega.
+► `markdown_para_html` para quando a resposta vem crua do stream da rede.
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+BLOCOS   = {"p", "div", "section", "article", "blockquote", "ul", "ol", "li",
+            "pre", "table", "thead", "tbody", "tr", "hr",
+            "h1", "h2", "h3", "h4", "h5", "h6"}
+IGNORAR  = {"script", "style", "button", "svg"}    # "Copy code" etc.
+_ESPACOS = re.compile(r"\s+")
+
+
+# ---------- CONVERSORES ---------------------------------------------
+class ConversorTexto(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._partes   = []
+        self._pre      = 0
+        self._ignorar  = 0
+        self._listas   = []         # pilha: contador do <ol> ou None para <ul>
+        self._celula   = False
+        self._marcador = -1         # len(_partes) logo após o último marcador de item
+
+    # ---- saída
+    def _fim_linha(self) -> bool:
+        return not self._partes or self._partes[-1].endswith("\n")
+
+    def _quebra(self):
+        if not self._fim_linha():
+            self._partes.append("\n")
+
+    def _escrever(self, txt: str):
+        if txt:
+            self._partes.append(txt)
+
+    # ---- eventos
+    def handle_starttag(self, tag: str, attrs):
+        if tag in IGNORAR:
+            self._ignorar += 1
+            return
+        if self._ignorar:
+            return
+        if tag == "br":
+            self._partes.append("\n")
+        elif tag in ("td", "th"):
+            if self._celula:
+                self._escrever("\t")
+            self._celula = True
+        elif tag in BLOCOS:
+            if not (self._marcador == len(self._partes) and tag not in ("ul", "ol", "li")):
+                self._quebra()      # <li><p>…: o texto fica na linha do marcador
+            if tag == "pre":
+                self._pre += 1
+            elif tag == "ul":
+                self._listas.append(None)
+            elif tag == "ol":
+                self._listas.append(0)
+            elif tag == "li" and self._listas:
+                recuo = "  " * (len(self._listas) - 1)
+                if self._listas[-1] is None:
+                    self._escrever(recuo + "• ")
+                else:
+                    self._listas[-1] += 1
+                    self._escrever(f"{recuo}{self._listas[-1]}. ")
+                self._marcador = len(self._partes)
+            elif tag == "tr":
+                self._celula = False
+
+    def handle_startendtag(self, tag: str, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in IGNORAR:
+            self._ignorar -= 1
+
+    def handle_endtag(self, tag: str):
+        if tag in IGNORAR:
+            self._ignorar = max(0, self._ignorar - 1)
+            return
+        if self._ignorar or tag not in BLOCOS:
+            return
+        if tag == "pre":
+            self._pre = max(0, self._pre - 1)
+        elif tag in ("ul", "ol") and self._listas:
+            self._listas.pop()
+        self._quebra()
+
+    def handle_data(self, data: str):
+        if self._ignorar:
+            return
+        if self._pre:
+            self._escrever(data)
+            return
+        txt = _ESPACOS.sub(" ", data)
+        if self._fim_linha() or self._partes[-1].endswith((" ", "\t")):
+            txt = txt.lstrip()
+        self._escrever(txt)
+
+    def texto(self) -> str:
+        """Texto convertido até aqui (sem espaços sobrando no fim das linhas)."""
+        return re.sub(r"[ \t]+\n", "\n", "".join(self._partes)).strip("\n")
+
+
+def html_para_texto(html: str) -> str:
+    conv = ConversorTexto()
+    conv.feed(html)
+    conv.close()
+    return conv.texto()
+
+
+# ---------- MARKDOWN → HTML -----------------------------------------
+# A captura pela rede recebe o markdown cru do chat; este conversor gera o
+# HTML no mesmo formato do `.markdown` da página, que o resto do pipeline
+# (html_para_texto, formato "rica") já entende. Cobre o que o chat usa:
+# parágrafos, títulos, listas aninhadas, código, citações, tabelas,
+# negrito/itálico/riscado, código inline e links.
+_MD_CERCA  = re.compile(r"^\s*(```|~~~)")
+_MD_TITULO = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_MD_ITEM   = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_MD_LINHA  = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_MD_CELSEP = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?\s*$")
+
+
+def _md_inline(txt: str) -> str:
+    partes = re.split(r"(`[^`]+`)", txt)
+    saida  = []
+    for k, p in enumerate(partes):
+        if k % 2:
+            saida.append(f"<code>{escape(p[1:-1])}</code>")
+            continue
+        p = escape(p, quote=False)
+        p = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", r'<a href="\2">\1</a>', p)
+        p = re.sub(r"\*\*(.+?)\*\*|__(.+?)__",
+                   lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", p)
+        p = re.sub(r"(?<![\w*])\*(?![\s*])(.+?)(?<![\s*])\*(?![\w*])",
+                   r"<em>\1</em>", p)
+        p = re.sub(r"~~(.+?)~~", r"<del>\1</del>", p)
+        saida.append(p)
+    return "".join(saida)
+
+
+def markdown_para_html(md: str) -> str:
+    html, par, listas = [], [], []          # listas: pilha de (tag, recuo)
+    linhas = md.replace("\r\n", "\n").split("\n")
+
+    def fechar_par():
+        if par:
+            html.append(f"<p>{_md_inline(' '.join(par))}</p>")
+            par.clear()
+
+    def fechar_listas(recuo: int = -1):
+        while listas and listas[-1][1] > recuo:
+            html.append(f"</li></{listas.pop()[0]}>")
+
+    k = 0
+    while k < len(linhas):
+        lin = linhas[k]
+        k  += 1
+        cerca = _MD_CERCA.match(lin)
+        if cerca:
+            fechar_par()
+            fechar_listas()
+            codigo = []
+            while k < len(linhas) and not linhas[k].strip().startswith(cerca.group(1)):
+                codigo.append(linhas[k])
+                k += 1
+            k += 1
+            corpo = "\n".join(codigo) + "\n" if codigo else ""
+            html.append(f"<pre><code>{escape(corpo)}</code></pre>")
+            continue
+        if not lin.strip():
+            fechar_par()
+            continue
+        m = _MD_TITULO.match(lin)
+        if m:
+            fechar_par()
+            fechar_listas()
+            n = len(m.group(1))
+            html.append(f"<h{n}>{_md_inline(m.group(2))}</h{n}>")
+            continue
+        if _MD_LINHA.match(lin) and not par:
+            fechar_listas()
+            html.append("<hr>")
+            continue
+        m = _MD_ITEM.match(lin)
+        if m:
+            fechar_par()
+            recuo = len(m.group(1).expandtabs(4))
+            tag   = "ol" if m.group(2)[0].isdigit() else "ul"
+            fechar_listas(recuo)
+            if listas and listas[-1][1] == recuo and listas[-1][0] == tag:
+                html.append("</li><li>")
+            else:
+                if listas and listas[-1][1] == recuo:
+                    html.append(f"</li></{listas.pop()[0]}>")
+                html.append(f"<{tag}><li>")
+                listas.append((tag, recuo))
+            html.append(_md_inline(m.group(3)))
+            continue
+        if lin.lstrip().startswith("|"):
+            fechar_par()
+            fechar_listas()
+            tabela = [lin]
+            while k < len(linhas) and linhas[k].lstrip().startswith("|"):
+                tabela.append(linhas[k])
+                k += 1
+            html.append("<table>")
+            for t in tabela:
+                if _MD_CELSEP.match(t):
+                    continue
+                celulas = [c.strip() for c in t.strip().strip("|").split("|")]
+                html.append("<tr>" + "".join(f"<td>{_md_inline(c)}</td>" for c in celulas)
+                            + "</tr>")
+            html.append("</table>")
+            continue
+        if lin.startswith(">"):
+            fechar_par()
+            fechar_listas()
+            html.append(f"<blockquote><p>{_md_inline(lin.lstrip('> '))}</p></blockquote>")
+            continue
+        if listas and not par and lin.startswith(" "):
+            html.append(" " + _md_inline(lin.strip()))     # continuação do item
+            continue
+        if listas:
+            fechar_listas()
+        par.append(lin.strip())
+    fechar_par()
+    fechar_listas()
+    return "".join(html)
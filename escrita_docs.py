@@ -0,0 +1,405 @@
+# escrita_docs.py
+"""
+► Escrita em lote das respostas no Google Docs.
+► As respostas prontas ficam pendentes e são gravadas num ÚNICO
+  `documents().batchUpdate` por descarga, ordenadas do maior índice para
+  o menor: cada inserção só desloca o que está abaixo dela, que já foi
+  gravado, então dentro do lote não há conta de deslocamento.
+► Entre descargas o deslocamento vem das inserções já aplicadas acima de
+  cada prompt (pelo endIndex ORIGINAL), sem `desloc` acumulado à mão.
+► Verificação sem baixar o documento a cada prompt: um espelho local do
+  texto acompanha cada inserção e a escrita exige a revisão conhecida
+  (`requiredRevisionId`). Se ninguém mais mexeu no doc, a resposta do
+  batchUpdate basta; sem revisão conhecida, lê só o texto (máscara
+  `fields`) e confere apenas as regiões inseridas.
+► Escrita de resultado incerto — conflito de revisão (inclusive o da
+  repetição de um batchUpdate que já tinha sido aplicado antes do 5xx)
+  ou 5xx/queda de rede — nunca é reenviada às cegas: relê o doc e compara
+  com o espelho. Já aplicada → ok; doc intacto → repete exigindo a
+  revisão lida; outra coisa (alguém editou) → `ConflitoRevisao`.
+► Escrita parcial (opcional): enquanto a resposta é gerada, o texto já
+  recebido é agendado (`agendar_parcial`, só o mais recente de cada
+  prompt) e vai ao doc num batchUpdate para todos os prompts
+  (`gravar_parciais`), no máximo `parciais_por_min` vezes por minuto — ou
+  junto da descarga. Cada vez só o trecho novo quando ele apenas cresce.
+  Na descarga a região parcial vira a resposta final — acréscimo do que
+  falta ou apaga-e-regrava.
+"""
+
+import time
+
+from limites_api import espera_backoff, status_http
+from medicao import etapa, dormir
+
+# Só o texto dos parágrafos: bem menos bytes que o documento completo
+CAMPOS_TEXTO = ("revisionId,body(content(startIndex,endIndex,"
+                "paragraph(elements(startIndex,textRun(content)))))")
+
+
+class ConflitoRevisao(Exception):
+    """O doc mudou por fora: gravar nos índices calculados poria o texto fora do lugar."""
+
+
+def conflito_revisao(erro: Exception) -> bool:
+    """400 do `requiredRevisionId` (os outros 400 são requisição inválida)."""
+    return status_http(erro) == 400 and "revision" in str(erro).lower()
+
+
+def tamanho_docs(texto: str) -> int:
+    """Tamanho em unidades UTF-16 — é assim que o Docs conta índices."""
+    return len(texto.encode("utf-16-le")) // 2
+
+
+# ---------- ESPELHO LOCAL -------------------------------------------
+class EspelhoDoc:
+    """Texto do corpo indexado como no Docs (1 unidade UTF-16 por índice)."""
+
+    def __init__(self, corpo: list = ()):
+        """Sem `corpo`, começa vazio e é preenchido com `escrever`."""
+        fim      = max((el.get("endIndex", 0) for el in corpo), default=1)
+        self.buf = bytearray(2 * fim)          # índices sem texto ficam '\0'
+        self._copiar(corpo)
+
+    def _copiar(self, conteudo: list):
+        for el in conteudo:
+            for e in el.get("paragraph", {}).get("elements", []):
+                txt = e.get("textRun", {}).get("content")
+                if txt is not None and "startIndex" in e:
+                    self.escrever(e["startIndex"], txt)
+            for linha in el.get("table", {}).get("tableRows", []):
+                for cel in linha.get("tableCells", []):
+                    self._copiar(cel.get("content", []))
+
+    def escrever(self, indice: int, texto: str):
+        """Põe `texto` do doc original em `indice` (sobrescreve; cresce se preciso)."""
+        enc = texto.encode("utf-16-le")
+        ini = 2 * indice
+        if len(self.buf) < ini + len(enc):
+            self.buf.extend(bytes(ini + len(enc) - len(self.buf)))
+        self.buf[ini:ini + len(enc)] = enc
+
+    def inserir(self, indice: int, texto: str):
+        self.buf[2 * indice:2 * indice] = texto.encode("utf-16-le")
+
+    def apagar(self, ini: int, fim: int):
+        del self.buf[2 * ini:2 * fim]
+
+    def trecho(self, ini: int, fim: int) -> str:
+        ini = max(0, ini)
+        return self.buf[2 * ini:2 * fim].decode("utf-16-le", errors="replace")
+
+    def texto(self) -> str:
+        return self.buf.decode("utf-16-le", errors="replace").rstrip("\0")
+
+    def copia(self) -> "EspelhoDoc":
+        outro     = EspelhoDoc()
+        outro.buf = bytearray(self.buf)
+        return outro
+
+
+def ler_regioes(svc, doc_id: str, regioes: list) -> tuple[str | None, list[str]]:
+    """Lê só o texto do doc e devolve (revisionId, [texto de cada (ini, fim)])."""
+    doc    = svc.documents().get(documentId=doc_id, fields=CAMPOS_TEXTO).execute()
+    partes = [[] for _ in regioes]
+    for el in doc.get("body", {}).get("content", []):
+        if "paragraph" not in el:
+            continue
+        if not any(el["startIndex"] < fim and ini < el["endIndex"]
+                   for ini, fim in regioes):
+            continue
+        for e in el["paragraph"].get("elements", []):
+            txt = e.get("textRun", {}).get("content", "")
+            s   = e.get("startIndex", el["startIndex"])
+            for k, (ini, fim) in enumerate(regioes):
+                if s < fim and ini < s + tamanho_docs(txt):
+                    enc = txt.encode("utf-16-le")
+                    a, b = 2 * max(0, ini - s), 2 * max(0, fim - s)
+                    partes[k].append(enc[a:b].decode("utf-16-le", errors="replace"))
+    return doc.get("revisionId"), ["".join(p) for p in partes]
+
+
+# ---------- ESCRITOR EM LOTE ----------------------------------------
+class EscritorDocs:
+    def __init__(self, svc, doc_id: str, montar,
+                 max_respostas: int = 20, max_seg: float = 15.0,
+                 corpo: list | None = None, revisao: str | None = None,
+                 incremental: bool = True, espelho: EspelhoDoc | None = None,
+                 parciais_por_min: float = 20.0):
+        """
+        `montar(insert_at, texto) -> (requests, tamanho)` gera as requisições
+        de UMA resposta já no índice final. Descarrega ao juntar
+        `max_respostas` ou quando a mais antiga espera `max_seg`s.
+        `corpo`/`revisao` vêm do `documents().get` que coletou os prompts e
+        alimentam o espelho local usado na verificação (ou o `espelho` já
+        montado na coleta, que passa a ser do escritor).
+        `incremental=False` regrava a região parcial inteira a cada trecho;
+        `parciais_por_min` limita os batchUpdates só de parciais.
+        """
+        self.svc           = svc
+        self.doc_id        = doc_id
+        self.montar        = montar
+        self.max_respostas = max_respostas
+        self.max_seg       = max_seg
+        if espelho is None and corpo is not None:
+            espelho = EspelhoDoc(corpo)
+        self.espelho       = espelho
+        self.revisao       = revisao if espelho is not None else None
+        self._pendentes    = []     # (end_idx original, texto, chave, prompt)
+        self._aplicados    = []     # (end_idx original, tamanho inserido)
+        self._parciais     = {}     # chave → (conteúdo, tamanho, bloco) já no doc
+        self._agendadas    = {}     # chave → (end_idx original, conteúdo) a gravar
+        self.incremental   = incremental
+        self.parciais_seg  = 60.0 / parciais_por_min
+        self._t_primeiro   = None
+        self._t_parciais   = 0.0
+
+    def deslocamento(self, end_idx: int) -> int:
+        return sum(t for e, t in self._aplicados if e < end_idx)
+
+    def adicionar(self, end_idx: int, texto: str, chave=None, prompt: str = ""):
+        if not self._pendentes:
+            self._t_primeiro = time.time()
+        self._agendadas.pop(chave, None)
+        self._pendentes.append((end_idx, texto, chave, prompt))
+
+    def pendentes(self) -> int:
+        return len(self._pendentes)
+
+    def chaves_pendentes(self) -> list:
+        return [p[2] for p in self._pendentes]
+
+    def precisa_descarregar(self) -> bool:
+        if not self._pendentes:
+            return False
+        return (len(self._pendentes) >= self.max_respostas
+                or time.time() - self._t_primeiro >= self.max_seg)
+
+    def _gravar(self, reqs: list, tentativas: int, mudancas: list) -> bool:
+        """
+        Executa o batchUpdate; devolve True se a revisão exigida valeu.
+        `mudancas` = [(ini, tamanho antes, bloco)] na ordem do lote: o que o
+        batchUpdate faz no texto, para reconciliar quando o resultado é incerto.
+        """
+        for tent in range(tentativas):
+            corpo = {"requests": reqs}
+            if self.revisao:
+                corpo["writeControl"] = {"requiredRevisionId": self.revisao}
+            try:
+                with etapa("insercao"):
+                    resp = self.svc.documents().batchUpdate(
+                        documentId=self.doc_id, body=corpo).execute()
+            except Exception as e:
+                st = status_http(e)
+                if st == 429:                       # recusado pela cota: nada aplicado
+                    if tent == tentativas - 1:
+                        raise
+                    dormir(espera_backoff(tent), "backoff_docs")
+                    continue
+                incerto = (conflito_revisao(e) if "writeControl" in corpo
+                           else st is None or st >= 500)
+                if not incerto or self.espelho is None:
+                    raise
+                aplicado = self._reconciliar(mudancas)
+                if aplicado is None:
+                    raise ConflitoRevisao(f"o doc mudou durante a gravação ({e})") from e
+                if aplicado:
+                    return True
+                if tent == tentativas - 1:
+                    raise
+                continue                            # intacto: repete exigindo a revisão lida
+            exigida = "writeControl" in corpo
+            if len(resp.get("replies", reqs)) != len(reqs):
+                exigida = False
+            self.revisao = (resp.get("writeControl", {}).get("requiredRevisionId")
+                            if exigida else None)
+            return exigida
+        return False
+
+    def _reconciliar(self, mudancas: list) -> bool | None:
+        """
+        Relê o doc depois de uma escrita de resultado incerto: True se as
+        `mudancas` já estão lá, False se o texto está como antes, None se
+        mudou outra coisa — aí fica a revisão velha, e as gravações
+        seguintes também dão conflito em vez de cair fora do lugar.
+        """
+        with etapa("reconciliacao"):
+            doc = self.svc.documents().get(documentId=self.doc_id).execute()
+        lido   = EspelhoDoc(doc["body"]["content"]).texto()
+        depois = self.espelho.copia()
+        for ini, tam_ant, bloco in mudancas:
+            depois.apagar(ini, ini + tam_ant)
+            depois.inserir(ini, bloco)
+        if lido == depois.texto():
+            aplicado = True
+        elif lido == self.espelho.texto():
+            aplicado = False
+        else:
+            return None
+        self.revisao = doc.get("revisionId")
+        return aplicado
+
+    def _montar_sobre(self, insert_at: int, conteudo: str, ant) -> tuple:
+        """
+        Requisições que levam ao `conteudo` a região onde está `ant`
+        (conteúdo, tamanho, bloco) — ou nada, se None. Devolve
+        (requests, ini, tamanho, bloco, variação de tamanho no doc).
+        """
+        r, tam = self.montar(insert_at, conteudo)
+        ins    = next(q["insertText"] for q in r if "insertText" in q)
+        ini, bloco = ins["location"]["index"], ins["text"]
+        if ant is None:
+            return r, ini, tam, bloco, tam
+
+        conteudo_ant, tam_ant, bloco_ant = ant
+        k = bloco_ant.find(conteudo_ant)
+        if self.incremental and k >= 0 and conteudo.startswith(conteudo_ant):
+            # só cresceu: insere o trecho novo; o estilo vem do texto anterior
+            corte = k + len(conteudo_ant)
+            novo  = conteudo[len(conteudo_ant):]
+            if bloco == bloco_ant[:corte] + novo + bloco_ant[corte:]:
+                r = [{"insertText": {
+                        "location": {"index": ini + tamanho_docs(bloco_ant[:corte])},
+                        "text": novo}}] if novo else []
+                return r, ini, tam, bloco, tam - tam_ant
+        if not (bloco[:1] == bloco_ant[:1] == "\n"):
+            apagar = {"deleteContentRange": {
+                "range": {"startIndex": ini, "endIndex": ini + tam_ant}}}
+            return [apagar] + r, ini, tam, bloco, tam - tam_ant
+
+        # Regrava mantendo o '\n' inicial: apagá-lo juntaria o parágrafo do
+        # prompt ao último da resposta, que lhe passaria o estilo/marcador.
+        reqs = [{"deleteContentRange": {
+            "range": {"startIndex": ini + 1, "endIndex": ini + tam_ant}}}] if tam_ant > 1 else []
+        for q in r:
+            if "insertText" in q:
+                q = {"insertText": {"location": {"index": ini + 1}, "text": bloco[1:]}}
+                if any("createParagraphBullets" in x or "updateParagraphStyle" in x for x in r):
+                    reqs += [q, {"deleteParagraphBullets": {
+                        "range": {"startIndex": ini + 1, "endIndex": ini + tam}}}]
+                    continue
+            reqs.append(q)
+        return reqs, ini, tam, bloco, tam - tam_ant
+
+    def _espelhar(self, ini: int, tam_ant: int, bloco: str):
+        if self.espelho is not None:
+            self.espelho.apagar(ini, ini + tam_ant)
+            self.espelho.inserir(ini, bloco)
+
+    def agendar_parcial(self, end_idx: int, conteudo: str, chave) -> bool:
+        """
+        Agenda o `conteudo` parcial da resposta de `chave` para a próxima
+        gravação de parciais (ou descarga), no lugar do que já estava
+        agendado. False se não há o que gravar.
+        """
+        if chave in self.chaves_pendentes():
+            return False                    # a final já está no lote
+        ant = self._parciais.get(chave)
+        if ant is not None and ant[0] == conteudo:
+            self._agendadas.pop(chave, None)
+            return False
+        self._agendadas[chave] = (end_idx, conteudo)
+        return True
+
+    def precisa_gravar_parciais(self) -> bool:
+        return (bool(self._agendadas)
+                and time.time() - self._t_parciais >= self.parciais_seg)
+
+    def gravar_parciais(self, tentativas: int = 2) -> int:
+        """Grava as parciais agendadas num batchUpdate; devolve quantas."""
+        if not self._agendadas:
+            return 0
+        itens = [(e, c, chave, None) for chave, (e, c) in self._agendadas.items()]
+        self._agendadas, self._t_parciais = {}, time.time()
+        lote, regioes, antigos, _ = self._aplicar(itens, tentativas)
+        self._conferir(lote, regioes, antigos, True)
+        return len(itens)
+
+    def descartar_parcial(self, end_idx: int, chave):
+        """Apaga a região parcial de `chave` (resposta com erro/cancelada)."""
+        self._agendadas.pop(chave, None)
+        ant = self._parciais.get(chave)
+        if ant is None:
+            return
+        r, _ = self.montar(end_idx + self.deslocamento(end_idx), ant[0])
+        ini  = next(q["insertText"]["location"]["index"] for q in r if "insertText" in q)
+        self._gravar([{"deleteContentRange": {
+            "range": {"startIndex": ini, "endIndex": ini + ant[1]}}}], 2, [(ini, ant[1], "")])
+        del self._parciais[chave]
+        self._aplicados.append((end_idx, -ant[1]))
+        self._espelhar(ini, ant[1], "")
+
+    def parciais_abertos(self) -> list:
+        """Chaves com texto parcial no doc (ou agendado) sem a resposta final no lote."""
+        pend = set(self.chaves_pendentes())
+        return [c for c in {**self._parciais, **self._agendadas} if c not in pend]
+
+    def _aplicar(self, itens: list, tentativas: int) -> tuple:
+        """
+        Grava `itens` [(end_idx original, conteúdo, chave, prompt — None
+        se parcial)] num batchUpdate, do maior índice para o menor, sobre
+        a parcial de cada chave. Devolve (lote ordenado, regiões, parciais
+        substituídas, revisão valeu); regiões: (ini, tamanho, bloco, variação).
+        """
+        lote = sorted(itens, key=lambda p: p[0], reverse=True)
+        reqs, regioes = [], []
+        for end_idx, texto, chave, _ in lote:
+            r, ini, tam, bloco, liquido = self._montar_sobre(
+                end_idx + self.deslocamento(end_idx), texto, self._parciais.get(chave))
+            reqs.extend(r)
+            regioes.append((ini, tam, bloco, liquido))
+
+        antigos   = [self._parciais.get(p[2]) for p in lote]
+        confiavel = not reqs or self._gravar(
+            reqs, tentativas, [(ini, a[1] if a else 0, bloco)
+                               for (ini, _, bloco, _), a in zip(regioes, antigos)])
+
+        self._aplicados.extend((p[0], liq) for p, (_, _, _, liq) in zip(lote, regioes))
+        for (_, texto, chave, prompt), (_, tam, bloco, _) in zip(lote, regioes):
+            if prompt is None:
+                self._parciais[chave] = (texto, tam, bloco)
+            else:
+                self._parciais.pop(chave, None)
+        return lote, regioes, antigos, confiavel
+
+    def descarregar(self, tentativas: int = 3) -> list:
+        """
+        Grava tudo num batchUpdate — com as parciais agendadas — e confere;
+        devolve [(chave, texto, ok)] das respostas finais.
+        """
+        if not self._pendentes:
+            return []
+
+        itens = self._pendentes + [(e, c, chave, None)
+                                   for chave, (e, c) in self._agendadas.items()]
+        self._agendadas = {}
+        lote, regioes, antigos, confiavel = self._aplicar(itens, tentativas)
+        self._pendentes, self._t_primeiro = [], None
+
+        with etapa("verificacao"):
+            oks = self._conferir(lote, regioes, antigos, confiavel)
+        return [(chave, texto, ok) for (_, texto, chave, prompt), ok in zip(lote, oks)
+                if prompt is not None]
+
+    def _conferir(self, lote: list, regioes: list, antigos: list, confiavel: bool) -> list:
+        """ok de cada item do lote já gravado (parcial: sempre); atualiza o espelho."""
+        oks = [True] * len(lote)
+        if not confiavel:
+            # Índices finais das regiões depois de TODO o lote aplicado
+            finais = []
+            for k, (ini, tam, _, _) in enumerate(regioes):
+                acima = sum(liq for i2, _, _, liq in regioes[k + 1:] if i2 <= ini)
+                finais.append((ini + acima, ini + acima + tam))
+            ks = [k for k, p in enumerate(lote) if p[3] is not None]
+            _, lidos = ler_regioes(self.svc, self.doc_id, [finais[k] for k in ks])
+            for k, lido in zip(ks, lidos):
+                oks[k] = lido.strip() == regioes[k][2].strip()
+
+        # Espelho: mesma ordem decrescente do lote; confere que cada bloco
+        # cai logo depois do próprio prompt (pega erro de deslocamento)
+        if self.espelho is not None:
+            for k, ((_, _, _, prompt), (ini, _, bloco, _)) in enumerate(zip(lote, regioes)):
+                if confiavel and prompt is not None:
+                    antes  = self.espelho.trecho(ini - tamanho_docs(prompt) - 8, ini)
+                    oks[k] = prompt.strip() in antes
+                self._espelhar(ini, antigos[k][1] if antigos[k] else 0, bloco)
+        return oks
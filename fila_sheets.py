@@ -0,0 +1,132 @@
+# fila_sheets.py
+"""
+► Fila de prompts no Google Sheets (aba "Fila"), com status:
+  Pendente • Em Processo • Concluído • Erro.
+► Cada prompt sabe a própria linha (tirada da resposta do append); os
+  status são anotados em memória e gravados em lote.
+► Lote de documentos: uma planilha só, com a aba "Documentos" (progresso
+  de cada doc) e uma aba de fila por doc ("Doc01", "Doc02"…).
+► Fila de trabalho distribuída (fila_trabalho.py): a mesma aba "Fila"
+  com as colunas da posse (Trabalhador, Validade…) e da resposta.
+"""
+
+import re
+import time
+import webbrowser
+
+CABECALHO_FILA = ["Prompt", "Status", "Timestamp", "Observação"]
+CABECALHO_TRABALHO = CABECALHO_FILA + ["Trabalhador", "Validade", "Tentativas", "Doc",
+                                       "Sala", "Resposta"]
+CABECALHO_DOCS = ["Documento", "Link", "Status", "Concluídos", "Erros", "Prompts",
+                  "Timestamp"]
+
+
+# ---------- GOOGLE SHEETS -------------------------------------------
+def _criar_planilha(sheets_svc, titulo: str, cabecalhos: dict, abrir_no_navegador: bool):
+    """Cria a planilha com uma aba por chave de `cabecalhos` e grava a 1ª linha de cada."""
+    planilha = sheets_svc.spreadsheets().create(body={
+        "properties": {"title": titulo},
+        "sheets": [{"properties": {"title": aba}} for aba in cabecalhos]
+    }).execute()
+
+    sheet_id = planilha["spreadsheetId"]
+    url = f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+
+    # Cabeçalhos
+    sheets_svc.spreadsheets().values().batchUpdate(
+        spreadsheetId=sheet_id,
+        body={
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{aba}!A1", "values": [cab]}
+                     for aba, cab in cabecalhos.items()]
+        }
+    ).execute()
+
+    if abrir_no_navegador:
+        webbrowser.open_new_tab(url)
+    return sheet_id, url
+
+
+def criar_planilha_fila(sheets_svc, abrir_no_navegador: bool = False):
+    return _criar_planilha(sheets_svc, "Fila de Prompts", {"Fila": CABECALHO_FILA},
+                           abrir_no_navegador)
+
+
+def criar_planilha_trabalho(sheets_svc, abrir_no_navegador: bool = False):
+    return _criar_planilha(sheets_svc, "Fila de Trabalho", {"Fila": CABECALHO_TRABALHO},
+                           abrir_no_navegador)
+
+
+def criar_planilha_lote(sheets_svc, n_docs: int, abrir_no_navegador: bool = False):
+    """(sheet_id, url, [aba da fila de cada doc]) para um lote de `n_docs`."""
+    abas = [f"Doc{k + 1:02d}" for k in range(n_docs)]
+    cab  = {"Documentos": CABECALHO_DOCS, **{a: CABECALHO_FILA for a in abas}}
+    sheet_id, url = _criar_planilha(sheets_svc, "Fila de Prompts (lote)", cab,
+                                    abrir_no_navegador)
+    return sheet_id, url, abas
+
+
+def gravar_documentos(sheets_svc, sheet_id, linhas: dict):
+    """`linhas` = {nº do doc (0…): [nome, link, status, concluídos, erros, prompts]}."""
+    if not linhas:
+        return
+    agora = time.strftime("%Y-%m-%d %H:%M:%S")
+    sheets_svc.spreadsheets().values().batchUpdate(
+        spreadsheetId=sheet_id,
+        body={
+            "valueInputOption": "RAW",
+            "data": [{"range": f"Documentos!A{k + 2}:G{k + 2}", "values": [v + [agora]]}
+                     for k, v in sorted(linhas.items())]
+        }
+    ).execute()
+
+
+def acrescentar_linhas(sheets_svc, sheet_id, aba: str, linhas: list[list]) -> list[int]:
+    """Um `append` com `linhas`; devolve o nº de cada uma na planilha (mesma ordem)."""
+    if not linhas:
+        return []
+    resp = sheets_svc.spreadsheets().values().append(
+        spreadsheetId=sheet_id,
+        range=f"{aba}!A:{chr(64 + max(map(len, linhas)))}",
+        valueInputOption="RAW",
+        body={"values": linhas}
+    ).execute()
+
+    # updatedRange = "Fila!A2:D11"
+    primeira = int(re.search(r"![A-Z]+(\d+)", resp["updates"]["updatedRange"]).group(1))
+    return [primeira + k for k in range(len(linhas))]
+
+
+def registrar_prompts_iniciais(sheets_svc, sheet_id, lista_prompts,
+                               aba: str = "Fila") -> list[int]:
+    """
+    Recebe a lista de prompts (google_docs.Prompt ou (end_idx, prompt_txt))
+    e grava todos na planilha como Pendente.
+    Devolve a linha de cada prompt (mesma ordem), tirada da resposta do append —
+    vale mesmo com textos de prompt repetidos.
+    """
+    linhas = [[txt, "Pendente",
+               time.strftime("%Y-%m-%d %H:%M:%S"), ""]
+              for _, txt, *_ in lista_prompts]
+    return acrescentar_linhas(sheets_svc, sheet_id, aba, linhas)
+
+
+def atualizar_status(pendentes: dict, linha: int,
+                     novo_status, observacao: str = ""):
+    """Anota o status da linha; `gravar_status` manda tudo numa chamada só."""
+    pendentes[linha] = [novo_status, time.strftime("%Y-%m-%d %H:%M:%S"), observacao]
+
+
+def gravar_status(sheets_svc, sheet_id, pendentes: dict, aba: str = "Fila"):
+    """Um `values().batchUpdate` com o último status anotado de cada linha."""
+    if not pendentes:
+        return
+    sheets_svc.spreadsheets().values().batchUpdate(
+        spreadsheetId=sheet_id,
+        body={
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{aba}!B{l}:D{l}", "values": [v]}
+                     for l, v in sorted(pendentes.items())]
+        }
+    ).execute()
+    pendentes.clear()
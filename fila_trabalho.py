@@ -0,0 +1,565 @@
+# fila_trabalho.py
+"""
+► Fila de trabalho distribuída: vários trabalhadores — cada um com o
+  próprio navegador, em máquinas diferentes — atendem os prompts de um
+  documento numa fila comum; o coordenador (o motor de sempre) recebe as
+  respostas e grava no doc.
+► Posse por concessão (lease): quem pega uma linha Pendente grava nela o
+  próprio ID e uma validade, renova enquanto o chat gera e, se falhar,
+  solta a linha (volta a Pendente; Erro depois de `TENTATIVAS_MAX`).
+  Validade vencida = o trabalhador caiu: a linha pode ser pega de novo.
+► O coordenador que desiste de um prompt (`LIMITE_RESPOSTA`) cancela a
+  linha (Erro); a resposta só é gravada por quem ainda tem a posse, então
+  o que chega depois do cancelamento é descartado.
+► Duas implementações, mesma interface (publicar, pegar, renovar,
+  concluir, soltar, cancelar, situacao):
+    • `FilaSheets` – a aba "Fila" da planilha (as colunas de status de
+      sempre + Trabalhador, Validade, Tentativas, Doc, Sala, Resposta).
+      O Sheets não tem compare-and-set: a busca lê só as colunas de
+      status e posse, numa janela de `JANELA_LINHAS` a partir da 1ª linha
+      não terminada; a linha escolhida é relida logo antes de gravar a
+      posse (comparação) e depois de `CONFIRMAR_SEG` — fica com ela quem
+      vê o próprio ID e a própria validade, o outro cede. A resposta só é
+      gravada por quem ainda tem a posse; se mesmo assim dois gerarem o
+      mesmo prompt, uma resposta só vai à planilha;
+    • `FilaSQLite` – um arquivo SQLite (testes, ou máquinas com disco
+      compartilhado); a posse é atômica.
+► `BackendFila` é o lado do coordenador: um backend como os de
+  backends.py em que responder = publicar o prompt e esperar a resposta
+  de algum trabalhador. `trabalhar` é o lado do trabalhador.
+► Consultas: as abas ociosas de um trabalhador fazem UMA consulta comum
+  (por sala) e, com a fila vazia, esperam cada vez mais, até
+  `INTERVALO_MAX_SEG`; o coordenador também espaça as consultas enquanto
+  nada termina — poucos trabalhadores não estouram a cota de leitura do
+  Sheets (60/min por usuário).
+► Sala: o coordenador pode pedir uma sala (link do chat) por linha; o
+  trabalhador só pega linhas sem sala ou de uma sala que ele tem aberta.
+  Prompts de um mesmo `grupo` saem em ordem, mas não na mesma conversa.
+"""
+
+import os
+import re
+import time
+import random
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from fila_sheets import acrescentar_linhas
+from pool_abas import Controle
+from medicao import dormir
+from limites_api import espera_backoff
+
+PENDENTE, EM_PROCESSO, CONCLUIDO, ERRO = "Pendente", "Em Processo", "Concluído", "Erro"
+
+LEASE_SEG         = 120      # validade da posse; renovada a cada 1/3 disso
+CONFIRMAR_SEG     = 1.5      # Sheets: espera antes de reler a linha pega
+INTERVALO_SEG     = 3.0      # fila vazia / coordenador: de quanto em quanto consulta…
+INTERVALO_MAX_SEG = 30.0     # …espaçando até N s enquanto nada muda
+JANELA_LINHAS     = 200      # Sheets: linhas lidas por consulta de linhas livres
+TENTATIVAS_MAX    = 3        # soltas por falha antes de virar Erro
+LIMITE_RESPOSTA   = 1800     # coordenador desiste do prompt depois de N s
+CELULA_MAX        = 45000    # Sheets: até 50 mil caracteres por célula
+EXT_SQLITE        = (".sqlite3", ".sqlite", ".db")
+
+
+class Tarefa(NamedTuple):
+    linha:       int
+    prompt:      str
+    sala:        str
+    doc:         str
+    trabalhador: str
+    tentativa:   int
+
+
+def _agora_txt() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+# ---------- SQLITE --------------------------------------------------
+class FilaSQLite:
+    def __init__(self, caminho: str = "fila_trabalho.sqlite3",
+                 tentativas_max: int = TENTATIVAS_MAX):
+        self.tentativas_max = tentativas_max
+        self._trava         = threading.Lock()
+        self.db             = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS fila (
+                    linha       INTEGER PRIMARY KEY AUTOINCREMENT,
+                    prompt      TEXT NOT NULL,
+                    status      TEXT NOT NULL,
+                    atualizado  TEXT NOT NULL,
+                    observacao  TEXT NOT NULL DEFAULT '',
+                    trabalhador TEXT NOT NULL DEFAULT '',
+                    validade    REAL NOT NULL DEFAULT 0,
+                    tentativas  INTEGER NOT NULL DEFAULT 0,
+                    doc         TEXT NOT NULL DEFAULT '',
+                    sala        TEXT NOT NULL DEFAULT '',
+                    resposta    TEXT
+                )""")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_status ON fila(status)")
+
+    def publicar(self, itens: list[tuple[str, str, str]]) -> list[int]:
+        """`itens` = [(doc, prompt, sala)] → nº da linha de cada um."""
+        with self._trava, self.db:
+            return [self.db.execute(
+                "INSERT INTO fila (prompt, status, atualizado, doc, sala) VALUES (?, ?, ?, ?, ?)",
+                (prompt, PENDENTE, _agora_txt(), doc, sala)).lastrowid
+                for doc, prompt, sala in itens]
+
+    def pegar(self, trabalhador: str, salas=("",), duracao: float = LEASE_SEG) -> Tarefa | None:
+        """Pega a 1ª linha livre (ou de posse vencida) de uma das `salas`."""
+        salas = list(salas)
+        livre = (f"(status = ? OR (status = ? AND validade < ?)) "
+                 f"AND sala IN ({','.join('?' * len(salas))})")
+        with self._trava:
+            for _ in range(5):                  # outro processo pode levar a linha antes
+                agora = time.time()
+                row   = self.db.execute(
+                    f"SELECT linha, prompt, sala, doc, tentativas FROM fila WHERE {livre} "
+                    f"ORDER BY linha LIMIT 1", (PENDENTE, EM_PROCESSO, agora, *salas)).fetchone()
+                if row is None:
+                    return None
+                with self.db:
+                    cur = self.db.execute(
+                        f"UPDATE fila SET status = ?, atualizado = ?, observacao = '', "
+                        f"trabalhador = ?, validade = ?, tentativas = tentativas + 1 "
+                        f"WHERE linha = ? AND {livre}",
+                        (EM_PROCESSO, _agora_txt(), trabalhador, agora + duracao, row[0],
+                         PENDENTE, EM_PROCESSO, agora, *salas))
+                if cur.rowcount == 1:
+                    return Tarefa(row[0], row[1], row[2], row[3], trabalhador, row[4] + 1)
+        return None
+
+    def renovar(self, t: Tarefa, duracao: float = LEASE_SEG) -> bool:
+        """Estende a posse; False se a linha já não é deste trabalhador."""
+        with self._trava, self.db:
+            return self.db.execute(
+                "UPDATE fila SET validade = ? WHERE linha = ? AND trabalhador = ? AND status = ?",
+                (time.time() + duracao, t.linha, t.trabalhador, EM_PROCESSO)).rowcount == 1
+
+    def concluir(self, t: Tarefa, html: str) -> bool:
+        """Grava a resposta; False se a linha já não é deste trabalhador (cancelada, repassada)."""
+        with self._trava, self.db:
+            return self.db.execute(
+                "UPDATE fila SET status = ?, atualizado = ?, observacao = '', resposta = ? "
+                "WHERE linha = ? AND trabalhador = ? AND status = ?",
+                (CONCLUIDO, _agora_txt(), html, t.linha, t.trabalhador, EM_PROCESSO)).rowcount == 1
+
+    def soltar(self, t: Tarefa, motivo: str):
+        """Devolve a linha à fila (ou Erro, esgotadas as tentativas)."""
+        status = ERRO if t.tentativa >= self.tentativas_max else PENDENTE
+        with self._trava, self.db:
+            self.db.execute(
+                "UPDATE fila SET status = ?, atualizado = ?, observacao = ?, trabalhador = '', "
+                "validade = 0 WHERE linha = ? AND trabalhador = ? AND status = ?",
+                (status, _agora_txt(), motivo, t.linha, t.trabalhador, EM_PROCESSO))
+
+    def cancelar(self, linha: int, motivo: str):
+        """Coordenador desistiu: Erro, e ninguém mais pega nem conclui a linha."""
+        with self._trava, self.db:
+            self.db.execute(
+                "UPDATE fila SET status = ?, atualizado = ?, observacao = ?, trabalhador = '', "
+                "validade = 0 WHERE linha = ? AND status != ?",
+                (ERRO, _agora_txt(), motivo, linha, CONCLUIDO))
+
+    def situacao(self, linhas: list[int]) -> dict:
+        """{linha: (Concluído, html) ou (Erro, motivo)} das `linhas` que terminaram."""
+        fim = {}
+        with self._trava:
+            for k in range(0, len(linhas), 500):
+                parte = linhas[k:k + 500]
+                for linha, status, obs, html in self.db.execute(
+                        f"SELECT linha, status, observacao, resposta FROM fila "
+                        f"WHERE linha IN ({','.join('?' * len(parte))}) AND status IN (?, ?)",
+                        (*parte, CONCLUIDO, ERRO)):
+                    fim[linha] = (status, html if status == CONCLUIDO else obs)
+        return fim
+
+    def fechar(self):
+        self.db.close()
+
+# ---------- GOOGLE SHEETS -------------------------------------------
+def _celulas(row: list, n: int) -> list:
+    return list(row) + [""] * (n - len(row))
+
+
+class FilaSheets:
+    """A aba `aba` de uma planilha criada por `fila_sheets.criar_planilha_trabalho`."""
+
+    def __init__(self, sheets_svc, sheet_id: str, aba: str = "Fila",
+                 tentativas_max: int = TENTATIVAS_MAX, confirmar: float = CONFIRMAR_SEG):
+        self.sheets_svc     = sheets_svc
+        self.sheet_id       = sheet_id
+        self.aba            = aba
+        self.tentativas_max = tentativas_max
+        self.confirmar      = confirmar
+        self._inicio        = 2                    # 1ª linha que pode não ter terminado
+        self._trava         = threading.Lock()     # as abas deste processo pegam uma de cada vez
+
+    def _valores(self):
+        """Recurso pedido a cada chamada: o serviço escolhe o cliente da thread."""
+        return self.sheets_svc.spreadsheets().values()
+
+    def _ler(self, faixa: str) -> list[list]:
+        return self._valores().get(spreadsheetId=self.sheet_id, range=f"{self.aba}!{faixa}",
+                            valueRenderOption="UNFORMATTED_VALUE").execute().get("values", [])
+
+    def _gravar(self, faixas: dict):
+        self._valores().batchUpdate(spreadsheetId=self.sheet_id, body={
+            "valueInputOption": "RAW",
+            "data": [{"range": f"{self.aba}!{f}", "values": [v]} for f, v in faixas.items()]
+        }).execute()
+
+    def _posse(self, linha: int) -> tuple[str, str, float]:
+        """(status, trabalhador, validade) atuais da linha."""
+        status, _, _, dono, validade = _celulas((self._ler(f"B{linha}:F{linha}") or [[]])[0], 5)
+        return status, dono, float(validade or 0)
+
+    def _livres(self, salas, agora: float) -> list[tuple[int, int, tuple]]:
+        """
+        [(linha, tentativas, posse lida)] livres das `salas`, lendo só
+        status, posse e sala, uma janela de linhas de cada vez.
+        """
+        a = self._inicio
+        while True:
+            b      = a + JANELA_LINHAS - 1
+            faixas = [f"{self.aba}!{c}{a}:{d}{b}" for c, d in (("B", "B"), ("E", "G"), ("I", "I"))]
+            status, posse, sala = (v.get("values", []) for v in self._valores().batchGet(
+                spreadsheetId=self.sheet_id, ranges=faixas,
+                valueRenderOption="UNFORMATTED_VALUE").execute()["valueRanges"])
+            livres = []
+            for k, row in enumerate(status):
+                st = _celulas(row, 1)[0]
+                if a + k == self._inicio and st in (CONCLUIDO, ERRO):
+                    self._inicio += 1                   # terminada não volta: não relê mais
+                    continue
+                dono, validade, tent = _celulas(posse[k] if k < len(posse) else [], 3)
+                validade = float(validade or 0)
+                if _celulas(sala[k] if k < len(sala) else [], 1)[0] in salas and (
+                        st == PENDENTE or (st == EM_PROCESSO and validade < agora)):
+                    livres.append((a + k, int(float(tent or 0)), (st, dono, validade)))
+            if livres or len(status) < JANELA_LINHAS:
+                return livres
+            a = b + 1
+
+    def publicar(self, itens: list[tuple[str, str, str]]) -> list[int]:
+        return acrescentar_linhas(self.sheets_svc, self.sheet_id, self.aba,
+                                  [[prompt, PENDENTE, _agora_txt(), "", "", 0, 0, doc, sala]
+                                   for doc, prompt, sala in itens])
+
+    def pegar(self, trabalhador: str, salas=("",), duracao: float = LEASE_SEG) -> Tarefa | None:
+        """
+        Grava a posse numa linha livre (sorteada entre as primeiras, para
+        trabalhadores diferentes não disputarem a mesma): relê a linha logo
+        antes de gravar — se mudou desde a busca, outro pegou — e depois de
+        `confirmar` s; só fica com ela se o ID e a validade são os seus.
+        """
+        with self._trava:
+            for _ in range(3):
+                livres = self._livres(salas, time.time())
+                if not livres:
+                    return None
+                linha, tent, lida = random.choice(livres[:8])
+                if self._posse(linha) != lida:
+                    continue                            # pega no meio do caminho
+                validade = round(time.time() + duracao, 2)
+                self._gravar({f"B{linha}:G{linha}": [EM_PROCESSO, _agora_txt(), "", trabalhador,
+                                                     validade, tent + 1]})
+                dormir(self.confirmar, "posse_fila")
+                prompt, status, _, _, dono, val, _, doc, sala = _celulas(
+                    (self._ler(f"A{linha}:I{linha}") or [[]])[0], 9)
+                if (status, dono, float(val or 0)) == (EM_PROCESSO, trabalhador, validade):
+                    return Tarefa(linha, prompt, sala, doc, trabalhador, tent + 1)
+                # outro gravou depois: a linha é dele, esta aba cede
+        return None
+
+    def renovar(self, t: Tarefa, duracao: float = LEASE_SEG) -> bool:
+        dono, _ = _celulas((self._ler(f"E{t.linha}:F{t.linha}") or [[]])[0], 2)
+        if dono != t.trabalhador:
+            return False
+        self._gravar({f"F{t.linha}": [round(time.time() + duracao, 2)]})
+        return True
+
+    def _dono(self, linha: int) -> tuple[str, str]:
+        """(status, trabalhador) atuais da linha."""
+        status, _, _, dono = _celulas((self._ler(f"B{linha}:E{linha}") or [[]])[0], 4)
+        return status, dono
+
+    def concluir(self, t: Tarefa, html: str) -> bool:
+        if self._dono(t.linha) != (EM_PROCESSO, t.trabalhador):
+            return False                            # cancelada ou repassada
+        partes = [html[k:k + CELULA_MAX] for k in range(0, len(html), CELULA_MAX)] or [""]
+        self._gravar({f"B{t.linha}:D{t.linha}": [CONCLUIDO, _agora_txt(), ""],
+                      f"J{t.linha}": partes})
+        return True
+
+    def soltar(self, t: Tarefa, motivo: str):
+        if _celulas((self._ler(f"E{t.linha}") or [[]])[0], 1)[0] != t.trabalhador:
+            return                                  # a posse venceu e outro pegou
+        status = ERRO if t.tentativa >= self.tentativas_max else PENDENTE
+        self._gravar({f"B{t.linha}:F{t.linha}": [status, _agora_txt(), motivo, "", 0]})
+
+    def cancelar(self, linha: int, motivo: str):
+        if self._dono(linha)[0] != CONCLUIDO:
+            self._gravar({f"B{linha}:F{linha}": [ERRO, _agora_txt(), motivo, "", 0]})
+
+    def situacao(self, linhas: list[int]) -> dict:
+        if not linhas:
+            return {}
+        fim, prontas, linhas = {}, [], set(linhas)
+        a = min(linhas)
+        for k, row in enumerate(self._ler(f"B{a}:D{max(linhas)}")):
+            status, _, obs = _celulas(row, 3)
+            if a + k not in linhas:
+                continue
+            if status == CONCLUIDO:
+                prontas.append(a + k)
+            elif status == ERRO:
+                fim[a + k] = (ERRO, obs)
+        if prontas:
+            a = min(prontas)
+            for k, row in enumerate(self._ler(f"J{a}:ZZ{max(prontas)}")):
+                if a + k in prontas:
+                    fim[a + k] = (CONCLUIDO, "".join(map(str, row)))
+            for linha in prontas:                   # resposta vazia: a API corta a linha
+                fim.setdefault(linha, (CONCLUIDO, ""))
+        return fim
+
+
+def abrir_fila(endereco: str, sheets_svc=None):
+    """Arquivo .sqlite3/.db → `FilaSQLite`; link ou ID de planilha → `FilaSheets`."""
+    if endereco.endswith(EXT_SQLITE):
+        return FilaSQLite(endereco)
+    m = re.search(r"/spreadsheets/d/([A-Za-z0-9\-_]+)", endereco)
+    return FilaSheets(sheets_svc, m.group(1) if m else endereco)
+
+# ---------- COORDENADOR ---------------------------------------------
+class _Pedido:
+    def __init__(self, prompt: str, sala: str, doc: str):
+        self.prompt = prompt
+        self.sala   = sala
+        self.doc    = doc
+        self.linha  = None
+        self.html   = None
+        self.erro   = None
+        self.pronto = threading.Event()
+
+
+class BackendFila:
+    """
+    Backend do motor que responde pela fila: cada prompt vira uma linha
+    Pendente e a resposta vem do trabalhador que a pegar. Uma thread só
+    publica (em lote) e consulta a fila, seja qual for o nº de "abas" —
+    e de docs: o motor usa `para_doc(doc_id)`, que anota o doc na linha.
+    """
+    nome             = "fila distribuída"
+    concorrencia_max = 64           # prompts em aberto na fila (não são abas do chat)
+
+    def __init__(self, fila, origem: str = "", salas: list[str] = (),
+                 intervalo: float = INTERVALO_SEG, limite: float = LIMITE_RESPOSTA):
+        """`origem` vai na coluna Doc; `salas` (links) só para rotear os prompts."""
+        self.fila      = fila
+        self.origem    = origem
+        self.salas     = list(salas) or [""]
+        self.intervalo = intervalo
+        self.limite    = limite
+        self._novos    = []             # pedidos ainda não publicados
+        self._abertos  = {}             # linha → pedido publicado
+        self._cond     = threading.Condition()
+        self._thread   = None
+
+    def sala(self, n: int) -> str:
+        return self.salas[n % len(self.salas)]
+
+    def para_doc(self, doc: str) -> "_BackendFilaDoc":
+        return _BackendFilaDoc(self, doc)
+
+    @contextmanager
+    def sessao(self, n: int):
+        yield lambda prompt, ao_parcial=None, seguimento=False: \
+            self._responder(prompt, self.sala(n), self.origem)
+
+    def _responder(self, prompt: str, sala: str, doc: str) -> str:
+        pedido = _Pedido(prompt, sala, doc)
+        with self._cond:
+            self._novos.append(pedido)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        if not pedido.pronto.wait(self.limite):
+            motivo = f"nenhum trabalhador respondeu em {self.limite:.0f} s"
+            with self._cond:
+                self._abertos.pop(pedido.linha, None)
+                if pedido in self._novos:
+                    self._novos.remove(pedido)
+            if pedido.linha is not None:
+                try:
+                    self.fila.cancelar(pedido.linha, motivo)
+                except Exception:
+                    pass                        # fica Pendente: a resposta é ignorada
+            raise RuntimeError(motivo)
+        if pedido.erro:
+            raise RuntimeError(pedido.erro)
+        return pedido.html
+
+    def _rodar(self):
+        vazias = 0                                      # consultas seguidas sem nada terminado
+        while True:
+            with self._cond:
+                if not (self._novos or self._abertos):
+                    self._thread = None
+                    return
+                novos, self._novos = self._novos, []
+            if novos:
+                try:
+                    linhas = self.fila.publicar([(p.doc, p.prompt, p.sala) for p in novos])
+                except Exception as e:
+                    for p in novos:
+                        p.erro = f"não publicou na fila: {e}"
+                        p.pronto.set()
+                    continue
+                with self._cond:
+                    for linha, p in zip(linhas, novos):
+                        p.linha = linha
+                        self._abertos[linha] = p
+            with self._cond:
+                abertas = list(self._abertos)
+            try:
+                fim = self.fila.situacao(abertas) if abertas else {}
+            except Exception:
+                fim = {}                                # falha passageira: na próxima volta
+            vazias = 0 if fim or novos else vazias + 1
+            with self._cond:
+                for linha, (status, dado) in fim.items():
+                    p = self._abertos.pop(linha, None)
+                    if p is None:
+                        continue
+                    if status == CONCLUIDO:
+                        p.html = dado
+                    else:
+                        p.erro = dado or "erro no trabalhador"
+                    p.pronto.set()
+                if not self._novos:
+                    self._cond.wait(min(INTERVALO_MAX_SEG, self.intervalo * 2 ** min(vazias, 5)))
+
+class _BackendFilaDoc:
+    """`BackendFila` visto por um doc: mesma fila e mesma thread de consulta."""
+
+    def __init__(self, base: BackendFila, doc: str):
+        self.base             = base
+        self.doc              = doc
+        self.nome             = base.nome
+        self.salas            = base.salas
+        self.concorrencia_max = base.concorrencia_max
+
+    def sala(self, n: int) -> str:
+        return self.base.sala(n)
+
+    def para_doc(self, doc: str) -> "_BackendFilaDoc":
+        return self.base.para_doc(doc)
+
+    @contextmanager
+    def sessao(self, n: int):
+        yield lambda prompt, ao_parcial=None, seguimento=False: \
+            self.base._responder(prompt, self.sala(n), self.doc)
+
+# ---------- TRABALHADOR ---------------------------------------------
+class _Consulta:
+    """
+    Consulta à fila comum às abas de um trabalhador: uma aba por vez
+    consulta; com a fila vazia para aquelas salas, as outras nem consultam
+    até a espera (crescente) passar.
+    """
+
+    def __init__(self, fila, intervalo: float):
+        self.fila      = fila
+        self.intervalo = intervalo
+        self._vazias   = {}         # salas → (consultas vazias seguidas, monotonic da próxima)
+        self._trava    = threading.Lock()
+
+    def pegar(self, trabalhador: str, salas: tuple, duracao: float) -> tuple[Tarefa | None, float]:
+        """(tarefa, s até valer a pena consultar de novo)."""
+        with self._trava:
+            n, proxima = self._vazias.get(salas, (0, 0.0))
+            if time.monotonic() < proxima:
+                return None, proxima - time.monotonic()
+            t = self.fila.pegar(trabalhador, salas, duracao)
+            if t is not None:
+                self._vazias.pop(salas, None)
+                return t, 0.0
+            espera = espera_backoff(n, self.intervalo, INTERVALO_MAX_SEG)
+            self._vazias[salas] = (n + 1, time.monotonic() + espera)
+            return None, espera
+
+@contextmanager
+def _renovando(fila, t: Tarefa, duracao: float):
+    """Renova a posse de `t` em segundo plano enquanto o bloco roda."""
+    parar = threading.Event()
+
+    def renovar():
+        while not parar.wait(duracao / 3):
+            try:
+                if not fila.renovar(t, duracao):
+                    return                      # perdeu a posse: o `concluir` descarta
+            except Exception:
+                pass                            # tenta de novo no próximo ciclo
+    thread = threading.Thread(target=renovar, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        parar.set()
+
+
+def trabalhar(fila, backend, n_abas: int = 1, nome: str | None = None,
+              duracao: float = LEASE_SEG, intervalo: float = INTERVALO_SEG, log=print,
+              controle: Controle | None = None, ate_vazia: bool = False):
+    """
+    Atende a `fila` com `n_abas` sessões do `backend` até cancelar (ou,
+    com `ate_vazia`, até não haver linha para pegar). Cada aba tem o
+    próprio ID de trabalhador: "<nome>/<nº da aba>".
+    """
+    nome     = nome or f"{socket.gethostname()}-{os.getpid()}"
+    controle = controle or Controle()
+    consulta = _Consulta(fila, intervalo)
+
+    def aba(n: int):
+        eu = f"{nome}/{n + 1}"
+        try:
+            with backend.sessao(n) as responder:
+                while not controle.cancelado:
+                    t, espera = consulta.pegar(eu, ("", backend.sala(n)), duracao)
+                    if t is None:
+                        if ate_vazia:
+                            return
+                        controle.dormir(espera)
+                        continue
+                    log(f"→ [{eu}] linha {t.linha}: {t.prompt[:60]}…")
+                    try:
+                        with _renovando(fila, t, duracao):
+                            html = responder(t.prompt)
+                        if not fila.concluir(t, html):
+                            log(f"↷ [{eu}] linha {t.linha}: cancelada ou repassada — "
+                                "resposta descartada.")
+                            continue
+                    except Exception as e:
+                        log(f"⚠ [{eu}] linha {t.linha}: {e}")
+                        try:
+                            fila.soltar(t, str(e)[:200])
+                        except Exception:
+                            pass                # a posse vence e a linha volta sozinha
+                        continue
+                    log(f"✓ [{eu}] linha {t.linha}")
+        except Exception as e:
+            log(f"⚠ Aba {n + 1} indisponível: {e}")
+
+    threads = [threading.Thread(target=aba, args=(n,), daemon=True) for n in range(max(1, n_abas))]
+    for th in threads:
+        th.start()
+    for th in threads:
+        while th.is_alive():
+            th.join(0.5)                        # Ctrl+C chega à thread principal
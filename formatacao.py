@@ -0,0 +1,290 @@
+# formatacao.py
+"""
+► Formato "rica": a resposta vai ao Docs com a formatação do chat —
+  negrito, itálico, código, links, títulos e listas.
+► Uma passada sobre os eventos do `html.parser` monta o texto final e,
+  ao mesmo tempo, as faixas de estilo (já juntadas quando vizinhas e
+  iguais), os títulos e as listas. Daí sai UMA lista de requisições por
+  resposta, com índices já calculados:
+    1 insertText • 1 updateTextStyle base • 1 updateParagraphStyle base
+    • 1 updateTextStyle por faixa • 1 por título • 1 createParagraphBullets
+    por lista • 1 updateParagraphStyle por grupo de itens aninhados.
+  Tudo entra no mesmo batchUpdate do lote.
+► Listas aninhadas ficam no mesmo nível de marcador, recuadas pelo
+  parágrafo (o recuo por tab do Docs apagaria os tabs e mudaria o
+  tamanho inserido, que o escritor em lote precisa saber de antemão).
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+from escrita_docs import tamanho_docs
+
+PRETO        = {"color": {"rgbColor": {"red": 0, "green": 0, "blue": 0}}}
+AZUL_LINK    = {"color": {"rgbColor": {"red": 0.07, "green": 0.33, "blue": 0.8}}}
+ESTILO_BASE  = {
+    "weightedFontFamily": {"fontFamily": "Arial"},
+    "fontSize":           {"magnitude": 11, "unit": "PT"},
+    "bold":               False,
+    "italic":             False,
+    "foregroundColor":    PRETO,
+}
+# campos ausentes de ESTILO_BASE voltam ao padrão (tira link/sublinhado herdados)
+CAMPOS_BASE  = ("weightedFontFamily,fontSize,bold,italic,foregroundColor,"
+                "underline,strikethrough,link,backgroundColor")
+ESTILO_CODIGO = {"weightedFontFamily": {"fontFamily": "Courier New"},
+                 "fontSize":           {"magnitude": 10, "unit": "PT"}}
+
+INLINE = {
+    "strong": {"bold": True},
+    "b":      {"bold": True},
+    "em":     {"italic": True},
+    "i":      {"italic": True},
+    "del":    {"strikethrough": True},
+    "s":      {"strikethrough": True},
+    "code":   ESTILO_CODIGO,
+}
+TITULOS  = {f"h{n}": f"HEADING_{n}" for n in range(1, 7)}
+BLOCOS   = {"p", "div", "section", "article", "blockquote", "li", "pre",
+            "tr", "ul", "ol", "table", "hr"} | set(TITULOS)
+IGNORAR  = {"script", "style", "button", "svg"}
+MARCADOR = {False: "BULLET_DISC_CIRCLE_SQUARE", True: "NUMBERED_DECIMAL_ALPHA_ROMAN"}
+RECUO_PT = 36
+_ESPACOS = re.compile(r"\s+")
+
+
+# ---------- CONVERSOR ÚNICO -----------------------------------------
+class ConversorDocs(HTMLParser):
+    """
+    Depois de `feed` + `close`: `texto` (como fica no Docs, sem marcadores
+    de lista) e, com índices relativos ao início do texto, `faixas`
+    [(ini, fim, estilo)], `titulos` [(ini, tipo)], `listas`
+    [(ini, fim, numerada)] e `itens` [(ini, nível)].
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._partes  = []
+        self.pos      = 0                 # em unidades UTF-16
+        self._ini_lin = 0
+        self._pilha   = []                # (tag, estilo) dos inline abertos
+        self._listas  = []                # (numerada, ini) das listas abertas
+        self._titulo  = None
+        self._pre     = 0
+        self._ignorar = 0
+        self._celula  = False
+        self.faixas   = []
+        self.titulos  = []
+        self.listas   = []
+        self.itens    = []
+
+    # ---- saída
+    def _estilo(self) -> dict:
+        est = {}
+        for _, e in self._pilha:
+            est.update(e)
+        if self._pre:
+            est.update(ESTILO_CODIGO)
+        return est
+
+    def _escrever(self, txt: str):
+        if not txt:
+            return
+        est = self._estilo()
+        n   = tamanho_docs(txt)
+        if est:
+            ult = self.faixas[-1] if self.faixas else None
+            if ult and ult[1] == self.pos and ult[2] == est:
+                ult[1] = self.pos + n
+            else:
+                self.faixas.append([self.pos, self.pos + n, est])
+        self._partes.append(txt)
+        self.pos += n
+        if txt.endswith("\n"):
+            self._ini_lin = self.pos
+
+    def _quebra(self):
+        if self._ini_lin < self.pos:
+            self._escrever("\n")
+
+    # ---- eventos
+    def handle_starttag(self, tag: str, attrs):
+        if tag in IGNORAR:
+            self._ignorar += 1
+            return
+        if self._ignorar:
+            return
+        if tag == "br":
+            self._escrever("\n")
+        elif tag == "a":
+            href = dict(attrs).get("href")
+            self._pilha.append((tag, {"link": {"url": href}, "underline": True,
+                                      "foregroundColor": AZUL_LINK} if href else {}))
+        elif tag in INLINE:
+            self._pilha.append((tag, INLINE[tag]))
+        elif tag in ("td", "th"):
+            if self._celula:
+                self._escrever("\t")
+            self._celula = True
+        elif tag in BLOCOS:
+            self._quebra()
+            if tag == "pre":
+                self._pre += 1
+            elif tag in ("ul", "ol"):
+                self._listas.append((tag == "ol", self.pos))
+            elif tag == "li" and self._listas:
+                self.itens.append((self.pos, len(self._listas) - 1))
+            elif tag in TITULOS:
+                self._titulo = (self.pos, TITULOS[tag])
+            elif tag == "tr":
+                self._celula = False
+
+    def handle_startendtag(self, tag: str, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in IGNORAR:
+            self._ignorar -= 1
+        elif tag == "a" or tag in INLINE:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str):
+        if tag in IGNORAR:
+            self._ignorar = max(0, self._ignorar - 1)
+            return
+        if self._ignorar:
+            return
+        if tag == "a" or tag in INLINE:
+            for k in range(len(self._pilha) - 1, -1, -1):
+                if self._pilha[k][0] == tag:
+                    del self._pilha[k]
+                    break
+            return
+        if tag not in BLOCOS:
+            return
+        if tag == "pre":
+            self._pre = max(0, self._pre - 1)
+            if self._partes and self._partes[-1].endswith("\n"):
+                self._desfazer_quebra()            # "\n" final do código
+        elif tag in ("ul", "ol") and self._listas:
+            numerada, ini = self._listas.pop()
+            if ini < self.pos:
+                self.listas.append((ini, self.pos, numerada))
+        elif tag in TITULOS and self._titulo:
+            self.titulos.append(self._titulo)
+            self._titulo = None
+        self._quebra()
+
+    def _desfazer_quebra(self):
+        """Tira o '\n' final (fim do <pre>, fim da resposta)."""
+        self._partes[-1] = self._partes[-1][:-1]
+        self.pos        -= 1
+        if self.faixas and self.faixas[-1][1] > self.pos:
+            self.faixas[-1][1] = self.pos
+            if self.faixas[-1][1] <= self.faixas[-1][0]:
+                self.faixas.pop()
+        texto         = "".join(self._partes)
+        self._ini_lin = tamanho_docs(texto[:texto.rfind("\n") + 1])
+
+    def handle_data(self, data: str):
+        if self._ignorar:
+            return
+        if self._pre:
+            self._escrever(data)
+            return
+        txt = _ESPACOS.sub(" ", data)
+        if self._ini_lin == self.pos or self._partes[-1].endswith((" ", "\t")):
+            txt = txt.lstrip()
+        self._escrever(txt)
+
+    def close(self):
+        super().close()
+        # sem "\n" no fim: o último parágrafo termina no '\n' do prompt
+        while self._partes and self._partes[-1].endswith("\n"):
+            self._desfazer_quebra()
+        fim = self.pos
+        self.listas  = [(a, min(b, fim), n) for a, b, n in self.listas if a < fim]
+        self.itens   = [(a, nv) for a, nv in self.itens if a < fim]
+        self.titulos = [(a, t) for a, t in self.titulos if a < fim]
+        self.faixas  = [f for f in self.faixas if f[0] < fim]
+
+    @property
+    def texto(self) -> str:
+        return "".join(self._partes)
+
+
+def converter(html: str) -> ConversorDocs:
+    conv = ConversorDocs()
+    conv.feed(html)
+    conv.close()
+    return conv
+
+
+def texto_docs(html: str) -> str:
+    """O texto exatamente como `requisicoes_rica` insere (sem o '\n' inicial)."""
+    return converter(html).texto
+
+
+def texto_para_html(texto: str) -> str:
+    """Texto puro (p.ex. de um diário antigo) → um <p> por linha."""
+    return "".join(f"<p>{escape(l)}</p>" for l in texto.split("\n"))
+
+# ---------- REQUISIÇÕES ---------------------------------------------
+def _faixa(a: int, b: int) -> dict:
+    return {"startIndex": a, "endIndex": b}
+
+
+def requisicoes_rica(insert_at: int, html: str) -> tuple[list, int]:
+    """
+    Como "uma_linha" (antes do '\n' do prompt, 1 quebra de linha), mas com
+    a formatação do HTML. Devolve (requisições, tamanho inserido).
+    """
+    posicao = max(1, insert_at - 1)
+    conv    = converter(html)
+    bloco   = "\n" + conv.texto
+    tam     = tamanho_docs(bloco)
+    base    = posicao + 1                     # início do texto da resposta
+    fim     = posicao + tam
+
+    reqs = [
+        {"insertText": {"location": {"index": posicao}, "text": bloco}},
+        {"updateTextStyle": {"range": _faixa(posicao, fim),
+                             "textStyle": ESTILO_BASE, "fields": CAMPOS_BASE}},
+    ]
+    if tam > 1:
+        reqs.append({"updateParagraphStyle": {
+            "range": _faixa(base, fim),
+            "paragraphStyle": {"namedStyleType": "NORMAL_TEXT"},
+            "fields": "namedStyleType,indentStart,indentFirstLine"}})
+
+    for a, b, est in conv.faixas:
+        reqs.append({"updateTextStyle": {"range": _faixa(base + a, base + b),
+                                         "textStyle": est,
+                                         "fields": ",".join(sorted(est))}})
+    for a, tipo in conv.titulos:
+        reqs.append({"updateParagraphStyle": {"range": _faixa(base + a, base + a + 1),
+                                              "paragraphStyle": {"namedStyleType": tipo},
+                                              "fields": "namedStyleType"}})
+
+    # de fora para dentro: a lista interna sobrescreve o trecho dela
+    for a, b, numerada in sorted(conv.listas, key=lambda l: (l[0], -l[1])):
+        reqs.append({"createParagraphBullets": {"range": _faixa(base + a, base + b),
+                                                "bulletPreset": MARCADOR[numerada]}})
+
+    # itens aninhados: recuo por parágrafo, itens vizinhos de mesmo nível juntos
+    grupos = []
+    for a, nivel in conv.itens:
+        if nivel and grupos and grupos[-1] and grupos[-1][2] == nivel:
+            grupos[-1][1] = a + 1
+        elif nivel:
+            grupos.append([a, a + 1, nivel])
+        else:
+            grupos.append(None)
+    for g in filter(None, grupos):
+        a, b, nivel = g
+        reqs.append({"updateParagraphStyle": {
+            "range": _faixa(base + a, base + b),
+            "paragraphStyle": {
+                "indentStart":     {"magnitude": RECUO_PT * (nivel + 1), "unit": "PT"},
+                "indentFirstLine": {"magnitude": RECUO_PT * nivel + RECUO_PT / 2, "unit": "PT"}},
+            "fields": "indentStart,indentFirstLine"}})
+    return reqs, tam
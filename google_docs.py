@@ -0,0 +1,247 @@
+# google_docs.py
+"""
+► Autenticação Google, leitura dos prompts !*! e montagem das requisições
+  que colam a resposta abaixo de cada prompt.
+► Os prompts saem de UMA passada pelo corpo (tabelas inclusive), com o
+  texto do parágrafo inteiro — todos os trechos de estilo — e o espelho
+  do texto usado depois na verificação. Diretivas opcionais logo após
+  o marcador, entre colchetes:
+      !*![sala=2; prioridade=alta; grupo=intro] texto do prompt
+    • sala       – nº (1 = 1º link do chat) ou o link da sala que responde;
+    • prioridade – número (2, 2.5) ou baixa/normal/alta: maiores saem antes;
+    • grupo      – prompts do mesmo grupo vão em sequência, na ordem do
+                   doc, na mesma aba (perguntas de seguimento).
+► Formatos de colagem:
+    • "duas_linhas" – bloco "\n\n" + resposta + "\n\n" após o prompt (main.py);
+    • "uma_linha"   – "\n" + resposta antes do '\n' do prompt, cor preta
+                      (code-create.py);
+    • "rica"        – como "uma_linha", mas mantém negrito, código, títulos e
+                      listas do chat (formatacao.py); recebe o HTML.
+"""
+
+import os
+import re
+import math
+from typing import NamedTuple
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from google_auth_oauthlib.flow import InstalledAppFlow
+
+from escrita_docs import tamanho_docs, EspelhoDoc
+from formatacao import requisicoes_rica
+
+SCOPES_DOCS = ["https://www.googleapis.com/auth/documents"]
+SCOPES_FILA = [
+    "https://www.googleapis.com/auth/documents",
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+
+# ---------- GOOGLE DOCS ---------------------------------------------
+def autenticar_google(scopes: list[str], credenciais: str | None = None,
+                      token: str = "token.json"):
+    """
+    Usa `token` se existir — vencido, renova uma vez e regrava o arquivo;
+    senão roda o fluxo OAuth com o arquivo `credenciais` (credentials.json).
+    Sem nenhum dos dois devolve None — cabe ao front-end pedir o arquivo.
+    """
+    if os.path.exists(token):
+        try:
+            creds = Credentials.from_authorized_user_file(token, scopes)
+        except Exception:
+            os.remove(token)
+        else:
+            if creds.valid:
+                return creds
+            if creds.refresh_token:
+                try:
+                    creds.refresh(Request())
+                    open(token, "w").write(creds.to_json())
+                    return creds
+                except Exception:
+                    pass                            # revogado: login de novo
+
+    if not credenciais:
+        return None
+
+    flow  = InstalledAppFlow.from_client_secrets_file(credenciais, scopes)
+    creds = flow.run_local_server(port=0)
+    open(token, "w").write(creds.to_json())
+    return creds
+
+
+def extrair_document_id(url: str | None):
+    m = re.search(r"/d/([A-Za-z0-9\-_]+)", url or "")
+    return m.group(1) if m else None
+
+
+MARCADOR    = "!*!"
+PRIORIDADES = {"baixa": -1, "normal": 0, "alta": 1}
+_DIRETIVAS  = re.compile(r"\[([^\]]*)\]\s*")
+
+
+class Prompt(NamedTuple):
+    fim:        int                 # endIndex do parágrafo
+    texto:      str                 # sem o !*! e sem as diretivas
+    inicio:     int = 0             # startIndex do parágrafo
+    sala:       str | None = None
+    prioridade: float = 0
+    grupo:      str | None = None
+    fim_bloco:  bool = False        # último parágrafo do corpo ou da célula
+    abaixo:     str = ""            # 1º texto logo abaixo (até 2 parágrafos, mesmo bloco)
+
+
+def ler_diretivas(txt: str) -> tuple[dict, str]:
+    """
+    ({chave: valor}, resto) de "[sala=2; grupo=a] resto". Colchetes que não
+    são só diretivas conhecidas (p.ex. "[Tabela 3]") ficam no texto.
+    """
+    m = _DIRETIVAS.match(txt)
+    if not m:
+        return {}, txt
+    opcoes = {}
+    for item in filter(None, (x.strip() for x in re.split(r"[;,]", m.group(1)))):
+        par = re.fullmatch(r"(\w+)\s*[=:]\s*(.+)", item)
+        if not par:
+            return {}, txt
+        chave, valor = par.group(1).lower(), par.group(2).strip()
+        chave = {"prio": "prioridade", "aba": "sala"}.get(chave, chave)
+        if chave not in ("sala", "prioridade", "grupo"):
+            return {}, txt
+        if chave == "prioridade":
+            try:
+                valor = PRIORIDADES[valor.lower()] if valor.lower() in PRIORIDADES else float(valor)
+            except ValueError:
+                return {}, txt
+            if not math.isfinite(valor):
+                return {}, txt
+        opcoes[chave] = valor
+    return (opcoes, txt[m.end():]) if opcoes else ({}, txt)
+
+
+def _texto_paragrafo(par: dict, espelho: EspelhoDoc) -> str:
+    partes = []
+    for e in par.get("elements", []):
+        txt = e.get("textRun", {}).get("content")
+        if txt is not None:
+            partes.append(txt)
+            if "startIndex" in e:
+                espelho.escrever(e["startIndex"], txt)
+    return "".join(partes)
+
+
+def _abaixo(textos: list, k: int) -> str:
+    for txt in textos[k + 1:k + 3]:
+        if txt is None:                 # tabela: fora do bloco do prompt
+            return ""
+        if txt:
+            return txt
+    return ""
+
+
+def _varrer(conteudo: list, prompts: list, espelho: EspelhoDoc):
+    textos = [_texto_paragrafo(el["paragraph"], espelho).strip() if "paragraph" in el
+              else None for el in conteudo]
+    for k, el in enumerate(conteudo):
+        txt = textos[k]
+        if txt and txt.startswith(MARCADOR):
+            opcoes, txt = ler_diretivas(txt[len(MARCADOR):].lstrip())
+            prompts.append(Prompt(el["endIndex"], txt.strip(), el.get("startIndex", 0),
+                                  fim_bloco=k == len(conteudo) - 1,
+                                  abaixo=_abaixo(textos, k), **opcoes))
+        for linha in el.get("table", {}).get("tableRows", []):
+            for cel in linha.get("tableCells", []):
+                _varrer(cel.get("content", []), prompts, espelho)
+
+
+def indexar_documento(body: list) -> tuple[list[Prompt], EspelhoDoc]:
+    """Prompts (na ordem do doc) e espelho do texto, numa passada só."""
+    prompts, espelho = [], EspelhoDoc()
+    _varrer(body, prompts, espelho)
+    return prompts, espelho
+
+
+def tem_resposta(p: Prompt) -> bool:
+    """Há texto (que não é outro prompt) logo abaixo do prompt?"""
+    return bool(p.abaixo) and not p.abaixo.startswith(MARCADOR)
+
+
+def coletar_prompts(body: list) -> list[Prompt]:
+    """[Prompt(endIndex do parágrafo, texto do prompt sem o !*!, …), …]"""
+    return indexar_documento(body)[0]
+
+# ---------- INSERE NO DOCS ------------------------------------------
+def requisicoes_duas_linhas(insert_at: int, texto_puro: str) -> tuple[list, int]:
+    """Requisições (inserção + estilo) de uma resposta em `insert_at`."""
+    bloco = "\n\n" + texto_puro + "\n\n"
+    tam   = tamanho_docs(bloco)
+    return [
+        {"insertText": {"location": {"index": insert_at}, "text": bloco}},
+        {"updateTextStyle": {
+            "range": {"startIndex": insert_at, "endIndex": insert_at + tam},
+            "textStyle": {
+                "weightedFontFamily": {"fontFamily": "Arial"},
+                "fontSize": {"magnitude": 11, "unit": "PT"},
+                "bold": False,
+                "italic": False},
+            "fields": "weightedFontFamily,fontSize,bold,italic"}}
+    ], tam
+
+
+def requisicoes_uma_linha(insert_at: int, texto_puro: str) -> tuple[list, int]:
+    """
+    Requisições da resposta logo após o prompt, com no máximo 1 linha de espaço.
+    • Move o ponto de inserção 1 caractere para trás (antes do '\n' do prompt).
+    • Adiciona APENAS 1 quebra de linha após o prompt e 1 no final da resposta.
+    • Fonte Arial 11 pt, cor preta, sem bold/itálico.
+    """
+    posicao = max(1, insert_at - 1)          # ← antes do '\n' do prompt
+    bloco   = "\n" + texto_puro       # ← 1 antes, 1 depois
+    tam     = tamanho_docs(bloco)
+
+    return [
+        {"insertText": {
+            "location": {"index": posicao},
+            "text": bloco
+        }},
+        {"updateTextStyle": {
+            "range": {"startIndex": posicao, "endIndex": posicao + tam},
+            "textStyle": {
+                "weightedFontFamily": {"fontFamily": "Arial"},
+                "fontSize": {"magnitude": 11, "unit": "PT"},
+                "bold": False,
+                "italic": False,
+                "foregroundColor": {
+                    "color": {"rgbColor": {"red": 0, "green": 0, "blue": 0}}
+                }
+            },
+            "fields": ("weightedFontFamily,fontSize,"
+                       "bold,italic,foregroundColor")
+        }}
+    ], tam
+
+
+MONTADORES = {
+    "duas_linhas": requisicoes_duas_linhas,
+    "uma_linha":   requisicoes_uma_linha,
+    "rica":        requisicoes_rica,
+}
+
+# Formatos cujo montador recebe o HTML da resposta em vez do texto puro
+ENTRADA_HTML = {"rica"}
+
+# Quanto recuar o endIndex do ÚLTIMO prompt: o fim do corpo não aceita
+# inserção. "uma_linha" já insere antes do '\n' e não precisa recuar.
+RECUO_FIM_DOC = {
+    "duas_linhas": 1,
+    "uma_linha":   0,
+    "rica":        0,
+}
+
+
+def inserir_resposta(svc, doc_id: str, insert_at: int, texto_puro: str,
+                     montar=requisicoes_uma_linha) -> int:
+    reqs, tam = montar(insert_at, texto_puro)
+    svc.documents().batchUpdate(documentId=doc_id, body={"requests": reqs}).execute()
+    return tam
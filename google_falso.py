@@ -0,0 +1,555 @@
+# google_falso.py
+"""
+► Google Docs, Sheets e Drive em memória, com a mesma superfície usada
+  pelo motor (`documents().get/batchUpdate`, `spreadsheets().create`,
+  `values().update/append/batchUpdate/get/batchGet`, `files().list` por
+  pasta e `changes().getStartPageToken/list` do Drive),
+  para medir e reproduzir execuções sem rede.
+► O Docs falso conta índices em unidades UTF-16 (índice 0 = quebra de
+  seção, corpo a partir de 1), aplica as requisições de um batchUpdate
+  em ordem — cada inserção desloca o que está depois dela —, rejeita o
+  lote inteiro se uma requisição for inválida (índice no fim do corpo,
+  faixa vazia…) e respeita `writeControl.requiredRevisionId` e a máscara
+  `fields` do get.
+► Erros saem como `HttpError`, como na biblioteca real. Cada chamada
+  conta em `api.chamadas` / `api.bytes_enviados` / `api.bytes_recebidos`
+  e pode esperar `latencia` segundos (ida e volta da rede).
+► `cotas={"docs.escrita": 60, …}` (por minuto, mesmas chaves de
+  limites_api.py) devolve 429 a quem passar do limite numa janela móvel
+  de 60 s — como o Google; `api.recusadas` conta os 429.
+
+    api  = GoogleFalso(latencia=0.05)
+    doc  = api.novo_documento("intro\n!*!pergunta\n")
+    processar_documento(cfg, None, construir=api.construir)
+"""
+
+import re
+import json
+import time
+import threading
+from array import array
+from collections import Counter, defaultdict
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def _erro(status: int, msg: str) -> HttpError:
+    resp        = httplib2.Response({"status": str(status)})
+    resp.reason = msg
+    return HttpError(resp, json.dumps({"error": {"code": status, "message": msg}}).encode())
+
+
+class _Requisicao:
+    def __init__(self, executar):
+        self._executar = executar
+
+    def execute(self, num_retries: int = 0):
+        return self._executar()
+
+# ---------- MÁSCARA `fields` ----------------------------------------
+def _ler_mascara(txt: str) -> dict:
+    """"a,b(c,d/e)" → {"a": None, "b": {"c": None, "d": {"e": None}}}"""
+    def grupo(pos: int) -> tuple[dict, int]:
+        arvore, nome = {}, ""
+        while pos < len(txt):
+            ch = txt[pos]
+            if ch in ",)":
+                if nome:
+                    _caminho(arvore, nome, None)
+                nome = ""
+                if ch == ")":
+                    return arvore, pos + 1
+                pos += 1
+            elif ch == "(":
+                sub, pos = grupo(pos + 1)
+                _caminho(arvore, nome, sub)
+                nome = ""
+                while pos < len(txt) and txt[pos] not in ",)":
+                    pos += 1
+            else:
+                nome += ch
+                pos  += 1
+        if nome:
+            _caminho(arvore, nome, None)
+        return arvore, pos
+
+    def _caminho(arvore: dict, nome: str, folha):
+        partes = nome.strip().split("/")
+        for p in partes[:-1]:
+            if arvore.get(p) is None:
+                arvore[p] = {}
+            arvore = arvore[p]
+        arvore[partes[-1]] = folha
+
+    return grupo(0)[0]
+
+
+def _aplicar_mascara(obj, arvore):
+    if arvore is None or "*" in arvore:
+        return obj
+    if isinstance(obj, list):
+        return [_aplicar_mascara(x, arvore) for x in obj]
+    if isinstance(obj, dict):
+        return {k: _aplicar_mascara(obj[k], sub) for k, sub in arvore.items() if k in obj}
+    return obj
+
+# ---------- CONTABILIDADE -------------------------------------------
+class GoogleFalso:
+    """Estado compartilhado dos serviços falsos + contadores de chamadas."""
+
+    def __init__(self, latencia: float = 0.0, cotas: dict | None = None):
+        self.latencia        = latencia
+        self.cotas           = cotas or {}
+        self.recusadas       = Counter()
+        self._janelas        = defaultdict(list)    # cota → [t das chamadas aceitas]
+        self.documentos      = {}
+        self.mudancas        = []                   # doc_id de cada criação/edição (Drive)
+        self.planilhas       = {}
+        self.chamadas        = Counter()            # "docs.get" → nº de chamadas
+        self.bytes_enviados  = Counter()
+        self.bytes_recebidos = Counter()
+        self.duracoes        = defaultdict(list)    # "docs.get" → [s, …]
+        self._trava          = threading.Lock()
+
+    def construir(self, api: str, versao: str = "", credentials=None, **_):
+        """Mesma assinatura de `googleapiclient.discovery.build`."""
+        if api == "docs":
+            return _ServicoDocs(self)
+        if api == "sheets":
+            return _ServicoSheets(self)
+        if api == "drive":
+            return _ServicoDrive(self)
+        raise ValueError(f"API falsa desconhecida: {api}")
+
+    def novo_documento(self, texto: str, doc_id: str | None = None,
+                       titulo: str | None = None, pasta: str | None = None) -> "DocFalso":
+        """`pasta` é o ID da pasta do Drive onde o doc aparece no `files().list`."""
+        doc_id = doc_id or f"doc-{len(self.documentos) + 1}"
+        doc    = DocFalso(doc_id, texto)
+        doc.titulo, doc.pasta = titulo or doc_id, pasta
+        self.documentos[doc_id] = doc
+        self.mudancas.append(doc_id)
+        return doc
+
+    def _cota(self, nome: str) -> str:
+        api, metodo = nome.split(".", 1)[0], nome.rsplit(".", 1)[-1]
+        return f"{api}.{'leitura' if metodo in ('get', 'list', 'batchGet') else 'escrita'}"
+
+    def _chamar(self, nome: str, corpo, executar):
+        t0 = time.perf_counter()
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._trava:
+            cota = self._cota(nome)
+            if cota in self.cotas:
+                janela = self._janelas[cota]
+                while janela and janela[0] <= t0 - 60:
+                    janela.pop(0)
+                if len(janela) >= self.cotas[cota]:
+                    self.recusadas[nome] += 1
+                    raise _erro(429, f"Quota exceeded for quota metric '{cota}'.")
+                janela.append(t0)
+            resp = executar()
+        with self._trava:
+            self.chamadas[nome]        += 1
+            self.bytes_enviados[nome]  += len(json.dumps(corpo or {}).encode("utf-8"))
+            self.bytes_recebidos[nome] += len(json.dumps(resp).encode("utf-8"))
+            self.duracoes[nome].append(time.perf_counter() - t0)
+        return resp
+
+    def zerar_contadores(self):
+        for c in (self.chamadas, self.bytes_enviados, self.bytes_recebidos, self.duracoes,
+                  self.recusadas):
+            c.clear()
+
+# ---------- GOOGLE DOCS ---------------------------------------------
+NL = ord("\n")
+
+
+class DocFalso:
+    """Corpo do doc como unidades UTF-16 + estilo por unidade."""
+
+    def __init__(self, doc_id: str, texto: str):
+        if not texto.endswith("\n"):
+            texto += "\n"
+        self.doc_id  = doc_id
+        self.titulo  = doc_id
+        self.pasta   = None
+        self.n_rev   = 1
+        self.listas  = {}
+        self._u      = array("H")
+        self._u.frombytes(texto.encode("utf-16-le"))
+        self._estilo = [{}] * len(self._u)          # textStyle de cada unidade
+        self._par    = [None] * len(self._u)        # props do parágrafo, no '\n'
+        for k, c in enumerate(self._u):
+            if c == NL:
+                self._par[k] = {}
+
+    # ---- leitura
+    @property
+    def revisao(self) -> str:
+        return f"rev-{self.n_rev}"
+
+    @property
+    def fim(self) -> int:
+        """endIndex do corpo."""
+        return 1 + len(self._u)
+
+    def texto(self) -> str:
+        return self._u.tobytes().decode("utf-16-le")
+
+    def _trecho(self, a: int, b: int) -> str:
+        return self._u[a:b].tobytes().decode("utf-16-le", errors="replace")
+
+    def corpo(self) -> list:
+        conteudo = [{"endIndex": 1, "sectionBreak": {"sectionStyle": {}}}]
+        ini, u, est = 0, self._u, self._estilo
+        while ini < len(u):
+            fim = u.index(NL, ini) + 1
+            elems, a = [], ini
+            for k in range(ini + 1, fim + 1):
+                if k == fim or est[k] != est[a]:
+                    elems.append({"startIndex": 1 + a, "endIndex": 1 + k,
+                                  "textRun": {"content": self._trecho(a, k),
+                                              "textStyle": dict(est[a])}})
+                    a = k
+            props = self._par[fim - 1] or {}
+            par   = {"elements": elems,
+                     "paragraphStyle": dict(props.get("paragraphStyle", {}))}
+            if "bullet" in props:
+                par["bullet"] = dict(props["bullet"])
+            conteudo.append({"startIndex": 1 + ini, "endIndex": 1 + fim, "paragraph": par})
+            ini = fim
+        return conteudo
+
+    def como_json(self) -> dict:
+        return {"documentId": self.doc_id, "title": self.titulo,
+                "revisionId": self.revisao,
+                "body": {"content": self.corpo()},
+                "lists": {k: dict(v) for k, v in self.listas.items()}}
+
+    # ---- escrita
+    def _faixa(self, req: str, r: dict, ate_fim: bool = True) -> tuple[int, int]:
+        ini, fim = r.get("startIndex", 0), r.get("endIndex", 0)
+        limite   = self.fim if ate_fim else self.fim - 1
+        if not (1 <= ini < fim <= limite):
+            raise _erro(400, f"Invalid requests.{req}: range [{ini}, {fim}) "
+                             f"fora do segmento [1, {limite}).")
+        return ini - 1, fim - 1
+
+    def _inserir(self, r: dict):
+        loc = r.get("location") or {}
+        idx = loc.get("index", self.fim - 1) if "endOfSegmentLocation" not in r else self.fim - 1
+        if not 1 <= idx < self.fim:
+            raise _erro(400, f"Invalid requests.insertText: Index {idx} must be less "
+                             f"than the end index of the referenced segment, {self.fim}.")
+        novo = array("H")
+        novo.frombytes(r["text"].encode("utf-16-le"))
+        k    = idx - 1
+        herd = self._estilo[k - 1] if k > 0 else {}
+        prox = next((self._par[j] for j in range(k, len(self._u)) if self._u[j] == NL), {})
+        self._u[k:k]      = novo
+        self._estilo[k:k] = [herd] * len(novo)
+        self._par[k:k]    = [dict(prox or {}) if c == NL else None for c in novo]
+
+    def _apagar(self, r: dict):
+        a, b = self._faixa("deleteContentRange", r["range"], ate_fim=False)
+        del self._u[a:b], self._estilo[a:b], self._par[a:b]
+
+    def _estilo_texto(self, r: dict):
+        a, b    = self._faixa("updateTextStyle", r["range"])
+        campos  = [c.strip() for c in r.get("fields", "").split(",") if c.strip()]
+        if not campos:
+            raise _erro(400, "Invalid requests.updateTextStyle: fields vazio.")
+        estilo  = r.get("textStyle", {})
+        trocas  = {}
+        for k in range(a, b):
+            velho = self._estilo[k]
+            novo  = trocas.get(id(velho))
+            if novo is None:
+                novo = dict(velho)
+                for c in (estilo if campos == ["*"] else campos):
+                    if c in estilo:
+                        novo[c] = estilo[c]
+                    else:
+                        novo.pop(c, None)
+                trocas[id(velho)] = novo
+            self._estilo[k] = novo
+
+    def _paragrafos(self, a: int, b: int) -> list[int]:
+        """Posições dos '\n' dos parágrafos que tocam [a, b)."""
+        fim = self._u.index(NL, max(a, b - 1))
+        return [k for k in range(a, fim + 1) if self._u[k] == NL]
+
+    def _marcadores(self, r: dict, criar: bool):
+        a, b = self._faixa("createParagraphBullets" if criar else "deleteParagraphBullets",
+                           r["range"])
+        lista = f"lista-{len(self.listas) + 1}"
+        if criar:
+            nivel = ({"glyphType": "DECIMAL"} if "NUMBERED" in r.get("bulletPreset", "")
+                     else {"glyphSymbol": "●"})
+            self.listas[lista] = {"listProperties": {"nestingLevels": [nivel]}}
+        for k in self._paragrafos(a, b):
+            props = dict(self._par[k] or {})
+            if criar:
+                props["bullet"] = {"listId": lista}
+            else:
+                props.pop("bullet", None)
+            self._par[k] = props
+
+    def _estilo_paragrafo(self, r: dict):
+        a, b   = self._faixa("updateParagraphStyle", r["range"])
+        campos = [c.strip() for c in r.get("fields", "").split(",") if c.strip()]
+        estilo = r.get("paragraphStyle", {})
+        for k in self._paragrafos(a, b):
+            props = dict(self._par[k] or {})
+            ps    = dict(props.get("paragraphStyle", {}))
+            for c in campos:
+                if c in estilo:
+                    ps[c] = estilo[c]
+                else:
+                    ps.pop(c, None)
+            props["paragraphStyle"] = ps
+            self._par[k] = props
+
+    def aplicar(self, corpo: dict) -> dict:
+        exigida = (corpo.get("writeControl") or {}).get("requiredRevisionId")
+        if exigida and exigida != self.revisao:
+            raise _erro(400, "The required revision ID does not match the latest revision.")
+
+        # batchUpdate é atômico: aplica numa cópia e só troca se tudo passou
+        copia = DocFalso.__new__(DocFalso)
+        copia.__dict__.update(self.__dict__)
+        copia._u, copia._estilo, copia._par = array("H", self._u), list(self._estilo), list(self._par)
+        copia.listas = dict(self.listas)
+        for n, req in enumerate(corpo.get("requests", [])):
+            (tipo, r), = req.items()
+            acao = {
+                "insertText":             copia._inserir,
+                "deleteContentRange":     copia._apagar,
+                "updateTextStyle":        copia._estilo_texto,
+                "updateParagraphStyle":   copia._estilo_paragrafo,
+                "createParagraphBullets": lambda r: copia._marcadores(r, True),
+                "deleteParagraphBullets": lambda r: copia._marcadores(r, False),
+            }.get(tipo)
+            if acao is None:
+                raise _erro(400, f"requests[{n}]: tipo não suportado pelo falso: {tipo}")
+            acao(r)
+        self.__dict__.update(copia.__dict__)
+        self.n_rev += 1
+        return {"documentId": self.doc_id,
+                "replies": [{} for _ in corpo.get("requests", [])],
+                "writeControl": {"requiredRevisionId": self.revisao}}
+
+
+class _ServicoDocs:
+    def __init__(self, api: GoogleFalso):
+        self.api = api
+
+    def documents(self):
+        return self
+
+    def _doc(self, doc_id: str) -> DocFalso:
+        if doc_id not in self.api.documentos:
+            raise _erro(404, f"Requested entity was not found: {doc_id}")
+        return self.api.documentos[doc_id]
+
+    def get(self, documentId: str, fields: str | None = None, **_):
+        def executar():
+            doc = self._doc(documentId).como_json()
+            return _aplicar_mascara(doc, _ler_mascara(fields)) if fields else doc
+        return _Requisicao(lambda: self.api._chamar("docs.get", None, executar))
+
+    def batchUpdate(self, documentId: str, body: dict):
+        def executar():
+            resp = self._doc(documentId).aplicar(body)
+            self.api.mudancas.append(documentId)
+            return resp
+        return _Requisicao(lambda: self.api._chamar("docs.batchUpdate", body, executar))
+
+# ---------- GOOGLE SHEETS -------------------------------------------
+def _col(letras: str) -> int:
+    n = 0
+    for ch in letras:
+        n = n * 26 + ord(ch.upper()) - 64
+    return n - 1
+
+
+def _letras(col: int) -> str:
+    s, col = "", col + 1
+    while col:
+        col, r = divmod(col - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+def _faixa_a1(faixa: str) -> tuple[str, int, int | None, int, int | None]:
+    """"Fila!B2:D5" → ("Fila", col0, lin0, col1, lin1) com base 0; linha None = aberta."""
+    aba, _, ref = faixa.rpartition("!")
+    ini, _, fim = ref.partition(":")
+    fim = fim or ini
+
+    def celula(c: str):
+        letras = "".join(ch for ch in c if ch.isalpha())
+        num    = "".join(ch for ch in c if ch.isdigit())
+        return _col(letras), (int(num) - 1 if num else None)
+
+    (c0, l0), (c1, l1) = celula(ini), celula(fim)
+    return aba.strip("'"), c0, l0, c1, l1
+
+
+class _ServicoSheets:
+    def __init__(self, api: GoogleFalso):
+        self.api = api
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return _ValoresSheets(self.api)
+
+    def create(self, body: dict):
+        def executar():
+            sid  = f"planilha-{len(self.api.planilhas) + 1}"
+            abas = [s["properties"]["title"] for s in body.get("sheets", [])] or ["Sheet1"]
+            self.api.planilhas[sid] = {a: [] for a in abas}
+            return {"spreadsheetId": sid, "properties": body.get("properties", {}),
+                    "sheets": [{"properties": {"title": a, "sheetId": k}}
+                               for k, a in enumerate(abas)],
+                    "spreadsheetUrl": f"https://docs.google.com/spreadsheets/d/{sid}"}
+        return _Requisicao(lambda: self.api._chamar("sheets.create", body, executar))
+
+
+class _ValoresSheets:
+    def __init__(self, api: GoogleFalso):
+        self.api = api
+
+    def _grade(self, planilha: str, aba: str) -> list:
+        try:
+            return self.api.planilhas[planilha][aba]
+        except KeyError:
+            raise _erro(400, f"Unable to parse range: {aba}") from None
+
+    @staticmethod
+    def _escrever(grade: list, c0: int, l0: int, valores: list) -> int:
+        for dl, linha in enumerate(valores):
+            while len(grade) <= l0 + dl:
+                grade.append([])
+            g = grade[l0 + dl]
+            while len(g) < c0 + len(linha):
+                g.append("")
+            g[c0:c0 + len(linha)] = [str(v) for v in linha]
+        return sum(len(l) for l in valores)
+
+    def update(self, spreadsheetId: str, range: str, body: dict, valueInputOption: str = "RAW"):
+        def executar():
+            aba, c0, l0, _, _ = _faixa_a1(range)
+            n = self._escrever(self._grade(spreadsheetId, aba), c0, l0 or 0, body["values"])
+            return {"spreadsheetId": spreadsheetId, "updatedRange": range, "updatedCells": n}
+        return _Requisicao(lambda: self.api._chamar("sheets.values.update", body, executar))
+
+    def append(self, spreadsheetId: str, range: str, body: dict, valueInputOption: str = "RAW", **_):
+        def executar():
+            aba, c0, _, _, _ = _faixa_a1(range)
+            grade = self._grade(spreadsheetId, aba)
+            l0    = len(grade)
+            while l0 and not any(grade[l0 - 1]):
+                l0 -= 1
+            n   = self._escrever(grade, c0, l0, body["values"])
+            c1  = c0 + max((len(l) for l in body["values"]), default=1) - 1
+            ref = f"{aba}!{_letras(c0)}{l0 + 1}:{_letras(c1)}{l0 + len(body['values'])}"
+            return {"spreadsheetId": spreadsheetId, "tableRange": range,
+                    "updates": {"spreadsheetId": spreadsheetId, "updatedRange": ref,
+                                "updatedRows": len(body["values"]), "updatedCells": n}}
+        return _Requisicao(lambda: self.api._chamar("sheets.values.append", body, executar))
+
+    def batchUpdate(self, spreadsheetId: str, body: dict):
+        def executar():
+            total = 0
+            for d in body.get("data", []):
+                aba, c0, l0, _, _ = _faixa_a1(d["range"])
+                total += self._escrever(self._grade(spreadsheetId, aba), c0, l0 or 0, d["values"])
+            return {"spreadsheetId": spreadsheetId, "totalUpdatedCells": total}
+        return _Requisicao(lambda: self.api._chamar("sheets.values.batchUpdate", body, executar))
+
+    def _ler(self, planilha: str, faixa: str) -> dict:
+        aba, c0, l0, c1, l1 = _faixa_a1(faixa)
+        grade  = self._grade(planilha, aba)
+        linhas = grade[l0 or 0:(l1 + 1) if l1 is not None else None]
+        vals   = [l[c0:c1 + 1] for l in linhas]
+        while vals and not any(vals[-1]):
+            vals.pop()
+        return {"range": faixa, "majorDimension": "ROWS", "values": vals}
+
+    def get(self, spreadsheetId: str, range: str, **_):
+        return _Requisicao(lambda: self.api._chamar(
+            "sheets.values.get", None, lambda: self._ler(spreadsheetId, range)))
+
+    def batchGet(self, spreadsheetId: str, ranges: list, **_):
+        def executar():
+            return {"spreadsheetId": spreadsheetId,
+                    "valueRanges": [self._ler(spreadsheetId, f) for f in ranges]}
+        return _Requisicao(lambda: self.api._chamar("sheets.values.batchGet", None, executar))
+
+# ---------- GOOGLE DRIVE --------------------------------------------
+MIME_DOC = "application/vnd.google-apps.document"
+
+
+class _ServicoDrive:
+    """`files().list` com `'<pasta>' in parents` (lote) e `changes()` (vigia)."""
+
+    def __init__(self, api: GoogleFalso):
+        self.api = api
+
+    def files(self):
+        return self
+
+    def changes(self):
+        return _MudancasDrive(self.api)
+
+    def list(self, q: str = "", fields: str | None = None, pageSize: int = 100,
+             pageToken: str | None = None, orderBy: str | None = None, **_):
+        def executar():
+            m     = re.search(r"'([^']+)' in parents", q)
+            docs  = sorted((d for d in self.api.documentos.values()
+                            if m is None or d.pasta == m.group(1)),
+                           key=lambda d: d.titulo)
+            ini   = int(pageToken or 0)
+            pag   = docs[ini:ini + pageSize]
+            resp  = {"files": [{"id": d.doc_id, "name": d.titulo, "mimeType": MIME_DOC}
+                               for d in pag]}
+            if ini + pageSize < len(docs):
+                resp["nextPageToken"] = str(ini + pageSize)
+            return _aplicar_mascara(resp, _ler_mascara(fields)) if fields else resp
+        return _Requisicao(lambda: self.api._chamar("drive.files.list", None, executar))
+
+
+class _MudancasDrive:
+    """Token = posição em `api.mudancas`; uma mudança por criação/edição de doc."""
+
+    def __init__(self, api: GoogleFalso):
+        self.api = api
+
+    def getStartPageToken(self, **_):
+        return _Requisicao(lambda: self.api._chamar(
+            "drive.changes.getStartPageToken", None,
+            lambda: {"startPageToken": str(len(self.api.mudancas))}))
+
+    def list(self, pageToken: str, fields: str | None = None, pageSize: int = 100, **_):
+        def executar():
+            ini  = int(pageToken)
+            ids  = self.api.mudancas[ini:ini + pageSize]
+            docs = self.api.documentos
+            resp = {"changes": [{"fileId": d, "removed": False,
+                                 "file": {"name": docs[d].titulo, "mimeType": MIME_DOC,
+                                          "parents": [docs[d].pasta] if docs[d].pasta else [],
+                                          "trashed": False}}
+                                for d in ids]}
+            fim  = ini + len(ids)
+            if fim < len(self.api.mudancas):
+                resp["nextPageToken"] = str(fim)
+            else:
+                resp["newStartPageToken"] = str(fim)
+            return _aplicar_mascara(resp, _ler_mascara(fields)) if fields else resp
+        return _Requisicao(lambda: self.api._chamar("drive.changes.list", None, executar))
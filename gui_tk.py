@@ -0,0 +1,224 @@
+# gui_tk.py
+"""
+► Janela Tk comum aos front-ends (main.py, code-create.py).
+► O motor roda numa thread própria; log e contadores chegam por uma
+  `queue.Queue` que o loop do Tk esvazia com `after()` — a janela não
+  congela durante a execução.
+► Pausar / Continuar / Cancelar via `Controle`; mostra prompts por minuto
+  e tempo estimado para terminar (descontando o tempo em pausa).
+► Vários links de doc, ou o link de uma pasta do Drive, rodam em lote
+  (lote_docs.py) com as mesmas abas.
+"""
+
+import sys
+import time
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, simpledialog, scrolledtext, messagebox
+
+from google_docs import autenticar_google, extrair_document_id
+from navegador import abrir_debug
+from motor import Config, processar_documento, CONCORRENCIA_MAX
+from lote_docs import processar_lote, extrair_pasta_id
+from pool_abas import Controle
+
+INTERVALO_MS = 100      # de quanto em quanto tempo a janela lê a fila de eventos
+
+
+def _fmt_duracao(seg: float) -> str:
+    seg = int(seg)
+    if seg >= 3600:
+        return f"{seg // 3600} h {seg % 3600 // 60:02d} min"
+    if seg >= 60:
+        return f"{seg // 60} min {seg % 60:02d} s"
+    return f"{seg} s"
+
+
+class App:
+    def __init__(self, scopes: list[str], msg_auth: str, **config_extra):
+        """`config_extra` vai direto para `motor.Config` (fila, formato…)."""
+        self.scopes       = scopes
+        self.msg_auth     = msg_auth
+        self.config_extra = config_extra
+        self.eventos      = queue.Queue()
+        self.controle     = None
+        self.thread       = None
+
+        self.janela = tk.Tk()
+        self.janela.title("Automatizador GPT → Docs")
+        self.janela.geometry("780x600")
+
+        top = tk.Frame(self.janela)
+        top.pack(pady=8)
+
+        tk.Button(top, text="Abrir Chrome Debug", command=abrir_debug).pack(side=tk.LEFT, padx=6)
+        self.bt_processar = tk.Button(top, text="Processar Docs", command=self.processar)
+        self.bt_processar.pack(side=tk.LEFT, padx=6)
+        self.bt_pausar = tk.Button(top, text="Pausar", command=self.pausar, state=tk.DISABLED)
+        self.bt_pausar.pack(side=tk.LEFT, padx=6)
+        self.bt_cancelar = tk.Button(top, text="Cancelar", command=self.cancelar,
+                                     state=tk.DISABLED)
+        self.bt_cancelar.pack(side=tk.LEFT, padx=6)
+
+        # retomar a execução anterior do doc pelo diário (também via `--resume`)
+        self.retomar = tk.BooleanVar(value="--resume" in sys.argv[1:])
+        tk.Checkbutton(top, text="Retomar", variable=self.retomar).pack(side=tk.LEFT, padx=6)
+
+        self.lb_status = tk.Label(self.janela, text="", anchor="w")
+        self.lb_status.pack(fill=tk.X, padx=12)
+
+        self.texto_log = scrolledtext.ScrolledText(self.janela, width=100, height=28)
+        self.texto_log.pack(pady=10)
+
+    # ---------- ENTRADAS --------------------------------------------
+    def autenticar(self):
+        creds = autenticar_google(self.scopes)
+        if creds:
+            return creds
+
+        cred = filedialog.askopenfilename(
+            title="Selecione credentials.json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if not cred:
+            return None
+        return autenticar_google(self.scopes, cred)
+
+    def processar(self):
+        link_gpt = simpledialog.askstring(
+            "GPT", "Cole o link da sala GPT (vários links separados por espaço\n"
+                   "são distribuídos entre as abas):")
+        link_doc = simpledialog.askstring(
+            "Docs", "Cole o link do Google Docs (vários links separados por espaço,\n"
+                    "ou o link de uma pasta do Drive, rodam em lote):")
+        if not (link_gpt and link_doc):
+            return
+        n_abas = simpledialog.askinteger(
+            "Abas", "Quantas abas em paralelo?",
+            initialvalue=1, minvalue=1, maxvalue=CONCORRENCIA_MAX) or 1
+
+        pasta   = extrair_pasta_id(link_doc)
+        doc_ids = [extrair_document_id(l) for l in link_doc.split()]
+        if not pasta and not all(doc_ids):
+            messagebox.showerror("Erro", "ID do documento inválido.")
+            return
+        if pasta and not any("auth/drive" in s for s in self.scopes):
+            messagebox.showerror("Erro", "Pasta do Drive precisa do acesso ao Drive "
+                                         "(use o front-end com fila).")
+            return
+        if pasta:
+            doc_ids = []
+
+        self.texto_log.delete("1.0", tk.END)
+        self.log(self.msg_auth)
+        self.janela.update()
+
+        creds = self.autenticar()
+        if not creds:
+            return
+
+        cfg = Config(doc_id=doc_ids[0] if doc_ids else "", links_chat=link_gpt.split(), n_abas=n_abas,
+                     retomar=self.retomar.get(), **self.config_extra)
+
+        self.controle = Controle()
+        self.t_inicio, self.t_pausa, self.pausado_seg = time.time(), None, 0.0
+        self.base = None
+        self.bt_processar.config(state=tk.DISABLED)
+        self.bt_pausar.config(state=tk.NORMAL, text="Pausar")
+        self.bt_cancelar.config(state=tk.NORMAL)
+
+        lote = (doc_ids, pasta) if pasta or len(doc_ids) > 1 else None
+        self.thread = threading.Thread(target=self._trabalho, args=(cfg, creds, lote),
+                                       daemon=True)
+        self.thread.start()
+        self.janela.after(INTERVALO_MS, self._drenar)
+
+    # ---------- THREAD DO MOTOR -------------------------------------
+    def _trabalho(self, cfg: Config, creds, lote=None):
+        """`lote` = (doc_ids, pasta) roda `processar_lote`; None, um doc só."""
+        opcoes = dict(log=lambda msg: self.eventos.put(("log", msg)),
+                      controle=self.controle,
+                      ao_progresso=lambda c, e, t: self.eventos.put(("progresso", (c, e, t))))
+        try:
+            if lote:
+                res = processar_lote(cfg, creds, *lote, **opcoes)
+            else:
+                res = processar_documento(cfg, creds, **opcoes)
+            self.eventos.put(("fim", res))
+        except Exception as e:
+            self.eventos.put(("falha", e))
+
+    # ---------- LOOP DO TK ------------------------------------------
+    def _drenar(self):
+        while True:
+            try:
+                tipo, dado = self.eventos.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "log":
+                self.log(dado)
+            elif tipo == "progresso":
+                self._atualizar_status(*dado)
+            else:
+                self._terminar(tipo, dado)
+                return
+        self.janela.after(INTERVALO_MS, self._drenar)
+
+    def _atualizar_status(self, concluidos: int, erros: int, total: int):
+        feitos = concluidos + erros
+        if self.base is None:
+            self.base = feitos          # já prontos (retomada) não contam na taxa
+        ativo = time.time() - self.t_inicio - self.pausado_seg
+        if self.t_pausa:
+            ativo -= time.time() - self.t_pausa
+        taxa  = (feitos - self.base) / (ativo / 60) if ativo > 0 else 0.0
+        texto = f"{feitos}/{total} prompt(s) • {erros} erro(s) • {taxa:.1f} prompt(s)/min"
+        if taxa > 0 and feitos < total:
+            texto += f" • ETA {_fmt_duracao((total - feitos) / taxa * 60)}"
+        self.lb_status.config(text=texto)
+
+    def _terminar(self, tipo: str, dado):
+        self.bt_processar.config(state=tk.NORMAL)
+        self.bt_pausar.config(state=tk.DISABLED, text="Pausar")
+        self.bt_cancelar.config(state=tk.DISABLED)
+        if tipo == "falha":
+            self.log(f"✗ Erro: {dado}")
+            messagebox.showerror("Erro", str(dado))
+        elif not dado.prompts:
+            messagebox.showinfo("Aviso", "Nenhum !*! encontrado.")
+        elif dado.cancelado:
+            messagebox.showinfo("Cancelado", f"{dado.concluidos}/{dado.prompts} prompt(s) gravado(s).")
+        elif dado.abortado or dado.erros:
+            messagebox.showwarning("Concluído com erros",
+                                   f"{dado.concluidos}/{dado.prompts} prompt(s) gravado(s), "
+                                   f"{dado.erros} erro(s) — veja o log.")
+        else:
+            messagebox.showinfo("Concluído", "Todos os prompts processados!")
+
+    # ---------- CONTROLES -------------------------------------------
+    def log(self, msg: str):
+        self.texto_log.insert(tk.END, msg + "\n")
+        self.texto_log.see(tk.END)
+
+    def pausar(self):
+        if self.controle.pausado:
+            self.controle.continuar()
+            self.pausado_seg += time.time() - self.t_pausa
+            self.t_pausa = None
+            self.bt_pausar.config(text="Pausar")
+            self.log("▶ Continuando.")
+        else:
+            self.controle.pausar()
+            self.t_pausa = time.time()
+            self.bt_pausar.config(text="Continuar")
+            self.log("⏸ Pausado — os prompts em andamento terminam.")
+
+    def cancelar(self):
+        self.controle.cancelar()
+        self.bt_pausar.config(state=tk.DISABLED)
+        self.bt_cancelar.config(state=tk.DISABLED)
+        self.log("⏹ Cancelando após os prompts em andamento…")
+
+    def rodar(self):
+        self.janela.mainloop()
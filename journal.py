@@ -0,0 +1,142 @@
+# journal.py
+"""
+► Diário (write-ahead) de uma execução, um por documento:
+  journal_<doc_id>.jsonl, uma linha JSON por evento, com fsync.
+► Cada prompt passa por: coletado → enviado → respondido → inserido →
+  verificado. A resposta vai junto no "respondido" (texto como fica no
+  doc e, no formato "rica", o HTML), então retomar não precisa perguntar
+  de novo ao chat. A revisão do doc é registrada no
+  início e após cada gravação.
+► Prompts são identificados por (texto, nº da ocorrência) — os índices
+  mudam entre execuções, o texto não; a ocorrência separa repetidos.
+"""
+
+import os
+import json
+import time
+
+from escrita_docs import tamanho_docs
+
+COLETADO   = "coletado"
+ENVIADO    = "enviado"
+RESPONDIDO = "respondido"
+INSERIDO   = "inserido"
+VERIFICADO = "verificado"
+
+ORDEM = [COLETADO, ENVIADO, RESPONDIDO, INSERIDO, VERIFICADO]
+
+
+def caminho_journal(doc_id: str) -> str:
+    return f"journal_{doc_id}.jsonl"
+
+
+def chaves_prompts(prompts: list) -> list[tuple[str, int]]:
+    """[(end_idx, texto, …), …] → [(texto, ocorrência), …] na mesma ordem."""
+    vistos, chaves = {}, []
+    for _, txt, *_ in prompts:
+        vistos[txt] = vistos.get(txt, 0) + 1
+        chaves.append((txt, vistos[txt]))
+    return chaves
+
+
+class Journal:
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arq    = None
+
+    def carregar(self) -> dict:
+        """
+        Estado final de cada prompt: {(texto, ocorr): {"estado", "texto"?}}.
+        Linhas truncadas no fim (queda no meio da escrita) são ignoradas.
+        """
+        estados = {}
+        if not os.path.exists(self.caminho):
+            return estados
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    ev = json.loads(linha)
+                except ValueError:
+                    continue
+                if ev.get("ev") != "estado":
+                    continue
+                reg = estados.setdefault(tuple(ev["chave"]), {})
+                reg["estado"] = ev["estado"]
+                for campo in ("texto", "html"):
+                    if campo in ev:
+                        reg[campo] = ev[campo]
+        return estados
+
+    def abrir(self, doc_id: str, revisao: str | None, chaves: list,
+              herdados: dict | None = None):
+        """
+        Começa o diário e registra a coleta. Com `herdados` (retomada) o
+        arquivo continua e cada prompt herdado volta com o estado reconciliado.
+        """
+        retomar   = herdados is not None
+        self._arq = open(self.caminho, "a" if retomar else "w", encoding="utf-8")
+        self._gravar({"ev": "inicio", "doc": doc_id, "revisao": revisao,
+                      "retomada": retomar})
+        for ch in chaves:
+            reg = (herdados or {}).get(ch)
+            if reg:
+                self.estado(ch, reg["estado"], reg.get("texto"), reg.get("html"))
+            else:
+                self.estado(ch, COLETADO)
+
+    def estado(self, chave: tuple, estado: str, texto: str | None = None,
+               html: str | None = None):
+        ev = {"ev": "estado", "chave": list(chave), "estado": estado}
+        if texto is not None:
+            ev["texto"] = texto
+        if html is not None:
+            ev["html"] = html
+        self._gravar(ev)
+
+    def revisao(self, revisao: str | None):
+        self._gravar({"ev": "revisao", "revisao": revisao})
+
+    def _gravar(self, ev: dict):
+        ev["t"] = time.time()
+        self._arq.write(json.dumps(ev, ensure_ascii=False) + "\n")
+        self._arq.flush()
+        os.fsync(self._arq.fileno())
+
+    def fechar(self):
+        if self._arq:
+            self._arq.close()
+            self._arq = None
+
+
+def ja_inserida(espelho, end_idx: int, texto: str) -> bool:
+    """A resposta aparece logo abaixo do prompt no doc re-lido?"""
+    inicio = texto.strip()[:80]
+    trecho = espelho.trecho(end_idx - 1, end_idx + tamanho_docs(inicio) + 8)
+    return bool(inicio) and inicio in trecho
+
+
+def reconciliar(anteriores: dict, chaves: list, prompts: list,
+                espelho) -> tuple[dict, set, dict]:
+    """
+    Cruza o diário anterior com o doc re-lido. Devolve (herdados, prontos,
+    reinserir): estados a carregar no novo diário, índices cuja resposta já
+    está no doc e {índice: (texto, html ou None)} respondidos que não
+    chegaram ao doc.
+    """
+    herdados, prontos, reinserir = {}, set(), {}
+    for i, ch in enumerate(chaves):
+        reg = anteriores.get(ch)
+        if not reg:
+            continue
+        texto = reg.get("texto")
+        if reg["estado"] in (INSERIDO, VERIFICADO):
+            prontos.add(i)
+            herdados[ch] = reg
+        elif texto and ja_inserida(espelho, prompts[i][0], texto):
+            # caiu entre o batchUpdate e o registro: a resposta já está lá
+            prontos.add(i)
+            herdados[ch] = {"estado": INSERIDO, "texto": texto}
+        elif texto:
+            reinserir[i] = (texto, reg.get("html"))
+            herdados[ch] = {"estado": RESPONDIDO, "texto": texto, "html": reg.get("html")}
+    return herdados, prontos, reinserir
@@ -0,0 +1,273 @@
+# limites_api.py
+"""
+► Cliente Google compartilhado: os serviços criados por `limitar(build)`
+  passam toda chamada `.execute()` por um `LimitadorGoogle` comum a todas
+  as threads (e a todos os docs de um lote):
+    • balde de fichas por cota — Docs, Sheets e Drive, leitura e escrita
+      separadas, nos limites por usuário/minuto do Google;
+    • taxa adaptativa: um 429 corta a taxa do balde pela metade e cada
+      sucesso devolve um pouco, até o teto (AIMD) — a execução fica perto
+      do limite da cota em vez de bater nele;
+    • nova tentativa com espera exponencial com jitter (ou o `Retry-After`
+      do servidor) em 429, 5xx e erro de rede. 5xx/rede só quando repetir
+      é seguro: leitura, escrita que sobrescreve, ou batchUpdate do Docs
+      com `requiredRevisionId` (se já tinha sido aplicado, a repetição
+      falha com conflito de revisão em vez de duplicar o texto, e quem
+      escreve confere o doc — escrita_docs.py);
+    • fusão: leituras iguais ao mesmo tempo viram uma chamada só, e os
+      `values().batchUpdate` da mesma planilha que esperam ficha saem
+      juntos num só.
+"""
+
+import json
+import time
+import random
+import threading
+from collections import Counter
+
+import httplib2
+
+from medicao import dormir
+
+# Requisições por minuto, por usuário (limites padrão dos projetos Google)
+COTAS = {
+    "docs.leitura":   300,
+    "docs.escrita":   60,
+    "sheets.leitura": 60,
+    "sheets.escrita": 60,
+    "drive.leitura":  1000,
+    "drive.escrita":  1000,
+}
+LEITURAS = {"get", "list", "batchGet", "export", "getStartPageToken"}
+
+
+def espera_backoff(tentativa: int, base: float = 1.0, teto: float = 64.0) -> float:
+    """Espera exponencial com jitter: entre metade e o total de base·2^n (até `teto`)."""
+    espera = min(teto, base * 2 ** tentativa)
+    return espera / 2 + random.uniform(0, espera / 2)
+
+
+def status_http(erro: Exception) -> int | None:
+    """Status HTTP de um `HttpError` (None se não for erro HTTP)."""
+    try:
+        return int(erro.resp.status)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _retry_after(erro: Exception) -> float | None:
+    try:
+        return float(erro.resp.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+# ---------- BALDE DE FICHAS -----------------------------------------
+class BaldeFichas:
+    def __init__(self, por_min: float, rajada: float | None = None):
+        """
+        `por_min` fichas por minuto, até `rajada` acumuladas (padrão: 10 s
+        de cota — uma rajada de um minuto inteiro estouraria a janela).
+        """
+        self.teto       = por_min / 60
+        self.taxa       = self.teto
+        self.capacidade = rajada or max(1.0, por_min / 6)
+        self.fichas     = self.capacidade
+        self._t         = time.monotonic()
+        self._trava     = threading.Lock()
+
+    def _repor(self):
+        agora       = time.monotonic()
+        self.fichas = min(self.capacidade, self.fichas + (agora - self._t) * self.taxa)
+        self._t     = agora
+
+    def tirar(self) -> float:
+        """Reserva uma ficha; devolve quantos segundos esperar por ela."""
+        with self._trava:
+            self._repor()
+            self.fichas -= 1
+            return 0.0 if self.fichas >= 0 else -self.fichas / self.taxa
+
+    def frear(self):
+        """429: metade da taxa e nada acumulado."""
+        with self._trava:
+            self._repor()
+            self.taxa   = max(self.teto / 20, self.taxa / 2)
+            self.fichas = min(self.fichas, 0.0)
+
+    def acelerar(self):
+        with self._trava:
+            self._repor()
+            self.taxa = min(self.teto, self.taxa + self.teto / 50)
+
+# ---------- LIMITADOR -----------------------------------------------
+class _Voo:
+    """Chamada em andamento que outras iguais (ou fundíveis) esperam."""
+
+    def __init__(self, kwargs: dict):
+        self.kwargs  = kwargs
+        self.enviado = False
+        self.pronto  = threading.Event()
+        self.resp    = None
+        self.erro    = None
+
+
+class LimitadorGoogle:
+    def __init__(self, cotas: dict = COTAS, tentativas: int = 6, espera_max: float = 64.0):
+        self.baldes      = {k: BaldeFichas(v) for k, v in cotas.items()}
+        self.tentativas  = tentativas
+        self.espera_max  = espera_max
+        self.contadores  = Counter()     # chamadas, fundidas, 429, 5xx, rede, novas tentativas
+        self._voos       = {}
+        self._trava      = threading.Lock()
+
+    @staticmethod
+    def _seguro(metodo: str, kwargs: dict) -> bool:
+        """Repetir depois de 5xx/rede não duplica nada?"""
+        nome = metodo.rsplit(".", 1)[-1]
+        if nome in LEITURAS or nome == "update":
+            return True
+        if metodo == "spreadsheets.values.batchUpdate":
+            return True                                # sobrescreve as faixas
+        return bool((kwargs.get("body") or {}).get("writeControl"))
+
+    @staticmethod
+    def _chave_fusao(api: str, metodo: str, kwargs: dict):
+        if metodo.rsplit(".", 1)[-1] in LEITURAS:
+            return ("leitura", api, metodo, json.dumps(kwargs, sort_keys=True, default=str))
+        if metodo == "spreadsheets.values.batchUpdate":
+            return ("valores", kwargs.get("spreadsheetId"),
+                    (kwargs.get("body") or {}).get("valueInputOption"))
+        return None
+
+    def executar(self, api: str, metodo: str, kwargs: dict, chamar):
+        """`chamar(kwargs) -> resposta` faz a requisição de verdade."""
+        chave = self._chave_fusao(api, metodo, kwargs)
+        if chave is None:
+            return self._executar(api, metodo, _Voo(kwargs), chamar)
+
+        with self._trava:
+            voo = self._voos.get(chave)
+            if voo is not None and not (chave[0] == "valores" and voo.enviado):
+                if chave[0] == "valores":               # junta ao lote que espera ficha
+                    voo.kwargs["body"]["data"].extend(kwargs["body"].get("data", []))
+                self.contadores["fundidas"] += 1
+                seguidor = True
+            else:
+                if chave[0] == "valores":
+                    kwargs = dict(kwargs, body=dict(kwargs["body"],
+                                                    data=list(kwargs["body"].get("data", []))))
+                voo = self._voos[chave] = _Voo(kwargs)
+                seguidor = False
+        if seguidor:
+            voo.pronto.wait()
+            if voo.erro:
+                raise voo.erro
+            return voo.resp
+
+        try:
+            voo.resp = self._executar(api, metodo, voo, chamar, chave)
+            return voo.resp
+        except Exception as e:
+            voo.erro = e
+            raise
+        finally:
+            with self._trava:
+                if self._voos.get(chave) is voo:
+                    del self._voos[chave]
+            voo.pronto.set()
+
+    def _executar(self, api: str, metodo: str, voo: _Voo, chamar, chave=None):
+        leitura = metodo.rsplit(".", 1)[-1] in LEITURAS
+        balde   = self.baldes.get(f"{api}.{'leitura' if leitura else 'escrita'}")
+        for tent in range(self.tentativas):
+            if balde:
+                dormir(balde.tirar(), "cota_api")
+            with self._trava:
+                voo.enviado = True                      # daqui em diante ninguém se junta
+                if chave and self._voos.get(chave) is voo and chave[0] == "valores":
+                    del self._voos[chave]
+                self.contadores["chamadas"] += 1
+            try:
+                resp = chamar(voo.kwargs)
+            except (OSError, httplib2.HttpLib2Error) as e:
+                motivo, repetir, ra = "rede", self._seguro(metodo, voo.kwargs), None
+                erro = e
+            except Exception as e:
+                st = status_http(e)
+                if st is None:
+                    raise
+                erro, ra = e, _retry_after(e)
+                if st == 429:
+                    motivo, repetir = "429", True
+                    if balde:
+                        balde.frear()
+                elif st >= 500:
+                    motivo, repetir = "5xx", self._seguro(metodo, voo.kwargs)
+                else:
+                    raise
+            else:
+                if balde:
+                    balde.acelerar()
+                return resp
+
+            with self._trava:
+                self.contadores[motivo] += 1
+            if not repetir or tent == self.tentativas - 1:
+                raise erro
+            with self._trava:
+                self.contadores["novas_tentativas"] += 1
+            dormir(min(self.espera_max, ra) if ra else
+                   espera_backoff(tent, teto=self.espera_max), "backoff_api")
+
+
+LIMITADOR = LimitadorGoogle()      # comum ao processo inteiro
+
+# ---------- SERVIÇO LIMITADO ----------------------------------------
+class _Requisicao:
+    def __init__(self, metodo, kwargs: dict, req, api: str, nome: str, limitador):
+        self._metodo    = metodo
+        self._kwargs    = kwargs
+        self._req       = req
+        self._api       = api
+        self._nome      = nome
+        self._limitador = limitador
+
+    def execute(self, **opcoes):
+        def chamar(kwargs: dict):
+            req = self._req if kwargs is self._kwargs else self._metodo(**kwargs)
+            return req.execute(**opcoes)
+        return self._limitador.executar(self._api, self._nome, self._kwargs, chamar)
+
+
+class _Recurso:
+    """Embrulha um serviço/recurso do googleapiclient: o `.execute()` final passa pelo limitador."""
+
+    def __init__(self, alvo, api: str, limitador, caminho: str = ""):
+        self._alvo      = alvo
+        self._api       = api
+        self._limitador = limitador
+        self._caminho   = caminho
+
+    def __getattr__(self, nome: str):
+        metodo  = getattr(self._alvo, nome)
+        caminho = f"{self._caminho}.{nome}" if self._caminho else nome
+
+        def chamar(*args, **kwargs):
+            res = metodo(*args, **kwargs)
+            if hasattr(res, "execute"):
+                return _Requisicao(metodo, kwargs, res, self._api, caminho, self._limitador)
+            return _Recurso(res, self._api, self._limitador, caminho)
+        return chamar
+
+
+def limitar(construir, limitador: LimitadorGoogle | None = None):
+    """`construir` (build ou o falso) cujos serviços respeitam o limitador."""
+    if getattr(construir, "limitador", None):
+        return construir                                # já limitado
+
+    limitador = limitador or LIMITADOR
+
+    def construir_limitado(api: str, versao: str = "", credentials=None, **kw):
+        return _Recurso(construir(api, versao, credentials=credentials, **kw), api, limitador)
+    construir_limitado.limitador = limitador
+    return construir_limitado
@@ -0,0 +1,338 @@
+# lote_docs.py
+"""
+► Lote de documentos: vários Google Docs — uma lista ou todos os docs de
+  uma pasta do Drive — numa execução só.
+► As abas do chat são UMA pool para o lote inteiro (`AgendadorAbas`).
+  Cada doc roda o `processar_documento` de sempre na própria thread, com
+  um backend de fachada que só põe o prompt na fila daquele doc; as abas
+  atendem as filas dos docs em rodízio (fila justa), então um doc de 500
+  prompts não segura os outros.
+► No máximo `docs_simultaneos` docs ao mesmo tempo: limita também as
+  chamadas à API Google do lote. Cada thread de doc tem os próprios
+  serviços (o httplib2 não é thread-safe) e o próprio diário.
+► Com fila, uma planilha só: aba "Documentos" com o progresso de cada
+  doc e uma aba de prompts por doc.
+"""
+
+import re
+import time
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+
+from clientes_google import CLIENTES
+from fila_sheets import criar_planilha_lote, gravar_documentos
+from motor import Config, processar_documento, criar_backend, CONCORRENCIA_MAX
+from pool_abas import Controle
+from limites_api import limitar
+from medicao import atual, usando
+
+MIME_DOC = "application/vnd.google-apps.document"
+
+
+# ---------- GOOGLE DRIVE --------------------------------------------
+def extrair_pasta_id(url: str | None):
+    m = re.search(r"/folders/([A-Za-z0-9\-_]+)", url or "")
+    return m.group(1) if m else None
+
+
+def listar_pasta(svc_drive, pasta_id: str) -> list[tuple[str, str]]:
+    """[(id, nome)] dos Google Docs da pasta (sem subpastas), por nome."""
+    docs, token = [], None
+    while True:
+        resp = svc_drive.files().list(
+            q=f"'{pasta_id}' in parents and mimeType='{MIME_DOC}' and trashed=false",
+            fields="nextPageToken,files(id,name)", orderBy="name", pageSize=100,
+            pageToken=token, supportsAllDrives=True, includeItemsFromAllDrives=True,
+        ).execute()
+        docs += [(f["id"], f["name"]) for f in resp.get("files", [])]
+        token = resp.get("nextPageToken")
+        if not token:
+            return docs
+
+# ---------- ABAS COMPARTILHADAS -------------------------------------
+class _Pedido:
+    def __init__(self, prompt: str, ao_parcial):
+        self.prompt     = prompt
+        self.ao_parcial = ao_parcial
+        self.pronto     = threading.Event()
+        self.html       = None
+        self.erro       = None
+        self.sala       = None
+        self.medidor    = atual()             # o do doc: a aba mede nele
+
+
+class AgendadorAbas:
+    """
+    `n_abas` sessões do `backend` atendendo as filas de vários docs em
+    rodízio. As abas abrem no primeiro pedido.
+    """
+
+    def __init__(self, backend, n_abas: int):
+        self.backend  = backend
+        self.n_abas   = max(1, n_abas)
+        self._filas   = {}                # doc → deque de _Pedido
+        self._vez     = deque()           # ordem do rodízio
+        self._cond    = threading.Condition()
+        self._vivas   = None              # None = abas ainda não abertas
+        self._fechado = False
+        self._motivo  = None
+
+    def backend_do(self, doc) -> "_BackendDoc":
+        with self._cond:
+            self._filas.setdefault(doc, deque())
+            self._vez.append(doc)
+        return _BackendDoc(self, doc)
+
+    def pedir(self, doc, prompt: str, ao_parcial=None) -> _Pedido:
+        p = _Pedido(prompt, ao_parcial)
+        with self._cond:
+            if self._vivas is None:
+                self._vivas = self.n_abas
+                for n in range(self.n_abas):
+                    threading.Thread(target=self._aba, args=(n,), daemon=True).start()
+            if self._fechado or not self._vivas:
+                p.erro = RuntimeError(f"Nenhuma aba disponível: {self._motivo}")
+                p.pronto.set()
+            else:
+                self._filas[doc].append(p)
+                self._cond.notify()
+        return p
+
+    def _proximo(self) -> _Pedido | None:
+        with self._cond:
+            while not self._fechado:
+                for _ in range(len(self._vez)):
+                    doc = self._vez[0]
+                    self._vez.rotate(-1)
+                    if self._filas[doc]:
+                        return self._filas[doc].popleft()
+                self._cond.wait()
+            return None
+
+    def _falhar(self, pedidos, motivo: str):
+        for p in pedidos:
+            p.erro = RuntimeError(motivo)
+            p.pronto.set()
+
+    def _aba(self, n: int):
+        try:
+            with self.backend.sessao(n) as responder:
+                while (p := self._proximo()) is not None:
+                    try:
+                        with usando(p.medidor, aninhado=True):
+                            p.html = responder(p.prompt, p.ao_parcial)
+                    except Exception as e:
+                        p.erro = e
+                    p.sala = self.backend.sala(n)
+                    p.pronto.set()
+        except Exception as e:
+            self._motivo = e
+        finally:
+            with self._cond:
+                self._vivas -= 1
+                if not self._vivas:             # sem abas: ninguém mais atende
+                    for fila in self._filas.values():
+                        self._falhar(fila, f"Nenhuma aba disponível: {self._motivo}")
+                        fila.clear()
+
+    def descartar(self, doc):
+        """Tira da fila os pedidos de um doc que terminou (abortado/cancelado)."""
+        with self._cond:
+            self._falhar(self._filas.get(doc, ()), "Documento encerrado")
+            self._filas.get(doc, deque()).clear()
+
+    def fechar(self):
+        with self._cond:
+            self._fechado = True
+            for fila in self._filas.values():
+                self._falhar(fila, "Lote encerrado")
+                fila.clear()
+            self._cond.notify_all()
+
+
+class _BackendDoc:
+    """
+    Fachada com a interface de backends.py: cada `responder` vira um pedido.
+    Qualquer aba do lote atende qualquer doc: a diretiva `sala` dos prompts
+    não vale no lote, e `grupo` só garante a ordem (cada prompt pode cair
+    numa aba diferente); a prioridade vale dentro de cada doc.
+    """
+
+    roteia_salas = False
+
+    def __init__(self, agendador: AgendadorAbas, doc):
+        self.agendador = agendador
+        self.doc       = doc
+        self.nome      = f"{agendador.backend.nome} (abas do lote)"
+        self.salas     = agendador.backend.salas
+        self._salas    = {}               # worker → sala que respondeu por último
+
+    def sala(self, n: int) -> str:
+        return self._salas.get(n) or self.salas[n % len(self.salas)]
+
+    @contextmanager
+    def sessao(self, n: int):
+        def responder(prompt: str, ao_parcial=None, seguimento: bool = False) -> str:
+            p = self.agendador.pedir(self.doc, prompt, ao_parcial)
+            p.pronto.wait()
+            if p.sala:
+                self._salas[n] = p.sala
+            if p.erro:
+                raise p.erro
+            return p.html
+        yield responder
+
+# ---------- LOTE ----------------------------------------------------
+@dataclass
+class ResultadoLote:
+    documentos: list = field(default_factory=list)   # [(doc_id, Resultado | None, erro | None)]
+    fila_url:   str | None = None
+    cancelado:  bool = False
+
+    def _soma(self, campo: str) -> int:
+        return sum(getattr(r, campo) for _, r, _ in self.documentos if r)
+
+    @property
+    def prompts(self) -> int:
+        return self._soma("prompts")
+
+    @property
+    def concluidos(self) -> int:
+        return self._soma("concluidos")
+
+    @property
+    def erros(self) -> int:
+        return self._soma("erros") + sum(1 for _, r, e in self.documentos if e)
+
+    @property
+    def abortado(self) -> bool:
+        return any(e or r.abortado for _, r, e in self.documentos)
+
+
+def processar_lote(cfg: Config, creds, doc_ids: list[str] = (), pasta: str | None = None,
+                   log=print, ao_ocioso=None, controle: Controle | None = None,
+                   ao_progresso=None, construir=CLIENTES,
+                   docs_simultaneos: int = 2) -> ResultadoLote:
+    """
+    Roda `processar_documento` em cada doc de `doc_ids` e/ou da `pasta` do
+    Drive (precisa do escopo drive), dividindo as abas do chat entre eles.
+    `cfg` vale para todos os docs (o `doc_id` dele é ignorado). Com
+    `cfg.limitar_api`, as cotas da API valem para o lote todo.
+    """
+    if cfg.limitar_api:
+        construir = limitar(construir)
+    res      = ResultadoLote()
+    controle = controle or Controle()
+    docs     = [(d, "") for d in doc_ids]
+    if pasta:
+        docs += listar_pasta(construir("drive", "v3", credentials=creds), pasta)
+        log(f"📁 {len(docs) - len(doc_ids)} doc(s) na pasta.")
+    if not docs:
+        log("Nenhum documento para processar.")
+        return res
+
+    backend   = criar_backend(cfg)
+    limite    = getattr(backend, "concorrencia_max", CONCORRENCIA_MAX)
+    agendador = AgendadorAbas(backend, max(1, min(cfg.n_abas, limite)))
+    por_doc   = hasattr(backend, "para_doc")   # a fila já reparte: sem abas a dividir
+
+    # ---- fila no Sheets: uma planilha para o lote, uma aba por doc
+    svc_sheets = sheet_id = None
+    abas       = ["Fila"] * len(docs)
+    resumo     = {}
+    if cfg.usar_fila:
+        svc_sheets = construir("sheets", "v4", credentials=creds)
+        log("📄 Criando planilha da fila…")
+        sheet_id, res.fila_url, abas = criar_planilha_lote(
+            svc_sheets, len(docs), cfg.abrir_fila_no_navegador)
+        log(f"📎 Fila: {res.fila_url}")
+
+    def anotar(k: int, status: str, prog=(0, 0, 0)):
+        if sheet_id:
+            d, nome = docs[k]
+            resumo[k] = [nome or d, f"https://docs.google.com/document/d/{d}", status, *prog]
+
+    def gravar_resumo():
+        if sheet_id:
+            gravar_documentos(svc_sheets, sheet_id, resumo)
+            resumo.clear()
+
+    for k in range(len(docs)):
+        anotar(k, "Pendente")
+    gravar_resumo()
+
+    eventos   = queue.Queue()
+    progresso = {}                      # doc → (concluídos, erros, total)
+
+    def trabalho(k: int):
+        d = docs[k][0]
+        c = replace(cfg, doc_id=d, backend=backend if por_doc else agendador.backend_do(k),
+                    fila_planilha=sheet_id, fila_aba=abas[k], abrir_fila_no_navegador=False)
+        try:
+            r = processar_documento(
+                c, creds, log=lambda msg: eventos.put(("log", k, msg)), controle=controle,
+                ao_progresso=lambda *p: eventos.put(("progresso", k, p)), construir=construir)
+            eventos.put(("fim", k, r))
+        except Exception as e:
+            eventos.put(("falha", k, e))
+        finally:
+            agendador.descartar(k)
+
+    fila_docs = deque(range(len(docs)))
+    ativos    = 0
+    fins      = [None] * len(docs)
+    t_resumo  = 0.0
+    try:
+        while fila_docs or ativos:
+            while fila_docs and ativos < max(1, docs_simultaneos) and not controle.cancelado:
+                k = fila_docs.popleft()
+                log(f"📄 [doc {k + 1}/{len(docs)}] {docs[k][1] or docs[k][0]}")
+                anotar(k, "Em Processo")
+                threading.Thread(target=trabalho, args=(k,), daemon=True).start()
+                ativos += 1
+            if controle.cancelado and not ativos:
+                break
+            try:
+                tipo, k, dado = eventos.get(timeout=0.2)
+            except queue.Empty:
+                if ao_ocioso:
+                    ao_ocioso()
+                if resumo and t_resumo + cfg.status_max_seg <= time.time():
+                    gravar_resumo()
+                    t_resumo = time.time()
+                continue
+
+            if tipo == "log":
+                log(f"[doc {k + 1}] {dado}")
+            elif tipo == "progresso":
+                progresso[k] = dado
+                anotar(k, "Em Processo", dado)
+                if ao_progresso:
+                    ao_progresso(*(sum(p[j] for p in progresso.values()) for j in range(3)))
+            else:
+                ativos -= 1
+                fins[k] = (None, dado) if tipo == "falha" else (dado, None)
+                if tipo == "falha":
+                    log(f"✗ [doc {k + 1}] {dado}")
+                    anotar(k, "Erro", progresso.get(k, (0, 0, 0)))
+                else:
+                    docs[k] = (docs[k][0], docs[k][1] or dado.titulo)
+                    anotar(k, "Cancelado" if dado.cancelado else
+                              "Erro" if dado.abortado or dado.erros else "Concluído",
+                           (dado.concluidos, dado.erros, dado.prompts))
+                gravar_resumo()
+                t_resumo = time.time()
+    finally:
+        agendador.fechar()
+
+    res.cancelado  = controle.cancelado
+    res.documentos = [(d, *(fim or (None, None))) for (d, _), fim in zip(docs, fins)
+                      if fim is not None]
+    if sheet_id and fila_docs:
+        for k in fila_docs:
+            anotar(k, "Cancelado")
+        gravar_resumo()
+    return res
@@ -0,0 +1,168 @@
+# medicao.py
+"""
+► Tempos por etapa da execução (envio, geração, estabilização,
+  conversão, inserção, verificação…), para achar o gargalo de verdade.
+► Cada thread trabalha com o `Medidor` que estiver ligado nela
+  (`usando`); sem medidor, `etapa` e `dormir` não custam quase nada e não
+  gravam nada. O motor liga um medidor por execução; o pool de abas leva
+  o mesmo para as threads das abas.
+► `dormir` é o `time.sleep` medido: as esperas fixas (e a janela de
+  silêncio do `aguardar_pronto`) entram como etapas `fixo`, e o resumo
+  mostra quanto do tempo medido foi espera fixa.
+► Exporta em JSON lines (um span por linha) ou no formato texto do
+  Prometheus (summary por etapa).
+"""
+
+import json
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+_local = threading.local()
+_trava_arquivo = threading.Lock()
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil `p` (0–100) por interpolação linear; 0 se vazio."""
+    if not valores:
+        return 0.0
+    v = sorted(valores)
+    k = (len(v) - 1) * p / 100
+    a = int(k)
+    b = min(a + 1, len(v) - 1)
+    return v[a] + (v[b] - v[a]) * (k - a)
+
+
+# ---------- MEDIDOR -------------------------------------------------
+class Medidor:
+    def __init__(self, rotulo: str = ""):
+        self.rotulo = rotulo
+        self.spans  = []      # (etapa, início epoch, duração, thread, fixo, topo)
+        self._trava = threading.Lock()
+        self._t0    = time.time() - time.perf_counter()     # perf_counter → epoch
+
+    def registrar(self, etapa: str, ini: float, dur: float, fixo: bool = False,
+                  topo: bool = False):
+        """`ini` em `time.perf_counter()`; `topo` = fora de qualquer outra etapa."""
+        with self._trava:
+            self.spans.append((etapa, self._t0 + ini, dur,
+                               threading.current_thread().name, fixo, topo))
+
+    def resumo(self) -> dict:
+        """{etapa: {n, total, p50, p95, max, fixo}} e, em "_fixo_pct", a parte
+        do tempo das etapas de topo que foi espera fixa."""
+        durs, fixas = defaultdict(list), set()
+        topo = fixo = 0.0
+        with self._trava:
+            spans = list(self.spans)
+        for etapa, _, dur, _, eh_fixo, eh_topo in spans:
+            durs[etapa].append(dur)
+            if eh_fixo:
+                fixas.add(etapa)
+                fixo += dur
+            if eh_topo:
+                topo += dur
+        res = {e: {"n": len(d), "total": sum(d), "p50": percentil(d, 50),
+                   "p95": percentil(d, 95), "max": max(d), "fixo": e in fixas}
+               for e, d in sorted(durs.items())}
+        res["_fixo_pct"] = 100 * fixo / topo if topo else 0.0
+        return res
+
+    def relatorio(self) -> list[str]:
+        """Linhas do resumo de fim de execução (tempos em ms)."""
+        res    = self.resumo()
+        pct    = res.pop("_fixo_pct")
+        linhas = [f"{'etapa':<22}{'n':>6}{'total s':>10}{'p50':>9}{'p95':>9}{'máx':>9}"]
+        for e, r in sorted(res.items(), key=lambda kv: -kv[1]["total"]):
+            linhas.append(f"{e + (' *' if r['fixo'] else ''):<22}{r['n']:>6}{r['total']:>10.1f}"
+                          f"{r['p50'] * 1000:>9.0f}{r['p95'] * 1000:>9.0f}{r['max'] * 1000:>9.0f}")
+        linhas.append(f"* espera fixa: {pct:.0f}% do tempo medido")
+        return linhas
+
+    # ---------- EXPORTAÇÃO ------------------------------------------
+    def jsonl(self) -> str:
+        with self._trava:
+            spans = list(self.spans)
+        return "".join(json.dumps({"doc": self.rotulo, "etapa": e, "inicio": round(i, 6),
+                                   "dur": round(d, 6), "thread": t, "fixo": f, "topo": tp},
+                                  ensure_ascii=False) + "\n"
+                       for e, i, d, t, f, tp in spans)
+
+    def prometheus(self, prefixo: str = "automatizador") -> str:
+        res = self.resumo()
+        pct = res.pop("_fixo_pct")
+        doc = self.rotulo.replace("\\", "\\\\").replace('"', '\\"')
+        nome = f"{prefixo}_etapa_segundos"
+        linhas = [f"# HELP {nome} Duração das etapas da execução.",
+                  f"# TYPE {nome} summary"]
+        for e, r in res.items():
+            rot = f'doc="{doc}",etapa="{e}"'
+            linhas += [f'{nome}{{{rot},quantile="0.5"}} {r["p50"]:.6f}',
+                       f'{nome}{{{rot},quantile="0.95"}} {r["p95"]:.6f}',
+                       f'{nome}{{{rot},quantile="1"}} {r["max"]:.6f}',
+                       f"{nome}_sum{{{rot}}} {r['total']:.6f}",
+                       f"{nome}_count{{{rot}}} {r['n']}"]
+        linhas += [f"# HELP {prefixo}_espera_fixa_ratio Parte do tempo medido em espera fixa.",
+                   f"# TYPE {prefixo}_espera_fixa_ratio gauge",
+                   f'{prefixo}_espera_fixa_ratio{{doc="{doc}"}} {pct / 100:.4f}']
+        return "\n".join(linhas) + "\n"
+
+    def exportar(self, caminho: str):
+        """`.prom` → texto do Prometheus (sobrescreve); outro → JSON lines (acrescenta)."""
+        with _trava_arquivo:
+            if caminho.endswith(".prom"):
+                with open(caminho, "w", encoding="utf-8") as f:
+                    f.write(self.prometheus())
+            else:
+                with open(caminho, "a", encoding="utf-8") as f:
+                    f.write(self.jsonl())
+
+# ---------- API POR THREAD ------------------------------------------
+def atual() -> Medidor | None:
+    return getattr(_local, "medidor", None)
+
+
+@contextmanager
+def usando(medidor: Medidor | None, aninhado: bool = False):
+    """
+    Liga `medidor` nesta thread enquanto durar o bloco. `aninhado`: o
+    trabalho já é medido por uma etapa de outra thread (não conta como topo).
+    """
+    antes, prof = atual(), getattr(_local, "prof", 0)
+    _local.medidor, _local.prof = medidor, int(aninhado)
+    try:
+        yield medidor
+    finally:
+        _local.medidor, _local.prof = antes, prof
+
+
+@contextmanager
+def etapa(nome: str, fixo: bool = False):
+    m = atual()
+    if m is None:
+        yield
+        return
+    prof      = _local.prof
+    _local.prof = prof + 1
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _local.prof = prof
+        m.registrar(nome, t, time.perf_counter() - t, fixo, prof == 0)
+
+
+def registrar(nome: str, ini: float, dur: float, fixo: bool = False):
+    """Etapa medida por outro meio (`ini` em `time.perf_counter()`)."""
+    m = atual()
+    if m is not None and dur > 0:
+        m.registrar(nome, ini, dur, fixo, _local.prof == 0)
+
+
+def dormir(seg: float, motivo: str):
+    """`time.sleep` que conta como espera fixa ("sono.<motivo>")."""
+    if seg <= 0:
+        return
+    with etapa(f"sono.{motivo}", fixo=True):
+        time.sleep(seg)
@@ -0,0 +1,445 @@
+# motor.py
+"""
+► Motor do automatizador, sem interface: importável e usado pela CLI
+  (cli.py) e pelos front-ends Tk (main.py, code-create.py).
+► `processar_documento` faz a execução inteira de um Google Docs:
+    1. Coleta os prompts !*! (e, com fila, grava todos como Pendente).
+    2. Pula o que o diário diz que já está no doc; tira do diário/cache o
+       que já foi respondido.
+    3. Manda o resto às abas do chat em paralelo, na ordem das diretivas
+       dos prompts (prioridade, grupo, sala — google_docs.py).
+    4. Grava as respostas em lote e confere cada uma. Com
+       `escrita_parcial`, o texto já gerado vai ao doc aos poucos e a
+       gravação em lote só completa cada resposta.
+► Mensagens de progresso saem por `log(str)` e contadores por
+  `ao_progresso(concluidos, erros, total)`; `ao_ocioso()` é chamado
+  enquanto espera as abas. Pode rodar fora da thread principal: pausa e
+  cancelamento chegam por um `Controle` (pool_abas.py).
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from clientes_google import CLIENTES
+from chat import CHROME_DEBUG_URL, CAPTURAS
+from backends import BackendPlaywright
+from navegador import Navegador, PERFIL_PADRAO
+from conversores import html_para_texto
+from google_docs import indexar_documento, MONTADORES, RECUO_FIM_DOC, ENTRADA_HTML
+from formatacao import texto_docs, texto_para_html
+from fila_sheets import (criar_planilha_fila, registrar_prompts_iniciais,
+                         atualizar_status, gravar_status)
+from pool_abas import PoolAbas, Controle, INICIO, ERRO, PARCIAL
+from escrita_docs import EscritorDocs
+from cache_respostas import CacheRespostas
+from limites_api import limitar
+from medicao import Medidor, usando, etapa
+from journal import (Journal, caminho_journal, chaves_prompts, reconciliar,
+                     ENVIADO, RESPONDIDO, INSERIDO, VERIFICADO)
+
+CONCORRENCIA_MAX = 8      # máximo de abas do chat em paralelo
+
+
+@dataclass
+class Config:
+    doc_id:                  str
+    links_chat:              list[str] = field(default_factory=list)
+    n_abas:                  int   = 1
+    retomar:                 bool  = False
+    usar_fila:               bool  = False    # fila de status no Google Sheets
+    abrir_fila_no_navegador: bool  = False
+    fila_planilha:           str | None = None   # planilha já criada (lote de docs)…
+    fila_aba:                str   = "Fila"   # …e a aba deste doc nela
+    insercao:                str   = "uma_linha"   # chave de MONTADORES
+    cdp_url:                 str   = CHROME_DEBUG_URL
+    backend:                 object | None = None   # None = Playwright (cdp_url + links_chat)
+    captura:                 str   = "dom"    # chave de CAPTURAS (só no Playwright)
+    lancar_navegador:        bool  = False    # sobe o Chrome se o CDP não responder…
+    headless:                bool  = False    # …sem janela…
+    perfil_navegador:        str | None = PERFIL_PADRAO   # …neste perfil (None = temporário)
+    nova_conversa_a_cada:    int   = 0        # conversa nova a cada N prompts…
+    nova_conversa_nos_dom:   int   = 0        # …ou com N elementos na página (0 = nunca)
+    preambulo:               str   = ""       # 1ª mensagem de cada conversa nova
+    lote_max_respostas:      int   = 20       # grava no Docs ao juntar N respostas…
+    lote_max_seg:            float = 15       # …ou quando a mais antiga espera N s
+    status_max_seg:          float = 5        # grava os status da fila a cada N s
+    cache_arquivo:           str | None = "respostas_cache.sqlite3"   # None = sem cache
+    cache_max_mb:            float = 200
+    cache_max_dias:          float = 30
+    limitar_api:             bool  = True     # cotas, backoff e fusão das chamadas Google
+    escrita_parcial:         bool  = False    # grava a resposta enquanto é gerada…
+    parcial_min_chars:       int   = 400      # …a cada N caracteres novos…
+    parcial_min_seg:         float = 2.0      # …ou N s desde a última parcial;
+    parcial_por_min:         float = 20       # no doc, até N batchUpdates de parciais/min
+    medicao_arquivo:         str | None = None  # tempos por etapa: .prom (Prometheus) ou JSON lines
+
+
+@dataclass
+class Resultado:
+    prompts:    int  = 0
+    concluidos: int  = 0
+    erros:      int  = 0
+    abortado:   bool = False
+    cancelado:  bool = False
+    fila_url:   str | None = None
+    titulo:     str  = ""
+    falhas:     list = field(default_factory=list)   # [(nº do prompt, motivo)]
+    feitos:     list = field(default_factory=list)   # nº dos prompts gravados e conferidos
+    etapas:     dict = field(default_factory=dict)   # resumo dos tempos (medicao.py)
+
+
+def criar_backend(cfg: Config):
+    """
+    `cfg.backend` ou o Playwright montado a partir da configuração. Um
+    backend com `para_doc` (a fila distribuída) é visto pelo `cfg.doc_id`.
+    """
+    if hasattr(cfg.backend, "para_doc"):
+        return cfg.backend.para_doc(cfg.doc_id)
+    return cfg.backend or BackendPlaywright(
+        cfg.cdp_url, cfg.links_chat, CAPTURAS[cfg.captura],
+        nova_a_cada=cfg.nova_conversa_a_cada, nova_nos_dom=cfg.nova_conversa_nos_dom,
+        preambulo=cfg.preambulo, navegador=criar_navegador(cfg))
+
+
+def criar_navegador(cfg: Config) -> Navegador:
+    return Navegador(cfg.cdp_url, lancar=cfg.lancar_navegador, headless=cfg.headless,
+                     perfil=cfg.perfil_navegador)
+
+
+def planejar(prompts: list, backend, log=print) -> tuple[list[list[int]], dict]:
+    """
+    (grupos, salas) para `PoolAbas.executar` a partir das diretivas dos
+    `prompts`: um grupo por `grupo` (ou por prompt solto), na ordem da
+    maior prioridade e depois do doc; sala = a do 1º prompt do grupo que
+    pedir uma, resolvida para o link do chat.
+    """
+    grupos, prio = {}, {}
+    for k, p in enumerate(prompts):
+        g = ("grupo", p.grupo) if p.grupo else ("solto", k)
+        grupos.setdefault(g, []).append(k)
+        prio[g] = max(prio.get(g, p.prioridade), p.prioridade)
+    ordem = sorted(grupos, key=lambda g: (-prio[g], grupos[g][0]))
+
+    salas, ignoradas = {}, set()
+    for n, g in enumerate(ordem):
+        pedida = next((prompts[k].sala for k in grupos[g] if prompts[k].sala), None)
+        if pedida is None:
+            continue
+        if pedida.isdigit() and 1 <= int(pedida) <= len(backend.salas):
+            pedida = backend.salas[int(pedida) - 1]
+        if pedida in backend.salas and getattr(backend, "roteia_salas", True):
+            salas[n] = pedida
+        else:
+            ignoradas.add(pedida)
+    if ignoradas:
+        log(f"⚠ Sala(s) ignorada(s) (fora dos links do chat ou em lote): "
+            f"{', '.join(sorted(ignoradas))}")
+    return [grupos[g] for g in ordem], salas
+
+
+def processar_documento(cfg: Config, creds, log=print, ao_ocioso=None,
+                        controle: Controle | None = None,
+                        ao_progresso=None, construir=CLIENTES,
+                        doc: dict | None = None, indices=None) -> Resultado:
+    """
+    `construir` cria os serviços Google (`CLIENTES` de clientes_google.py, o
+    `build` da biblioteca, ou o falso de google_falso.py).
+    `doc` é o `documents().get` já lido (não lê de novo); `indices`, só os
+    prompts nessas posições (na ordem do doc) são processados (vigia.py).
+    Mede o tempo de cada etapa e termina com o resumo no log; com
+    `cfg.medicao_arquivo` ("{doc}" vira o id do doc), exporta os tempos.
+    """
+    medidor = Medidor(cfg.doc_id)
+    with usando(medidor):
+        res = _processar(cfg, creds, log, ao_ocioso, controle, ao_progresso, construir,
+                         doc, indices)
+    res.etapas = medidor.resumo()
+    if medidor.spans:
+        log("⏱ Tempo por etapa (ms; * = espera fixa):")
+        for linha in medidor.relatorio():
+            log("   " + linha)
+    if cfg.medicao_arquivo:
+        caminho = cfg.medicao_arquivo.replace("{doc}", cfg.doc_id)
+        try:
+            medidor.exportar(caminho)
+        except OSError as e:
+            log(f"⚠ Não gravou os tempos em {caminho}: {e}")
+    return res
+
+
+def _processar(cfg: Config, creds, log, ao_ocioso, controle, ao_progresso,
+               construir, doc, indices) -> Resultado:
+    if cfg.limitar_api:
+        construir = limitar(construir)
+    res      = Resultado()
+    controle = controle or Controle()
+    backend  = criar_backend(cfg)
+    svc_docs = construir("docs", "v1", credentials=creds)
+
+    # ---- fila no Sheets (opcional):
+    svc_sheets = sheet_id = None
+    if cfg.usar_fila:
+        svc_sheets = construir("sheets", "v4", credentials=creds)
+        if cfg.fila_planilha:
+            sheet_id     = cfg.fila_planilha
+            res.fila_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+        else:
+            log("📄 Criando planilha da fila…")
+            sheet_id, res.fila_url = criar_planilha_fila(svc_sheets,
+                                                         cfg.abrir_fila_no_navegador)
+            log(f"📎 Fila: {res.fila_url}")
+
+    # ---- coleta prompts:
+    with etapa("coleta"):
+        if doc is None:
+            doc = svc_docs.documents().get(documentId=cfg.doc_id).execute()
+        body    = doc["body"]["content"]
+        prompts, espelho = indexar_documento(body)
+    fim_doc = prompts[-1].fim if prompts else 0
+    if indices is not None:
+        prompts = [p for k, p in enumerate(prompts) if k in indices]
+    res.prompts, res.titulo = len(prompts), doc.get("title", "")
+    if not prompts:
+        log("Nenhum !*! encontrado.")
+        return res
+
+    # ---- diário: na retomada, reconcilia com o doc re-lido
+    journal = Journal(caminho_journal(cfg.doc_id))
+    chaves  = chaves_prompts(prompts)
+    herdados, prontos, reinserir = (
+        reconciliar(journal.carregar(), chaves, prompts, espelho)
+        if cfg.retomar else (None, set(), {}))
+    journal.abrir(cfg.doc_id, doc.get("revisionId"), chaves, herdados)
+    if herdados:
+        log(f"↺ Retomando: {len(prontos)} prompt(s) já no doc, "
+            f"{len(reinserir)} resposta(s) a regravar.")
+    res.concluidos += len(prontos)
+    res.feitos.extend(i + 1 for i in sorted(prontos))
+
+    linhas, status, t_status = [], {}, time.time()
+    if cfg.usar_fila:
+        # grava todos como Pendente
+        with etapa("fila"):
+            linhas = registrar_prompts_iniciais(svc_sheets, sheet_id, prompts, cfg.fila_aba)
+        log(f"{len(prompts)} prompt(s) listado(s) na fila.")
+    else:
+        log(f"{len(prompts)} prompt(s) encontrado(s).")
+
+    def progresso():
+        if ao_progresso:
+            ao_progresso(res.concluidos, res.erros, res.prompts)
+
+    def marcar(i: int, novo_status: str, observacao: str = ""):
+        if linhas:
+            atualizar_status(status, linhas[i], novo_status, observacao)
+
+    def gravar_fila():
+        if linhas and status:
+            with etapa("fila"):
+                gravar_status(svc_sheets, sheet_id, status, cfg.fila_aba)
+
+    for i in prontos:
+        marcar(i, "Concluído", "Retomado do diário")
+    progresso()
+
+    n_abas   = max(1, min(cfg.n_abas, getattr(backend, "concorrencia_max", CONCORRENCIA_MAX)))
+    cache    = (CacheRespostas(cfg.cache_arquivo, cfg.cache_max_mb, cfg.cache_max_dias)
+                if cfg.cache_arquivo else None)
+    pool     = PoolAbas(backend, n_abas, controle=controle, parcial=cfg.escrita_parcial)
+    escritor = EscritorDocs(svc_docs, cfg.doc_id, MONTADORES[cfg.insercao],
+                            max_respostas=cfg.lote_max_respostas,
+                            max_seg=cfg.lote_max_seg,
+                            espelho=espelho, revisao=doc.get("revisionId"),
+                            parciais_por_min=cfg.parcial_por_min)
+
+    def falha(i: int, motivo: str):
+        res.erros += 1
+        res.falhas.append((i + 1, motivo))
+        marcar(i, "Erro", motivo[:200])
+        progresso()
+
+    def descarregar() -> bool:
+        """Grava o lote pendente num batchUpdate e confere as respostas."""
+        if not escritor.pendentes():
+            return True
+        log(f"💾 Gravando {escritor.pendentes()} resposta(s)…")
+        lote = escritor.chaves_pendentes()
+        try:
+            with etapa("gravacao"):
+                gravados = escritor.descarregar()
+        except Exception as e:
+            for i in lote:
+                falha(i, "Falha ao inserir")
+            gravar_fila()
+            log(f"✗ Falha ao inserir ({e}) — abortando.")
+            return False
+        for i, _, ok in gravados:
+            journal.estado(chaves[i], INSERIDO)
+            if ok:
+                journal.estado(chaves[i], VERIFICADO)
+                res.concluidos += 1
+                res.feitos.append(i + 1)
+                marcar(i, "Concluído")
+                log(f"✓ OK (prompt {i + 1})")
+                progresso()
+            else:
+                falha(i, "Falha ao inserir")
+                log(f"✗ Prompt {i + 1} não conferiu — abortando.")
+        gravar_fila()
+        journal.revisao(escritor.revisao)
+        return all(ok for _, _, ok in gravados)
+
+    def ocioso():
+        nonlocal t_status
+        if ao_ocioso:
+            ao_ocioso()
+        if not res.abortado and escritor.precisa_descarregar():
+            res.abortado = not descarregar()
+        elif not res.abortado and escritor.precisa_gravar_parciais():
+            gravar_parciais()
+        if time.time() - t_status >= cfg.status_max_seg:
+            gravar_fila()
+            t_status = time.time()
+
+    rica = cfg.insercao in ENTRADA_HTML
+
+    def resposta(html: str | None, texto: str) -> tuple[str, str | None]:
+        """(texto como fica no doc, HTML p/ o montador) conforme o formato."""
+        if not rica:
+            return texto, None
+        html = html or texto_para_html(texto)
+        return texto_docs(html), html
+
+    def posicao(i: int) -> int:
+        """endIndex original do prompt `i`, como o escritor espera."""
+        end_idx = prompts[i].fim
+        if prompts[i].fim == fim_doc or prompts[i].fim_bloco:
+            end_idx -= RECUO_FIM_DOC[cfg.insercao]  # evita erro ao inserir no fim do doc/célula
+        return end_idx
+
+    def enfileirar(i: int, texto_resp: str, html: str | None = None) -> bool:
+        """Põe a resposta do prompt `i` no lote; descarrega se encheu."""
+        escritor.adicionar(posicao(i), html if rica else texto_resp,
+                           chave=i, prompt=prompts[i].texto)
+        return not escritor.precisa_descarregar() or descarregar()
+
+    ult_parcial = {}   # prompt → (caracteres já agendados, hora da última parcial)
+
+    def parcial(i: int, html: str):
+        """Agenda o texto parcial do prompt `i` se juntou caracteres ou tempo."""
+        if i not in ult_parcial or res.abortado:
+            return
+        with etapa("conversao_parcial"):
+            texto  = html_para_texto(html).strip()
+        n, t       = ult_parcial[i]
+        if len(texto) <= n or (len(texto) - n < cfg.parcial_min_chars
+                               and time.time() - t < cfg.parcial_min_seg):
+            return
+        escritor.agendar_parcial(posicao(i), html if rica else texto, chave=i)
+        ult_parcial[i] = (len(texto), time.time())
+        if escritor.precisa_gravar_parciais():
+            gravar_parciais()
+
+    def gravar_parciais():
+        """Uma gravação para as parciais de todos os prompts, no ritmo da cota."""
+        try:
+            with etapa("gravacao_parcial"):
+                escritor.gravar_parciais()
+        except Exception as e:
+            ult_parcial.clear()                     # ficam as últimas parciais; a final corrige
+            log(f"⚠ Falha na escrita parcial: {e}")
+
+    def descartar_parcial(i: int):
+        ult_parcial.pop(i, None)
+        try:
+            escritor.descartar_parcial(posicao(i), i)
+        except Exception as e:
+            log(f"⚠ Texto parcial do prompt {i + 1} ficou no doc: {e}")
+
+    # ---- já no doc (diário) é pulado; diário/cache não vão ao chat:
+    faltam, n_cache = [], 0
+    for i, (_, prompt_txt, *_) in enumerate(prompts):
+        if controle.cancelado:
+            break
+        if i in prontos:
+            continue
+        if i in reinserir:
+            texto_resp, html = resposta(reinserir[i][1], reinserir[i][0])
+        else:
+            hit = cache.obter(prompt_txt, backend.salas) if cache else None
+            if hit is None:
+                faltam.append(i)
+                continue
+            texto_resp, html = resposta(*hit)
+            n_cache += 1
+            journal.estado(chaves[i], RESPONDIDO, texto_resp, html)
+        if not enfileirar(i, texto_resp, html):
+            res.abortado = True
+            break
+    if n_cache:
+        log(f"♻ {n_cache} resposta(s) vinda(s) do cache.")
+    if faltam and not (res.abortado or controle.cancelado):
+        log(f"🕸️ Conectando ao {backend.nome} ({n_abas} aba(s))…")
+
+    grupos, rotas = planejar([prompts[i] for i in faltam], backend, log)
+    abas    = {}  # prompt → aba que respondeu (a sala entra na chave do cache)
+    eventos = pool.executar([prompts[i].texto for i in faltam], ao_ocioso=ocioso,
+                            grupos=grupos, salas=rotas) \
+        if faltam and not (res.abortado or controle.cancelado) else []
+    for tipo, k, dado in eventos:
+        if res.abortado:
+            break
+        if k is None:
+            log(f"⚠ Aba indisponível: {dado}")
+            continue
+
+        i          = faltam[k]
+        prompt_txt = prompts[i].texto
+        if tipo == INICIO:
+            abas[i] = dado
+            if cfg.escrita_parcial:
+                ult_parcial[i] = (0, time.time())
+            journal.estado(chaves[i], ENVIADO)
+            marcar(i, "Em Processo")
+            log(f"→ [aba {dado + 1}] {prompt_txt[:60]}…")
+            continue
+        if tipo == PARCIAL:
+            parcial(i, dado)
+            continue
+        ult_parcial.pop(i, None)
+        if tipo == ERRO:
+            descartar_parcial(i)
+            falha(i, str(dado))
+            log(f"⚠ Erro no prompt {i + 1}: {dado}")
+            continue
+
+        with etapa("conversao"):
+            texto_resp = html_para_texto(dado).strip()
+        if not texto_resp:
+            descartar_parcial(i)
+            falha(i, "Resposta vazia")
+            log(f"⚠ Resposta vazia (prompt {i + 1})")
+            continue
+
+        if cache:
+            cache.guardar(prompt_txt, backend.sala(abas[i]), dado, texto_resp)
+        with etapa("conversao"):
+            texto_resp, html = resposta(dado, texto_resp)
+        journal.estado(chaves[i], RESPONDIDO, texto_resp, html)
+        if not enfileirar(i, texto_resp, html):
+            res.abortado = True
+            break
+
+    # cancelado: grava o que já foi respondido e para
+    if controle.cancelado:
+        res.cancelado = True
+        log("⏹ Cancelado — gravando as respostas já obtidas.")
+    if not res.abortado:
+        res.abortado = not descarregar()
+    for i in escritor.parciais_abertos():          # respostas que não chegaram ao fim
+        descartar_parcial(i)
+    if cache:
+        cache.fechar()
+    journal.fechar()
+    gravar_fila()
+    return res
@@ -0,0 +1,229 @@
+# navegador.py
+"""
+► Ciclo de vida do navegador do chat, para os workers de backends.py:
+    • `Navegador` – garante um Chrome/Chromium com CDP no ar: só conecta
+      (padrão, o Chrome que o usuário abriu) ou sobe um — Windows, macOS
+      ou Linux, com janela ou headless, com perfil persistente (login
+      guardado) ou temporário. Pronto = o endpoint CDP responde, não um
+      tempo fixo;
+    • `AbaChat`   – a aba de UM worker: conecta por CDP na thread dele (a
+      API síncrona não cruza threads), reaproveita uma aba da mesma sala
+      que já esteja aberta e livre (aba "aquecida") em vez de abrir outra,
+      e se a conexão cair reconecta e volta à mesma aba/conversa;
+    • `aquecer`   – deixa N abas já carregadas na sala antes da execução.
+► Aba pronta = o campo de mensagem apareceu (sem `sleep` depois do goto).
+  No fim da sessão a aba é devolvida já na página de conversa nova da
+  sala: a próxima execução começa sem carregar nada.
+"""
+
+import os
+import atexit
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+import uuid
+from urllib.error import URLError
+from urllib.parse import urlsplit
+from urllib.request import urlopen
+
+from playwright.sync_api import sync_playwright
+
+from chat import (CHROME_PATH, CHROME_USER_DATA_DIR, CHROME_DEBUG_URL, SEL_COMPOSER,
+                  link_conversa_nova)
+from medicao import dormir
+
+LIMITE_CDP_SEG    = 30     # o Chrome lançado tem que abrir o CDP em até N s
+LIMITE_PRONTO_SEG = 30     # a aba tem que mostrar o campo de mensagem em até N s
+
+CANDIDATOS_LINUX = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")
+CHROME_MAC       = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+PERFIL_PADRAO    = (CHROME_USER_DATA_DIR if sys.platform.startswith("win")
+                    else os.path.expanduser("~/.config/automatizador-chrome"))
+
+# Marca a aba como de um worker; o JS da página roda numa thread só, então
+# dois workers nunca ganham a mesma aba. Navegar apaga a marca.
+JS_TOMAR  = "dono => (window.__autoDono && window.__autoDono !== dono) ? false : (window.__autoDono = dono, true)"
+JS_SOLTAR = "dono => { if (window.__autoDono === dono) window.__autoDono = null; }"
+
+
+def localizar_chrome() -> str | None:
+    """Executável do Chrome/Chromium: $CHROME_PATH, senão o padrão do sistema."""
+    if os.environ.get("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+    if sys.platform.startswith("win"):
+        return CHROME_PATH
+    if sys.platform == "darwin":
+        return CHROME_MAC
+    return next(filter(None, map(shutil.which, CANDIDATOS_LINUX)), None)
+
+
+def cdp_pronto(cdp_url: str, timeout: float = 1.0) -> bool:
+    try:
+        with urlopen(cdp_url.rstrip("/") + "/json/version", timeout=timeout):
+            return True
+    except (URLError, OSError, ValueError):
+        return False
+
+
+def aguardar_composer(page, limite: float = LIMITE_PRONTO_SEG):
+    """Espera a aba mostrar o campo de mensagem (página carregada e logada)."""
+    try:
+        page.locator(SEL_COMPOSER).first.wait_for(state="visible", timeout=limite * 1000)
+    except Exception as e:
+        raise RuntimeError(f"o chat não ficou pronto em {limite:.0f} s "
+                           f"(login? {page.url})") from e
+
+# ---------- NAVEGADOR -----------------------------------------------
+class Navegador:
+    def __init__(self, cdp_url: str = CHROME_DEBUG_URL, lancar: bool = False,
+                 headless: bool = False, perfil: str | None = PERFIL_PADRAO,
+                 executavel: str | None = None):
+        """
+        `lancar=False` só conecta ao Chrome em `cdp_url`. Com `lancar`, sobe
+        o Chrome quando o CDP não responde (e de novo se ele morrer);
+        `perfil=None` usa um perfil temporário, descartado no fim.
+        """
+        self.cdp_url    = cdp_url
+        self.lancar     = lancar
+        self.headless   = headless
+        self.perfil     = perfil
+        self.executavel = executavel
+        self.proc       = None
+        self._tmp       = None
+        self._trava     = threading.Lock()
+
+    def _argumentos(self) -> list[str]:
+        exe = self.executavel or localizar_chrome()
+        if not exe:
+            raise RuntimeError("Chrome/Chromium não encontrado (defina CHROME_PATH)")
+        if not self.perfil and self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="automatizador-chrome-")
+            atexit.register(self.fechar)                # Chrome antes da pasta
+        args = [exe, f"--remote-debugging-port={urlsplit(self.cdp_url).port or 9222}",
+                f"--user-data-dir={self.perfil or self._tmp.name}",
+                "--no-first-run", "--no-default-browser-check"]
+        if self.headless:
+            args.append("--headless=new")
+        if sys.platform.startswith("linux") and os.geteuid() == 0:
+            args.append("--no-sandbox")                 # root (contêiner) não tem sandbox
+        return args + ["about:blank"]
+
+    def garantir(self):
+        """Volta quando o CDP responde; sobe o Chrome se for o caso."""
+        if cdp_pronto(self.cdp_url):
+            return
+        with self._trava:                               # vários workers, um Chrome só
+            if cdp_pronto(self.cdp_url):
+                return
+            if not self.lancar:
+                raise RuntimeError(f"Chrome em modo-debug não responde em {self.cdp_url}")
+            if self.proc is None or self.proc.poll() is not None:
+                self.proc = subprocess.Popen(self._argumentos(), stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL)
+            t_fim = time.time() + LIMITE_CDP_SEG
+            while not cdp_pronto(self.cdp_url):
+                if self.proc.poll() is not None or time.time() > t_fim:
+                    raise RuntimeError("o Chrome lançado não abriu o CDP")
+                dormir(0.1, "cdp")
+
+    def fechar(self):
+        """Encerra o Chrome que ESTE gerenciador lançou (o do usuário fica)."""
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+def abrir_debug():
+    """Sobe o Chrome em modo-debug com o perfil padrão (botão da interface)."""
+    subprocess.Popen(Navegador(lancar=True)._argumentos())
+
+# ---------- ABA DE UM WORKER ----------------------------------------
+class AbaChat:
+    def __init__(self, navegador: Navegador, playwright, limite_pronto: float = LIMITE_PRONTO_SEG):
+        """`playwright` é o `sync_playwright()` da thread do worker."""
+        self.navegador = navegador
+        self.limite    = limite_pronto
+        self.browser   = None
+        self.page      = None
+        self.url       = None           # última página em que a aba respondeu
+        self._p        = playwright
+        self._dono     = uuid.uuid4().hex
+
+    def viva(self) -> bool:
+        return bool(self.browser and self.browser.is_connected()
+                    and self.page and not self.page.is_closed())
+
+    def _tomar(self, pagina) -> bool:
+        try:
+            return pagina.evaluate(JS_TOMAR, self._dono)
+        except Exception:
+            return False
+
+    def abrir(self, link: str, url: str | None = None) -> bool:
+        """
+        Põe a aba na sala `link` e espera ficar pronta. Com `url` (reconexão),
+        prefere a aba que ainda está nela. True = reaproveitou uma aba já
+        em `url`/`link`, sem carregar a página.
+        """
+        self.navegador.garantir()
+        self.browser = self._p.chromium.connect_over_cdp(self.navegador.cdp_url)
+        ctx   = self.browser.contexts[0] if self.browser.contexts else self.browser.new_context()
+        alvo = url or link
+        for pagina in ctx.pages:
+            if pagina.url == alvo and self._tomar(pagina):
+                self.page = pagina
+                aguardar_composer(pagina, self.limite)
+                return True
+        sala = link_conversa_nova(link)
+        self.page = next((pg for pg in ctx.pages
+                          if link_conversa_nova(pg.url) == sala and self._tomar(pg)),
+                         None) or ctx.new_page()
+        self.ir(link)
+        return False
+
+    def ir(self, link: str):
+        """Navega a aba e espera o campo de mensagem."""
+        self.page.goto(link)
+        aguardar_composer(self.page, self.limite)
+        if not self._tomar(self.page):                  # outro worker pegou no meio
+            self.page = self.page.context.new_page()
+            self.ir(link)
+
+    def reconectar(self, link: str) -> bool:
+        """Nova conexão CDP; True se voltou à mesma conversa."""
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+        return self.abrir(link, self.url)
+
+    def soltar(self, link: str):
+        """Libera a aba, já carregando a conversa nova da sala para a próxima vez."""
+        if not self.viva():
+            return
+        try:
+            self.page.evaluate(JS_SOLTAR, self._dono)
+            if self.page.url != link:
+                self.page.goto(link, wait_until="commit")
+        except Exception:
+            pass
+
+
+def aquecer(navegador: Navegador, links: list[str], n_abas: int):
+    """Deixa `n_abas` abas (links em rodízio) carregadas e livres no navegador."""
+    with sync_playwright() as p:
+        abas = [AbaChat(navegador, p) for _ in range(n_abas)]
+        for k, aba in enumerate(abas):
+            aba.abrir(link_conversa_nova(links[k % len(links)]))
+        for k, aba in enumerate(abas):
+            aba.soltar(link_conversa_nova(links[k % len(links)]))
@@ -0,0 +1,191 @@
+# pool_abas.py
+"""
+► Pool de abas do chat para processar prompts em paralelo.
+► Cada worker é uma thread que abre a PRÓPRIA sessão do backend
+  (backends.py) — no Playwright, conexão CDP e aba próprias, já que a API
+  síncrona não pode ser compartilhada entre threads.
+► Os workers tiram prompts de uma fila comum; a thread principal recebe
+  os eventos na ordem em que acontecem e cuida da escrita no Docs.
+► A fila é de grupos: um grupo (perguntas de seguimento) vai inteiro, em
+  sequência, para uma aba só; um grupo com sala só sai para as abas
+  daquela sala (se alguma abriu — senão, qualquer aba).
+"""
+
+import queue
+import threading
+
+from medicao import atual, usando, etapa
+
+
+class Controle:
+    """Pausa/cancelamento vindos de outra thread (p.ex. botões da interface)."""
+
+    def __init__(self):
+        self._livre     = threading.Event()
+        self._cancelado = threading.Event()
+        self._livre.set()
+
+    def pausar(self):
+        self._livre.clear()
+
+    def continuar(self):
+        self._livre.set()
+
+    def cancelar(self):
+        self._cancelado.set()
+        self._livre.set()
+
+    @property
+    def pausado(self) -> bool:
+        return not self._livre.is_set()
+
+    @property
+    def cancelado(self) -> bool:
+        return self._cancelado.is_set()
+
+    def dormir(self, seg: float) -> bool:
+        """Espera `seg` s, ou menos se cancelarem; True se cancelado."""
+        return self._cancelado.wait(seg)
+
+    def aguardar(self, timeout: float | None = None) -> bool:
+        """Bloqueia enquanto pausado (até `timeout`); False se ainda pausado."""
+        return self._livre.wait(timeout)
+
+
+# Eventos entregues por `PoolAbas.executar`: (tipo, índice do prompt, dado)
+INICIO   = "inicio"     # dado = nº da aba que pegou o prompt
+RESPOSTA = "resposta"   # dado = HTML da resposta
+ERRO     = "erro"       # dado = exceção
+PARCIAL  = "parcial"    # dado = HTML parcial, enquanto a resposta é gerada
+
+
+class PoolAbas:
+    def __init__(self, backend, n_abas: int, controle=None, parcial: bool = False):
+        """
+        `backend.sessao(n)` é aberta dentro da thread da aba `n` e devolve
+        `responder(prompt, ao_parcial=None, seguimento=False) -> html`.
+        Com `controle`, cada aba espera enquanto pausado antes de pegar o
+        próximo prompt e para de pegar prompts quando cancelado.
+        Com `parcial`, também entrega eventos PARCIAL durante a geração.
+        As abas medem no medidor ligado na thread que cria o pool (medicao.py).
+        """
+        self.backend  = backend
+        self.n_abas   = max(1, n_abas)
+        self._fila    = []                # grupos ainda não pegos
+        self._rotas   = {}                # nº do grupo → sala exigida
+        self._salas   = {}                # sala → abas vivas nela
+        self._sala_de = {}                # aba → sala em que abriu
+        self._cond    = threading.Condition()
+        self._eventos = queue.Queue()
+        self._parar   = threading.Event()
+        self.controle = controle or Controle()
+        self.parcial  = parcial
+        self.medidor  = atual()
+
+    # ---------- WORKER ----------------------------------------------
+    def _pegar(self, n: int):
+        """Próximo grupo que a aba `n` pode atender; None quando a fila acaba."""
+        sala = self._sala_de[n]
+        with self._cond:
+            while self._fila and not (self._parar.is_set() or self.controle.cancelado):
+                for k, g in enumerate(self._fila):
+                    if self._rotas.get(g, sala) == sala:
+                        return self._fila.pop(k)
+                self._cond.wait(0.5)        # o resto é de outra sala
+            return None
+
+    def _soltar(self, n: int):
+        """Aba `n` fechou: se era a última da sala, os grupos dela vão a qualquer aba."""
+        sala = self._sala_de[n]
+        with self._cond:
+            self._salas[sala] -= 1
+            if not self._salas[sala]:
+                self._rotas = {g: s for g, s in self._rotas.items() if s != sala}
+            self._cond.notify_all()
+
+    def _worker(self, n: int):
+        try:
+            with usando(self.medidor), self.backend.sessao(n) as responder:
+                while not self._parar.is_set():
+                    if not self.controle.aguardar(0.5):
+                        continue                    # pausado
+                    if self.controle.cancelado:
+                        break
+                    grupo = self._pegar(n)
+                    if grupo is None:
+                        break
+                    for k, i in enumerate(self._grupos[grupo]):
+                        if self._parar.is_set() or self.controle.cancelado:
+                            break
+                        self._responder(n, i, responder, k > 0)
+        except Exception as e:
+            self._eventos.put((ERRO, None, e))
+        finally:
+            self._soltar(n)
+            self._eventos.put((None, None, n))      # aba encerrada
+
+    def _responder(self, n: int, i: int, responder, seguimento: bool):
+        self._eventos.put((INICIO, i, n))
+        ao_parcial = ((lambda html: self._eventos.put((PARCIAL, i, html)))
+                      if self.parcial else None)
+        try:
+            with etapa("prompt"):
+                html = responder(self._prompts[i], ao_parcial, seguimento)
+            self._eventos.put((RESPOSTA, i, html))
+        except Exception as e:
+            self._eventos.put((ERRO, i, e))
+
+    # ---------- EXECUÇÃO --------------------------------------------
+    def executar(self, prompts: list[str], ao_ocioso=None, intervalo: float = 0.2,
+                 grupos: list[list[int]] | None = None, salas: dict | None = None):
+        """
+        Gerador: distribui `prompts` entre as abas e devolve eventos
+        (tipo, i, dado). `ao_ocioso()` roda a cada `intervalo`s sem eventos
+        (p.ex. `janela.update`). Fechar o gerador (break) para as abas após
+        o prompt em andamento.
+        `grupos` são listas de índices de `prompts` na ordem de saída
+        (padrão: um prompt por grupo, na ordem); `salas` = {nº do grupo:
+        sala (link)} só deixa o grupo para as abas com `backend.sala(n)`
+        igual.
+        Se todas as abas caem, cada prompt que ficou sem resposta sai como
+        ERRO — nenhum some sem aviso. Cancelado, as abas não pegam prompt
+        novo, mas as respostas já em geração ainda saem antes do fim.
+        """
+        self._prompts = prompts
+        self._grupos  = grupos if grupos is not None else [[i] for i in range(len(prompts))]
+        n_abas        = min(self.n_abas, len(self._grupos))
+        for n in range(n_abas):
+            s = self._sala_de[n] = self.backend.sala(n)
+            self._salas[s] = self._salas.get(s, 0) + 1
+        self._fila  = list(range(len(self._grupos)))
+        self._rotas = {g: s for g, s in (salas or {}).items() if s in self._salas}
+        for n in range(n_abas):
+            threading.Thread(target=self._worker, args=(n,), daemon=True).start()
+
+        vivas, feitos, motivo = n_abas, set(), None
+        try:
+            while vivas and len(feitos) < len(prompts):     # cancelado: até as abas saírem
+                try:
+                    tipo, i, dado = self._eventos.get(timeout=intervalo)
+                except queue.Empty:
+                    if ao_ocioso:
+                        ao_ocioso()
+                    continue
+                if tipo is None:
+                    vivas -= 1
+                    continue
+                if tipo == ERRO and i is None:
+                    motivo = dado                   # a aba caiu
+                elif tipo in (RESPOSTA, ERRO):
+                    feitos.add(i)
+                yield tipo, i, dado
+            if not vivas and not self.controle.cancelado:
+                erro = RuntimeError("nenhuma aba disponível"
+                                    + (f": {motivo}" if motivo else ""))
+                for i in range(len(prompts)):
+                    if i not in feitos:
+                        yield ERRO, i, erro
+        finally:
+            self._parar.set()
+            with self._cond:
+                self._cond.notify_all()
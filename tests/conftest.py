@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""Os módulos do automatizador ficam soltos na raiz do repositório."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
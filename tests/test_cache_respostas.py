@@ -0,0 +1,57 @@
+# tests/test_cache_respostas.py
+"""Cache de respostas: chave normalizada e despejo por idade e por tamanho."""
+
+import pytest
+
+from cache_respostas import CacheRespostas
+
+SALA  = "https://chat.example/g/sala"
+BLOCO = "x" * 50                            # html + texto = 100 bytes por entrada
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = CacheRespostas(str(tmp_path / "cache.sqlite3"), max_mb=250 / 2 ** 20)  # 250 bytes
+    yield c
+    c.fechar()
+
+
+def guardar(cache, prompts_usos: dict):
+    """Guarda cada prompt e fixa o `usado_em` (sem empates no relógio)."""
+    for prompt, usado in prompts_usos.items():
+        cache.guardar(prompt, SALA, BLOCO, BLOCO)
+        with cache.db:
+            cache.db.execute("UPDATE respostas SET usado_em = ? WHERE prompt = ?",
+                             (usado, prompt))
+
+
+def guardados(cache) -> set:
+    return {p for p, in cache.db.execute("SELECT prompt FROM respostas")}
+
+
+def test_chave_ignora_espacos_e_query_da_sala(cache):
+    cache.guardar("  uma   pergunta\n", SALA + "/?model=x#fim", "<p>r</p>", "r")
+    assert cache.obter("uma pergunta", ["https://outra/sala", SALA]) == ("<p>r</p>", "r")
+    assert cache.obter("outra pergunta", [SALA]) is None
+
+
+def test_despejo_por_tamanho_tira_a_usada_ha_mais_tempo(cache):
+    guardar(cache, {"a": 1.0, "b": 3.0, "c": 2.0})
+    cache.despejar()
+    assert guardados(cache) == {"b", "c"}
+
+
+def test_obter_renova_o_uso(cache):
+    guardar(cache, {"a": 1.0, "b": 2.0, "c": 3.0})
+    assert cache.obter("a", [SALA]) is not None
+    cache.despejar()
+    assert guardados(cache) == {"a", "c"}
+
+
+def test_despejo_por_idade(cache):
+    guardar(cache, {"velha": 1.0, "nova": 2.0})
+    with cache.db:
+        cache.db.execute("UPDATE respostas SET criado_em = 0 WHERE prompt = 'velha'")
+    assert cache.obter("velha", [SALA]) is None             # vencida já não é servida
+    cache.despejar()
+    assert guardados(cache) == {"nova"}
@@ -0,0 +1,18 @@
+# tests/test_conversores.py
+"""html_para_texto: listas do jeito que o ChatGPT as manda."""
+
+from conversores import html_para_texto
+
+
+def test_lista_simples():
+    assert html_para_texto("<ul><li>um</li><li>dois</li></ul>") == "• um\n• dois"
+
+
+def test_paragrafo_dentro_do_item_fica_na_linha_do_marcador():
+    assert html_para_texto("<ul><li><p>um</p></li><li><p>dois</p></li></ul>") == "• um\n• dois"
+    assert html_para_texto("<ol><li><p>um</p></li><li><p>dois</p></li></ol>") == "1. um\n2. dois"
+
+
+def test_item_com_dois_paragrafos_e_sublista():
+    html = "<ol><li><p>um</p><p>mais</p></li><li>dois<ul><li><p>x</p></li></ul></li></ol><p>fim</p>"
+    assert html_para_texto(html) == "1. um\nmais\n2. dois\n  • x\nfim"
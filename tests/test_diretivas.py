@@ -0,0 +1,63 @@
+# tests/test_diretivas.py
+"""Diretivas dos prompts ([sala=…; prioridade=…; grupo=…]) e o plano das abas."""
+
+import pytest
+
+from google_docs import ler_diretivas, indexar_documento
+from google_falso import GoogleFalso
+from motor import planejar
+
+
+@pytest.mark.parametrize("txt, opcoes, resto", [
+    ("[prioridade=2.5] texto",           {"prioridade": 2.5}, "texto"),
+    ("[prio=alta, aba=2; grupo=intro]x", {"prioridade": 1, "sala": "2", "grupo": "intro"}, "x"),
+    ("[Prioridade: baixa] y",            {"prioridade": -1}, "y"),
+])
+def test_diretivas_reconhecidas(txt, opcoes, resto):
+    assert ler_diretivas(txt) == (opcoes, resto)
+
+
+@pytest.mark.parametrize("txt", [
+    "[Tabela 3] compare as colunas",
+    "[cor=azul] desconhecida",
+    "[prioridade=urgente] valor inválido",
+    "[prioridade=nan] não é número",
+    "[sala=2; Tabela 3] mistura",
+    "[] vazio",
+    "texto [prioridade=1] no meio",
+])
+def test_colchetes_que_nao_sao_diretivas_ficam_no_texto(txt):
+    assert ler_diretivas(txt) == ({}, txt)
+
+
+class BackendSalas:
+    salas = ["https://chat/a", "https://chat/b"]
+
+
+def prompts_do(texto: str) -> list:
+    api  = GoogleFalso()
+    doc  = api.novo_documento(texto)
+    lido = api.construir("docs", "v1").documents().get(documentId=doc.doc_id).execute()
+    return indexar_documento(lido["body"]["content"])[0]
+
+
+def test_planejar_ordena_por_prioridade_e_junta_grupos():
+    prompts = prompts_do("!*!solto\n"
+                         "!*![grupo=g; sala=2] seguimento 1\n"
+                         "!*![prioridade=2.5] urgente\n"
+                         "!*![grupo=g; prioridade=1] seguimento 2\n"
+                         "!*![Tabela 3] com colchetes\n")
+    assert [p.texto for p in prompts][-1] == "[Tabela 3] com colchetes"
+    avisos = []
+    grupos, salas = planejar(prompts, BackendSalas(), log=avisos.append)
+    assert grupos == [[2], [1, 3], [0], [4]]
+    assert salas == {1: "https://chat/b"}
+    assert avisos == []
+
+
+def test_planejar_avisa_sala_desconhecida():
+    prompts = prompts_do("!*![sala=7] a\n!*![sala=https://chat/a] b\n")
+    avisos = []
+    grupos, salas = planejar(prompts, BackendSalas(), log=avisos.append)
+    assert grupos == [[0], [1]] and salas == {1: "https://chat/a"}
+    assert len(avisos) == 1 and "7" in avisos[0]
@@ -0,0 +1,167 @@
+# tests/test_escrita_docs.py
+"""Gravação do EscritorDocs contra o Docs falso: falhas, conflitos e conferência."""
+
+import pytest
+
+from escrita_docs import EscritorDocs, ConflitoRevisao
+from google_docs import indexar_documento, requisicoes_uma_linha
+from google_falso import GoogleFalso, _erro
+from limites_api import limitar, LimitadorGoogle
+
+TEXTO = "Introdução\n!*!primeira pergunta\n!*!segunda pergunta\nfim\n"
+
+
+def preparar(texto: str = TEXTO, espelho: bool = True):
+    """(api falsa, doc falso, escritor, prompts) com o limitador que repete 5xx."""
+    api  = GoogleFalso()
+    doc  = api.novo_documento(texto)
+    svc  = limitar(api.construir, LimitadorGoogle(espera_max=0.001))("docs", "v1")
+    lido = svc.documents().get(documentId=doc.doc_id).execute()
+    prompts, esp = indexar_documento(lido["body"]["content"])
+    escritor = (EscritorDocs(svc, doc.doc_id, requisicoes_uma_linha,
+                             espelho=esp, revisao=lido["revisionId"])
+                if espelho else EscritorDocs(svc, doc.doc_id, requisicoes_uma_linha))
+    return api, doc, escritor, prompts
+
+
+def falhar_depois_de_aplicar(doc, status: int = 503, vezes: int = 1):
+    """O batchUpdate é aplicado e, mesmo assim, a resposta volta com erro."""
+    aplicar, falhas = doc.aplicar, [vezes]
+
+    def aplicar_e_falhar(corpo):
+        resp = aplicar(corpo)
+        if falhas[0]:
+            falhas[0] -= 1
+            raise _erro(status, "Backend Error")
+        return resp
+    doc.aplicar = aplicar_e_falhar
+
+
+def adicionar(escritor, prompts):
+    for k, p in enumerate(prompts):
+        escritor.adicionar(p.fim, f"resposta {k + 1}", chave=k, prompt=p.texto)
+
+
+def test_grava_e_confere_pelo_espelho():
+    api, doc, escritor, prompts = preparar()
+    adicionar(escritor, prompts)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True, True]
+    assert doc.texto() == ("Introdução\n!*!primeira pergunta\nresposta 1\n"
+                           "!*!segunda pergunta\nresposta 2\nfim\n")
+    assert api.chamadas["docs.get"] == 1                     # só a coleta
+
+
+def test_5xx_depois_de_aplicado_nao_duplica():
+    api, doc, escritor, prompts = preparar()
+    falhar_depois_de_aplicar(doc)
+    adicionar(escritor, prompts)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True, True]
+    assert doc.texto().count("resposta 1") == doc.texto().count("resposta 2") == 1
+    assert escritor.revisao == doc.revisao
+
+    # o espelho segue certo: o lote seguinte cai no lugar
+    escritor.adicionar(prompts[0].fim, "mais", chave=9, prompt=prompts[0].texto)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True]
+    assert "!*!primeira pergunta\nmais\nresposta 1\n" in doc.texto()
+
+
+def test_5xx_antes_de_aplicar_repete_com_revisao():
+    api, doc, escritor, prompts = preparar()
+    aplicar, falhas = doc.aplicar, [1]
+
+    def falhar_antes(corpo):
+        if falhas[0]:
+            falhas[0] -= 1
+            raise _erro(503, "Backend Error")
+        return aplicar(corpo)
+    doc.aplicar = falhar_antes
+    adicionar(escritor, prompts)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True, True]
+    assert doc.texto().count("resposta 1") == 1
+
+
+def test_conflito_de_revisao_nao_grava_fora_do_lugar():
+    api, doc, escritor, prompts = preparar()
+    doc.aplicar({"requests": [{"insertText": {"location": {"index": 1},
+                                              "text": "Editado por fora\n"}}]})
+    antes = doc.texto()
+    adicionar(escritor, prompts)
+    with pytest.raises(ConflitoRevisao):
+        escritor.descarregar()
+    assert doc.texto() == antes
+
+    # e nada mais é gravado com o espelho velho
+    escritor.agendar_parcial(prompts[0].fim, "parcial", chave=7)
+    with pytest.raises(ConflitoRevisao):
+        escritor.gravar_parciais()
+    assert doc.texto() == antes
+
+
+def test_revisao_nova_sem_mudar_o_texto_repete():
+    api, doc, escritor, prompts = preparar()
+    doc.aplicar({"requests": [{"updateTextStyle": {
+        "range": {"startIndex": 1, "endIndex": 5},
+        "textStyle": {"bold": True}, "fields": "bold"}}]})
+    adicionar(escritor, prompts)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True, True]
+    assert escritor.revisao == doc.revisao
+    assert doc.texto().count("resposta 2") == 1
+
+
+def test_parcial_com_5xx_depois_de_aplicado():
+    api, doc, escritor, prompts = preparar()
+    escritor.agendar_parcial(prompts[0].fim, "resp", chave=0)
+    escritor.gravar_parciais()
+    falhar_depois_de_aplicar(doc)
+    escritor.agendar_parcial(prompts[0].fim, "resposta parc", chave=0)
+    escritor.gravar_parciais()
+    escritor.adicionar(prompts[0].fim, "resposta parcial final", chave=0,
+                       prompt=prompts[0].texto)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True]
+    assert doc.texto() == ("Introdução\n!*!primeira pergunta\nresposta parcial final\n"
+                           "!*!segunda pergunta\nfim\n")
+
+
+def test_parcial_descartada():
+    api, doc, escritor, prompts = preparar()
+    escritor.agendar_parcial(prompts[1].fim, "meia resposta", chave=1)
+    escritor.gravar_parciais()
+    assert "meia resposta" in doc.texto()
+    escritor.descartar_parcial(prompts[1].fim, 1)
+    assert doc.texto() == TEXTO
+
+
+def test_sem_espelho_confere_lendo_as_regioes():
+    api, doc, escritor, prompts = preparar(espelho=False)
+    adicionar(escritor, prompts)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True, True]
+    assert api.chamadas["docs.get"] == 2                     # coleta + conferência
+
+
+def test_400_sem_ser_de_revisao_nao_repete():
+    api, doc, escritor, prompts = preparar()
+    escritor.adicionar(10_000, "longe demais", chave=0, prompt="")
+    with pytest.raises(Exception) as erro:
+        escritor.descarregar()
+    assert not isinstance(erro.value, ConflitoRevisao)
+    assert api.chamadas["docs.batchUpdate"] == 0 and doc.texto() == TEXTO
+
+
+def test_parciais_vao_juntas_e_no_ritmo():
+    api, doc, escritor, prompts = preparar()
+    escritor.parciais_seg = 60
+    for k in range(3):
+        for i, p in enumerate(prompts):
+            escritor.agendar_parcial(p.fim, f"parcial {i} v{k}", chave=i)
+        if escritor.precisa_gravar_parciais():
+            escritor.gravar_parciais()
+    assert api.chamadas["docs.batchUpdate"] == 1             # só a primeira volta
+    assert "parcial 0 v0" in doc.texto() and "parcial 1 v0" in doc.texto()
+
+    # a descarga leva a final de um e a última parcial do outro
+    escritor.adicionar(prompts[0].fim, "final 0", chave=0, prompt=prompts[0].texto)
+    assert [ok for _, _, ok in escritor.descarregar()] == [True]
+    assert api.chamadas["docs.batchUpdate"] == 2
+    assert doc.texto() == ("Introdução\n!*!primeira pergunta\nfinal 0\n"
+                           "!*!segunda pergunta\nparcial 1 v2\nfim\n")
+    assert escritor.parciais_abertos() == [1]
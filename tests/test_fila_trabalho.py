@@ -0,0 +1,189 @@
+# tests/test_fila_trabalho.py
+"""Filas de trabalho: posse, validade, renovação, devolução e cancelamento."""
+
+import threading
+import time
+
+import pytest
+
+from chat_falso import BackendFalso
+from fila_sheets import criar_planilha_trabalho
+from fila_trabalho import (FilaSQLite, FilaSheets, BackendFila, trabalhar, _Consulta,
+                           PENDENTE, EM_PROCESSO, CONCLUIDO, ERRO)
+from google_falso import GoogleFalso
+from motor import Config, criar_backend
+
+
+@pytest.fixture
+def fila(tmp_path):
+    f = FilaSQLite(str(tmp_path / "fila.sqlite3"), tentativas_max=2)
+    yield f
+    f.fechar()
+
+
+def status(fila, linha: int) -> tuple:
+    return fila.db.execute("SELECT status, trabalhador, observacao FROM fila WHERE linha = ?",
+                           (linha,)).fetchone()
+
+
+def test_pegar_e_concluir(fila):
+    a, b = fila.publicar([("doc", "um", ""), ("doc", "dois", "")])
+    t = fila.pegar("w1")
+    assert (t.linha, t.prompt, t.tentativa) == (a, "um", 1)
+    assert fila.pegar("w2").linha == b                      # a linha pega não sai de novo
+    assert fila.pegar("w3") is None
+    assert fila.concluir(t, "<p>1</p>")
+    assert fila.situacao([a, b]) == {a: (CONCLUIDO, "<p>1</p>")}
+
+
+def test_so_pega_da_propria_sala(fila):
+    linha, = fila.publicar([("doc", "um", "sala-b")])
+    assert fila.pegar("w1", ("", "sala-a")) is None
+    assert fila.pegar("w2", ("", "sala-b")).linha == linha
+
+
+def test_posse_vencida_volta_para_a_fila(fila):
+    linha, = fila.publicar([("doc", "um", "")])
+    t1 = fila.pegar("w1", duracao=0.05)
+    assert fila.pegar("w2") is None
+    time.sleep(0.1)
+    t2 = fila.pegar("w2")
+    assert (t2.linha, t2.tentativa) == (linha, 2)
+    assert not fila.renovar(t1)                             # w1 perdeu a posse…
+    assert not fila.concluir(t1, "atrasada")                # …e a resposta dele
+    assert fila.concluir(t2, "certa")
+    assert fila.situacao([linha]) == {linha: (CONCLUIDO, "certa")}
+
+
+def test_renovar_segura_a_posse(fila):
+    fila.publicar([("doc", "um", "")])
+    t = fila.pegar("w1", duracao=0.05)
+    assert fila.renovar(t, duracao=60)
+    time.sleep(0.1)
+    assert fila.pegar("w2") is None
+
+
+def test_soltar_devolve_e_esgotado_vira_erro(fila):
+    linha, = fila.publicar([("doc", "um", "")])
+    fila.soltar(fila.pegar("w1"), "caiu")
+    assert status(fila, linha) == (PENDENTE, "", "caiu")
+    fila.soltar(fila.pegar("w2"), "caiu de novo")           # 2ª tentativa = tentativas_max
+    assert status(fila, linha) == (ERRO, "", "caiu de novo")
+    assert fila.pegar("w3") is None
+    assert fila.situacao([linha]) == {linha: (ERRO, "caiu de novo")}
+
+
+def test_soltar_de_quem_perdeu_a_posse_nao_mexe(fila):
+    linha, = fila.publicar([("doc", "um", "")])
+    t1 = fila.pegar("w1", duracao=0.05)
+    time.sleep(0.1)
+    fila.pegar("w2")
+    fila.soltar(t1, "tarde demais")
+    assert status(fila, linha)[:2] == (EM_PROCESSO, "w2")
+
+
+def test_cancelada_nao_e_pega_nem_concluida(fila):
+    a, b = fila.publicar([("doc", "um", ""), ("doc", "dois", "")])
+    t = fila.pegar("w1")
+    fila.cancelar(a, "desisti")
+    fila.cancelar(b, "desisti")
+    assert not fila.concluir(t, "tarde")
+    assert fila.pegar("w2") is None
+    assert fila.situacao([a, b]) == {a: (ERRO, "desisti"), b: (ERRO, "desisti")}
+
+
+def test_coordenador_que_desiste_cancela_a_linha(fila):
+    backend = BackendFila(fila, origem="doc", intervalo=0.01, limite=0.1)
+    with backend.sessao(0) as responder:
+        with pytest.raises(RuntimeError, match="nenhum trabalhador"):
+            responder("sem ninguém")
+    linha, = [r[0] for r in fila.db.execute("SELECT linha FROM fila")]
+    assert status(fila, linha)[0] == ERRO
+
+    logs = []
+    trabalhar(fila, BackendFalso(latencia=0), ate_vazia=True, log=logs.append)
+    assert logs == []                                       # ninguém pegou a cancelada
+
+
+def test_cada_doc_vai_na_sua_coluna(fila):
+    backend   = BackendFila(fila, intervalo=0.01, limite=5)
+    respostas = {}
+
+    def responder(doc: str):
+        with criar_backend(Config(doc_id=doc, backend=backend)).sessao(0) as r:
+            respostas[doc] = r(f"prompt de {doc}")
+
+    ts = [threading.Thread(target=responder, args=(d,)) for d in ("doc-a", "doc-b")]
+    for t in ts:
+        t.start()
+    while fila.db.execute("SELECT COUNT(*) FROM fila").fetchone()[0] < 2:
+        time.sleep(0.01)
+    trabalhar(fila, BackendFalso(latencia=0, tokens_por_seg=0, palavras=5), ate_vazia=True,
+              log=lambda m: None)
+    for t in ts:
+        t.join(5)
+    assert sorted(fila.db.execute("SELECT doc, prompt FROM fila")) == [
+        ("doc-a", "prompt de doc-a"), ("doc-b", "prompt de doc-b")]
+    assert set(respostas) == {"doc-a", "doc-b"}
+
+# ---------- FilaSheets sobre o Sheets falso --------------------------
+@pytest.fixture
+def planilha():
+    api = GoogleFalso()
+    svc = api.construir("sheets", "v4")
+    sheet_id, _ = criar_planilha_trabalho(svc)
+    return api, svc, sheet_id
+
+
+def test_sheets_pegar_le_so_status_e_posse(planilha):
+    api, svc, sheet_id = planilha
+    fila = FilaSheets(svc, sheet_id, confirmar=0)
+    a, = fila.publicar([("doc", "um", "")])
+    t  = fila.pegar("w1")
+    assert (t.linha, t.prompt, t.tentativa) == (a, "um", 1)
+    assert fila.concluir(t, "<p>ok</p>")
+    b, = fila.publicar([("doc", "dois", "")])
+    api.zerar_contadores()
+    assert fila.pegar("w2").linha == b
+    assert api.chamadas["sheets.values.batchGet"] == 1      # a busca: colunas B, E:G e I
+    assert fila._inicio == b                                # a concluída não é relida
+    assert fila.situacao([a]) == {a: (CONCLUIDO, "<p>ok</p>")}
+
+
+def test_sheets_linha_pega_entre_a_busca_e_a_gravacao(planilha):
+    api, svc, sheet_id = planilha
+    fila_a = FilaSheets(svc, sheet_id, confirmar=0)
+    fila_b = FilaSheets(svc, sheet_id, confirmar=0)
+    linha, = fila_a.publicar([("doc", "um", "")])
+    busca  = fila_b._livres(("",), time.time())             # B vê a linha livre…
+    assert fila_a.pegar("A").linha == linha                 # …A pega antes de B gravar
+    fila_b._livres = lambda salas, agora: busca
+    assert fila_b.pegar("B") is None                        # a comparação barra B
+    assert fila_b._posse(linha)[:2] == (EM_PROCESSO, "A")
+
+
+def test_sheets_quem_gravou_por_ultimo_fica(planilha):
+    api, svc, sheet_id = planilha
+    fila = FilaSheets(svc, sheet_id, confirmar=0)
+    linha, = fila.publicar([("doc", "um", "")])
+    gravar = fila._gravar
+
+    def gravar_e_ser_atropelado(faixas):
+        gravar(faixas)
+        if f"B{linha}:G{linha}" in faixas:                  # outro grava a posse logo depois
+            gravar({f"B{linha}:G{linha}": [EM_PROCESSO, "", "", "outro", time.time() + 60, 1]})
+    fila._gravar = gravar_e_ser_atropelado
+    assert fila.pegar("eu") is None                         # eu cedo
+    assert fila._posse(linha)[1] == "outro"
+
+
+def test_abas_ociosas_consultam_uma_vez_com_espera(fila):
+    consultas = []
+    pegar     = fila.pegar
+    fila.pegar = lambda *a: consultas.append(a) or pegar(*a)
+    consulta  = _Consulta(fila, intervalo=60)
+    assert consulta.pegar("w/1", ("",), 60)[0] is None
+    t, espera = consulta.pegar("w/2", ("",), 60)            # a outra aba nem consulta
+    assert t is None and 0 < espera <= 60 and len(consultas) == 1
+    assert consulta.pegar("w/3", ("", "sala"), 60)[0] is None   # outra sala consulta
+    assert len(consultas) == 2
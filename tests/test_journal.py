@@ -0,0 +1,40 @@
+# tests/test_journal.py
+"""Diário: chaves de prompts repetidos e a retomada contra o doc re-lido."""
+
+from google_docs import indexar_documento
+from google_falso import GoogleFalso
+from journal import (Journal, chaves_prompts, reconciliar,
+                     ENVIADO, RESPONDIDO, INSERIDO, VERIFICADO)
+
+
+def ler(texto: str):
+    api  = GoogleFalso()
+    doc  = api.novo_documento(texto)
+    lido = api.construir("docs", "v1").documents().get(documentId=doc.doc_id).execute()
+    return indexar_documento(lido["body"]["content"])
+
+
+def test_repetidos_ganham_o_numero_da_ocorrencia():
+    prompts, _ = ler("!*!mesma\n!*!outra\n!*!mesma\n!*!mesma\n")
+    assert chaves_prompts(prompts) == [("mesma", 1), ("outra", 1), ("mesma", 2), ("mesma", 3)]
+
+
+def test_retomada_separa_as_ocorrencias(tmp_path):
+    # 3ª ocorrência respondida e gravada, mas o "inserido" não chegou ao diário
+    prompts, espelho = ler("!*!mesma\n!*!mesma\n!*!mesma\nresposta três\n!*!outra\nfim\n")
+    chaves  = chaves_prompts(prompts)
+    diario  = Journal(str(tmp_path / "journal_doc.jsonl"))
+    diario.abrir("doc", "r1", chaves)
+    diario.estado(("mesma", 1), VERIFICADO, "resposta um")
+    diario.estado(("mesma", 2), RESPONDIDO, "resposta dois", "<p>resposta dois</p>")
+    diario.estado(("mesma", 3), RESPONDIDO, "resposta três")
+    diario.estado(("outra", 1), ENVIADO)
+    diario.fechar()
+    with open(diario.caminho, "a", encoding="utf-8") as f:
+        f.write('{"ev": "estado", "chave": ["outra", 1], "est')      # queda no meio da linha
+
+    herdados, prontos, reinserir = reconciliar(diario.carregar(), chaves, prompts, espelho)
+    assert prontos == {0, 2}
+    assert reinserir == {1: ("resposta dois", "<p>resposta dois</p>")}
+    assert herdados[("mesma", 3)] == {"estado": INSERIDO, "texto": "resposta três"}
+    assert ("outra", 1) not in herdados                     # só enviado: pergunta de novo
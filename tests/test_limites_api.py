@@ -0,0 +1,115 @@
+# tests/test_limites_api.py
+"""LimitadorGoogle: fusão de chamadas, cota adaptativa e quando repetir."""
+
+import threading
+import time
+
+import pytest
+
+from google_falso import _erro
+from limites_api import LimitadorGoogle
+
+LEITURA = "documents.get"
+VALORES = "spreadsheets.values.batchUpdate"
+
+
+def esperar(condicao, limite: float = 2.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "não aconteceu a tempo"
+        time.sleep(0.005)
+
+
+def em_paralelo(n: int, alvo) -> tuple[list, list]:
+    resultados, threads = [None] * n, []
+    for k in range(n):
+        t = threading.Thread(target=lambda k=k: resultados.__setitem__(k, alvo(k)))
+        t.start()
+        threads.append(t)
+    return resultados, threads
+
+
+def test_leituras_iguais_ao_mesmo_tempo_viram_uma():
+    lim, liberar, feitas = LimitadorGoogle({}), threading.Event(), []
+
+    def chamar(kwargs):
+        feitas.append(kwargs)
+        liberar.wait(2)
+        return {"revisionId": "r1"}
+
+    resultados, threads = em_paralelo(
+        3, lambda k: lim.executar("docs", LEITURA, {"documentId": "d"}, chamar))
+    esperar(lambda: lim.contadores["fundidas"] == 2)
+    liberar.set()
+    for t in threads:
+        t.join(2)
+    assert len(feitas) == 1 and resultados == [{"revisionId": "r1"}] * 3
+
+
+def test_valores_que_esperam_ficha_saem_num_batch_update():
+    lim = LimitadorGoogle({"sheets.escrita": 600})
+    lim.baldes["sheets.escrita"].fichas = -3            # o 1º espera ~0,4 s pela ficha
+    feitas = []
+
+    def chamar(kwargs):
+        feitas.append([d["range"] for d in kwargs["body"]["data"]])
+        return {"totalUpdatedCells": len(kwargs["body"]["data"])}
+
+    def gravar(k: int):
+        corpo = {"valueInputOption": "RAW", "data": [{"range": f"A{k}", "values": [[k]]}]}
+        return lim.executar("sheets", VALORES, {"spreadsheetId": "p", "body": corpo}, chamar)
+
+    _, threads = em_paralelo(1, gravar)
+    esperar(lambda: lim._voos)
+    _, threads2 = em_paralelo(2, lambda k: gravar(k + 1))
+    for t in threads + threads2:
+        t.join(3)
+    assert feitas == [["A0", "A1", "A2"]]
+    assert lim.contadores["fundidas"] == 2
+
+
+def falhar(status: int, vezes: int):
+    """`chamar` que responde `status` nas primeiras `vezes`."""
+    feitas = []
+
+    def chamar(kwargs):
+        feitas.append(kwargs)
+        if len(feitas) <= vezes:
+            raise _erro(status, "falha")
+        return {"ok": True}
+    return chamar, feitas
+
+
+@pytest.mark.parametrize("metodo, corpo, repete", [
+    (LEITURA, {}, True),
+    ("documents.batchUpdate", {"requests": []}, False),          # duplicaria o texto
+    ("documents.batchUpdate", {"requests": [], "writeControl": {"requiredRevisionId": "r"}},
+     True),
+])
+def test_5xx_so_repete_quando_e_seguro(metodo, corpo, repete):
+    lim = LimitadorGoogle({}, espera_max=0.001)
+    chamar, feitas = falhar(503, 1)
+    if repete:
+        assert lim.executar("docs", metodo, {"body": corpo}, chamar) == {"ok": True}
+        assert len(feitas) == 2 and lim.contadores["5xx"] == 1
+    else:
+        with pytest.raises(Exception, match="falha"):
+            lim.executar("docs", metodo, {"body": corpo}, chamar)
+        assert len(feitas) == 1
+
+
+def test_429_freia_o_balde_e_repete_mesmo_escrita():
+    lim = LimitadorGoogle({"docs.escrita": 6000}, espera_max=0.001)
+    balde = lim.baldes["docs.escrita"]
+    chamar, feitas = falhar(429, 2)
+    assert lim.executar("docs", "documents.batchUpdate", {"body": {}}, chamar) == {"ok": True}
+    assert len(feitas) == 3 and lim.contadores["429"] == 2
+    assert balde.taxa < balde.teto / 2                  # dois cortes, uma devolução
+
+
+def test_erro_do_cliente_nao_repete():
+    lim = LimitadorGoogle({}, espera_max=0.001)
+    chamar, feitas = falhar(400, 1)
+    with pytest.raises(Exception, match="falha"):
+        lim.executar("docs", LEITURA, {}, chamar)
+    assert len(feitas) == 1
@@ -0,0 +1,66 @@
+# tests/test_pool_abas.py
+"""PoolAbas: nenhum prompt some quando as abas caem ou quando cancelam."""
+
+import threading
+from contextlib import contextmanager
+
+from pool_abas import PoolAbas, Controle, INICIO, RESPOSTA, ERRO
+
+
+class BackendMorto:
+    nome  = "morto"
+    salas = ["sala"]
+
+    def sala(self, n: int) -> str:
+        return "sala"
+
+    @contextmanager
+    def sessao(self, n: int):
+        raise RuntimeError("CDP fora do ar")
+        yield
+
+
+class BackendMeioMorto(BackendMorto):
+    """Só a aba 0 abre."""
+
+    @contextmanager
+    def sessao(self, n: int):
+        if n:
+            raise RuntimeError("login expirado")
+        yield lambda prompt, ao_parcial=None, seguimento=False: f"<p>{prompt}</p>"
+
+
+def test_todas_as_abas_fora_viram_erro_por_prompt():
+    eventos = list(PoolAbas(BackendMorto(), 2).executar(["a", "b", "c"]))
+    por_prompt = {i: (tipo, str(dado)) for tipo, i, dado in eventos if i is not None}
+    assert sorted(por_prompt) == [0, 1, 2]
+    assert all(tipo == ERRO and "CDP fora do ar" in motivo
+               for tipo, motivo in por_prompt.values())
+
+
+def test_aba_que_sobra_responde_tudo():
+    eventos = list(PoolAbas(BackendMeioMorto(), 2).executar(["a", "b", "c"]))
+    finais  = sorted((i, tipo) for tipo, i, _ in eventos
+                     if tipo in (RESPOSTA, ERRO) and i is not None)
+    assert finais == [(0, RESPOSTA), (1, RESPOSTA), (2, RESPOSTA)]
+
+
+def test_cancelar_entrega_as_respostas_em_andamento():
+    controle, liberar = Controle(), threading.Event()
+
+    class BackendLento(BackendMorto):
+        @contextmanager
+        def sessao(self, n: int):
+            def responder(prompt, ao_parcial=None, seguimento=False):
+                liberar.wait(5)
+                return f"<p>{prompt}</p>"
+            yield responder
+
+    eventos = []
+    for tipo, i, dado in PoolAbas(BackendLento(), 2, controle).executar(["a", "b", "c"]):
+        eventos.append((tipo, i))
+        if tipo == INICIO and sum(t == INICIO for t, _ in eventos) == 2:
+            controle.cancelar()
+            liberar.set()
+    assert sorted(i for tipo, i in eventos if tipo == RESPOSTA) == [0, 1]
+    assert (INICIO, 2) not in eventos
@@ -0,0 +1,60 @@
+# tests/test_sse_markdown.py
+"""Captura pela rede: stream SSE do chat remontado e markdown em HTML."""
+
+import json
+
+from chat import remontar_sse
+from conversores import markdown_para_html
+
+
+def sse(*eventos) -> str:
+    return "".join(f"data: {json.dumps(ev)}\n\n" for ev in eventos) + "data: [DONE]\n\n"
+
+
+def mensagem(role: str, texto: str = "") -> dict:
+    return {"v": {"message": {"author": {"role": role},
+                              "content": {"content_type": "text", "parts": [texto]}}}}
+
+
+def test_sse_delta_com_append_e_patch():
+    corpo = sse(mensagem("user", "pergunta"),
+                mensagem("assistant"),
+                {"p": "/message/content/parts/0", "o": "append", "v": "Olá, "},
+                {"v": "**mundo**"},                  # sem caminho: repete o anterior
+                {"p": "", "o": "patch", "v": [
+                    {"p": "/message/metadata", "o": "replace", "v": {}},
+                    {"p": "/message/content/parts/0", "o": "append", "v": "!\n\n- um"}]},
+                {"v": "\n- dois"})                     # segue o último da lista do patch
+    assert remontar_sse(corpo) == ("<p>Olá, <strong>mundo</strong>!</p>"
+                                   "<ul><li>um</li><li>dois</li></ul>")
+
+
+def test_sse_ignora_texto_que_nao_e_do_assistente():
+    corpo = sse(mensagem("assistant", "antes"),
+                {"p": "/message/content/parts/0", "o": "replace", "v": "trocado"},
+                mensagem("tool", "saída da ferramenta"),
+                {"p": "/message/content/parts/0", "o": "append", "v": " ignorado"})
+    assert remontar_sse(corpo) == "<p>trocado</p>"
+
+
+def test_sse_de_tokens_html():
+    assert remontar_sse(sse({"token": "<p>a"}, {"token": "b</p>"})) == "<p>ab</p>"
+
+
+def test_markdown_listas_aninhadas():
+    md = "- um\n  - dois\n    1. três\n- quatro"
+    assert markdown_para_html(md) == ("<ul><li>um<ul><li>dois<ol><li>três</li></ol></li></ul>"
+                                      "</li><li>quatro</li></ul>")
+
+
+def test_markdown_bloco_de_codigo_nao_e_interpretado():
+    md = "```python\nx = 1 < 2  # **não** negrito\n\n- nem lista\n```\ndepois"
+    assert markdown_para_html(md) == ("<pre><code>x = 1 &lt; 2  # **não** negrito\n\n"
+                                      "- nem lista\n</code></pre><p>depois</p>")
+
+
+def test_markdown_tabela():
+    md = "| a | b |\n|---|:-:|\n| 1 | **2** |\nfim"
+    assert markdown_para_html(md) == ("<table><tr><td>a</td><td>b</td></tr>"
+                                      "<tr><td>1</td><td><strong>2</strong></td></tr>"
+                                      "</table><p>fim</p>")
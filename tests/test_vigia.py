@@ -0,0 +1,86 @@
+# tests/test_vigia.py
+"""Vigia: prompt que não ficou gravado volta sozinho, mesmo sem revisão nova."""
+
+import time
+from contextlib import contextmanager
+
+from chat_falso import BackendFalso
+from google_falso import GoogleFalso, _erro
+from motor import Config
+from vigia import Vigia
+
+TEXTO    = "Pauta\n!*!primeira\n!*!segunda\n!*!terceira\n"
+PROMPTS  = ("!*!primeira", "!*!segunda", "!*!terceira")
+ESPERA   = 0.2                                  # intervalo da vigia = base da espera
+
+
+class BackendForaDoAr(BackendFalso):
+    """As abas não abrem enquanto `fora` for True."""
+
+    fora = True
+
+    @contextmanager
+    def sessao(self, n: int):
+        if self.fora:
+            raise RuntimeError("chat fora do ar")
+        with super().sessao(n) as responder:
+            yield responder
+
+
+def vigia_sobre(api, doc, backend=None):
+    cfg = Config(doc_id="", n_abas=1, usar_fila=False, cache_arquivo=None, limitar_api=False,
+                 lote_max_respostas=1,
+                 backend=backend or BackendFalso(latencia=0, tokens_por_seg=0, palavras=5))
+    return Vigia(cfg, None, [doc.doc_id], intervalo=ESPERA, log=lambda m: None,
+                 construir=api.construir)
+
+
+def respondidos(doc) -> bool:
+    linhas = doc.texto().split("\n")
+    return all(linhas[linhas.index(p) + 1].strip()
+               and not linhas[linhas.index(p) + 1].startswith("!*!") for p in PROMPTS)
+
+
+def test_prompts_nao_tentados_voltam_depois_do_aborto(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)                     # diário do motor
+    api = GoogleFalso()
+    doc = api.novo_documento(TEXTO)
+    aplicar, falhas = doc.aplicar, [1]
+
+    def recusar_uma(corpo):
+        if falhas[0]:
+            falhas[0] -= 1
+            raise _erro(400, "Invalid requests[0].insertText")
+        return aplicar(corpo)
+    doc.aplicar = recusar_uma
+
+    vigia = vigia_sobre(api, doc)
+    visto = vigia.docs[doc.doc_id]
+    vigia._conferir(doc.doc_id, visto)              # 1ª gravação falha → aborta
+    assert visto.repetir == {"primeira", "segunda", "terceira"}
+
+    time.sleep(5 * ESPERA)
+    vigia._conferir(doc.doc_id, visto)              # sem edição no doc: repete sozinho
+    assert visto.repetir == set()
+    assert respondidos(doc)
+
+
+def test_chat_fora_do_ar_repete_sem_revisao_nova(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    api     = GoogleFalso()
+    doc     = api.novo_documento(TEXTO)
+    backend = BackendForaDoAr(latencia=0, tokens_por_seg=0, palavras=5)
+    vigia   = vigia_sobre(api, doc, backend)
+    visto   = vigia.docs[doc.doc_id]
+
+    vigia._conferir(doc.doc_id, visto)
+    assert len(visto.repetir) == 3 and doc.texto() == TEXTO
+
+    vigia._conferir(doc.doc_id, visto)              # dentro da espera: só a revisão
+    assert api.chamadas["docs.get"] == 2 and doc.texto() == TEXTO
+
+    backend.fora = False
+    time.sleep(5 * ESPERA)
+    vigia._conferir(doc.doc_id, visto)
+    assert visto.repetir == set() and visto.falhas == 0
+    assert respondidos(doc)
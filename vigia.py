@@ -0,0 +1,176 @@
+# vigia.py
+"""
+► Modo vigia: processo de longa duração que responde os !*! novos assim
+  que aparecem, sem ninguém clicar em "Processar" e sem reprocessar o
+  documento inteiro.
+► A cada `intervalo` s, por doc, lê só o `revisionId` (documents.get com
+  máscara `fields`). Quando muda, lê o doc UMA vez, compara os
+  parágrafos de prompt com os da última revisão vista e manda ao motor
+  só os prompts novos ou alterados que ainda não têm resposta abaixo —
+  o motor usa o doc já lido e processa só esses índices.
+► Pasta do Drive: segue a API de mudanças do Drive (changes.list a partir
+  de um startPageToken). Doc criado, movido ou editado na pasta é
+  conferido na volta seguinte; os outros não custam chamada nenhuma.
+► Na 1ª leitura de um doc entram os prompts ainda sem resposta abaixo
+  (o que já foi respondido antes da vigia fica como está). Prompt que
+  não ficou gravado — falhou, ou nem foi tentado (abortado, cancelado,
+  abas fora) — volta na próxima revisão do doc se ainda estiver sem
+  resposta, ou antes disso, com espera crescente (até `REPETIR_MAX_SEG`):
+  com o chat fora do ar nada é gravado e a revisão não muda sozinha.
+"""
+
+import time
+from collections import Counter
+from dataclasses import replace
+
+from clientes_google import CLIENTES
+from google_docs import indexar_documento, tem_resposta
+from fila_sheets import criar_planilha_fila
+from lote_docs import listar_pasta, MIME_DOC
+from motor import Config, processar_documento, criar_backend
+from pool_abas import Controle
+from limites_api import limitar, espera_backoff
+
+INTERVALO_SEG   = 5.0
+REPETIR_MAX_SEG = 300.0     # espera máxima entre as tentativas de prompts que falharam
+CAMPOS_MUDANCAS = ("nextPageToken,newStartPageToken,"
+                   "changes(fileId,removed,file(name,mimeType,parents,trashed))")
+
+
+def novos_prompts(prompts: list, anteriores: Counter | None,
+                  repetir: set = frozenset()) -> list[int]:
+    """
+    Índices dos `prompts` cujo texto é novo (ou aparece mais vezes) desde
+    `anteriores` — None = 1ª leitura, vale tudo — ou está em `repetir`, e
+    que ainda não têm resposta abaixo.
+    """
+    atuais = Counter(p.texto for p in prompts)
+    mudou  = {t for t, n in atuais.items()
+              if anteriores is None or n > anteriores[t]} | set(repetir)
+    return [k for k, p in enumerate(prompts) if p.texto in mudou and not tem_resposta(p)]
+
+
+class _Visto:
+    """O que a vigia sabe de um doc desde a última revisão lida."""
+
+    def __init__(self, nome: str, sempre: bool):
+        self.nome    = nome
+        self.sempre  = sempre       # doc pedido na linha de comando: confere toda volta
+        self.sujo    = True         # doc da pasta: só quando o Drive avisa
+        self.revisao = None
+        self.prompts = None         # Counter dos textos de prompt (None = nunca lido)
+        self.repetir = set()        # textos que falharam na última rodada
+        self.falhas  = 0            # rodadas seguidas com prompts sem gravar
+        self.proxima = 0.0          # monotonic da próxima tentativa sem revisão nova
+
+
+# ---------- VIGIA ---------------------------------------------------
+class Vigia:
+    def __init__(self, cfg: Config, creds, doc_ids: list[str] = (), pasta: str | None = None,
+                 intervalo: float = INTERVALO_SEG, log=print,
+                 controle: Controle | None = None, construir=CLIENTES):
+        """`cfg` vale para todos os docs (o `doc_id` dele é ignorado)."""
+        if cfg.limitar_api:
+            construir = limitar(construir)
+        self.cfg       = replace(cfg, retomar=False, backend=criar_backend(cfg))
+        self.creds     = creds
+        self.pasta     = pasta
+        self.intervalo = intervalo
+        self.log       = log
+        self.controle  = controle or Controle()
+        self.construir = construir
+        self.docs      = {d: _Visto(d, sempre=True) for d in doc_ids}
+        self.svc_docs  = construir("docs", "v1", credentials=creds)
+        self.svc_drive = construir("drive", "v3", credentials=creds) if pasta else None
+        self._token    = None
+
+    def rodar(self):
+        """Vigia até `controle.cancelar()`."""
+        if self.pasta:
+            # token antes da listagem: nada que mude no meio escapa
+            self._token = self.svc_drive.changes().getStartPageToken(
+                supportsAllDrives=True).execute()["startPageToken"]
+            for doc_id, nome in listar_pasta(self.svc_drive, self.pasta):
+                self.docs.setdefault(doc_id, _Visto(nome, sempre=False))
+        if self.cfg.usar_fila and not self.cfg.fila_planilha:
+            sheet_id, url = criar_planilha_fila(
+                self.construir("sheets", "v4", credentials=self.creds),
+                self.cfg.abrir_fila_no_navegador)
+            self.cfg = replace(self.cfg, fila_planilha=sheet_id)
+            self.log(f"📎 Fila: {url}")
+        self.log(f"👁 Vigiando {len(self.docs)} doc(s)"
+                 + (" e a pasta" if self.pasta else "") + f", a cada {self.intervalo:g} s.")
+
+        while not self.controle.cancelado:
+            t0 = time.monotonic()
+            try:
+                if self.pasta:
+                    self._mudancas()
+                for doc_id, visto in list(self.docs.items()):
+                    if self.controle.cancelado:
+                        break
+                    if visto.sempre or visto.sujo or visto.repetir:
+                        self._conferir(doc_id, visto)
+            except Exception as e:                  # rede fora do ar: tenta na próxima volta
+                self.log(f"⚠ Vigia: {e}")
+            self.controle.dormir(max(0.0, self.intervalo - (time.monotonic() - t0)))
+
+    def _mudancas(self):
+        """Marca os docs da pasta que o Drive diz que mudaram."""
+        while True:
+            resp = self.svc_drive.changes().list(
+                pageToken=self._token, fields=CAMPOS_MUDANCAS, pageSize=100,
+                supportsAllDrives=True, includeItemsFromAllDrives=True).execute()
+            for m in resp.get("changes", []):
+                arq, doc_id = m.get("file") or {}, m["fileId"]
+                na_pasta = (not m.get("removed") and not arq.get("trashed")
+                            and arq.get("mimeType") == MIME_DOC
+                            and self.pasta in arq.get("parents", []))
+                if na_pasta:
+                    self.docs.setdefault(doc_id, _Visto(arq.get("name", doc_id), False)).sujo = True
+                elif doc_id in self.docs and not self.docs[doc_id].sempre:
+                    del self.docs[doc_id]           # saiu da pasta ou foi para a lixeira
+            if "newStartPageToken" in resp:
+                self._token = resp["newStartPageToken"]
+                return
+            self._token = resp["nextPageToken"]
+
+    def _conferir(self, doc_id: str, visto: _Visto):
+        """
+        Revisão nova → lê o doc uma vez e processa só os prompts novos.
+        Prompts que falharam são repetidos mesmo sem revisão nova, vencida a espera.
+        """
+        docs    = self.svc_docs.documents()
+        repetir = bool(visto.repetir) and time.monotonic() >= visto.proxima
+        if visto.revisao is not None and not repetir:
+            if not (visto.sempre or visto.sujo):
+                return                              # só falta a espera das repetições
+            rev = docs.get(documentId=doc_id, fields="revisionId").execute().get("revisionId")
+            if rev == visto.revisao:
+                visto.sujo = False
+                return
+        doc = docs.get(documentId=doc_id).execute()
+        visto.sujo = False
+        prompts, _ = indexar_documento(doc["body"]["content"])
+        novos      = novos_prompts(prompts, visto.prompts, visto.repetir)
+        visto.revisao, visto.repetir = doc.get("revisionId"), set()
+        visto.prompts = Counter(p.texto for p in prompts)
+        if not novos:
+            visto.falhas = 0
+            return
+
+        titulo = doc.get("title") or visto.nome
+        self.log(f"✱ {titulo}: {len(novos)} prompt(s) novo(s).")
+        res = processar_documento(replace(self.cfg, doc_id=doc_id), self.creds,
+                                  log=self.log, controle=self.controle,
+                                  construir=self.construir, doc=doc, indices=set(novos))
+        feitos        = set(res.feitos)
+        visto.repetir = {prompts[k].texto for n, k in enumerate(novos, 1) if n not in feitos}
+        if not visto.repetir:
+            visto.falhas = 0
+            return
+        espera        = espera_backoff(visto.falhas, self.intervalo, REPETIR_MAX_SEG)
+        visto.falhas += 1
+        visto.proxima = time.monotonic() + espera
+        self.log(f"⚠ {titulo}: {len(visto.repetir)} prompt(s) sem resposta gravada — "
+                 f"nova tentativa em {espera:.0f} s ou na próxima revisão do doc.")